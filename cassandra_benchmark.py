@@ -6,6 +6,44 @@ Description: Small benchmark tool that introspects a Cassandra table schema from
              system tables, generates synthetic data, and performs randomized
              insert/read operations using prepared statements.
 
+             By default one blocking request runs at a time, so throughput is
+             bounded by round-trip latency. With --concurrency N, N requests are
+             kept in flight with execute_async to measure cluster capacity.
+             With --processes P, P worker processes each open their own
+             connection and drive a disjoint slice of the partition key space;
+             their latency histograms are merged into a single report.
+
+             With --rate R the load is open-loop: requests are issued on a fixed
+             schedule of R ops/sec (optionally ramped with --ramp step, linear
+             or sine) whether or not earlier ones have returned, and latency is
+             measured from the intended send time, so a stalled server cannot
+             hide its queueing delay (coordinated omission).
+
+             Latencies are recorded in fixed-memory, mergeable log-bucketed
+             histograms (p50/p90/p99/p99.9/max); --latency-log also writes a
+             snapshot of every --log-interval seconds to a CSV file.
+
+             --row-size-bytes/--row-size-dist or --row-size-from (a row size
+             sampler line) pad text and blob columns so generated rows follow
+             a target encoded row size distribution, checked with
+             calculate_row_size before the run.
+
+             --workload (a YAML or JSON file) or --mix replaces the read phase
+             with a mixed phase: writes, TTL writes, updates, deletes,
+             partition and row reads and LIMIT range scans are drawn by weight
+             and issued interleaved from one scheduler, with latency and
+             throughput reported per operation type.
+
+             --batch-size N writes the inserts in unlogged BatchStatements of up
+             to N rows, either all in one partition (--batch-mode
+             same-partition) or spread over partitions (cross-partition), and
+             reports per-batch and per-row latency and effective rows/sec.
+
+             --scans N reads N written partitions to the end, page by page
+             with --fetch-size, and reports time to first row, rows/sec,
+             pages/sec and estimated read units per partition, grouped by
+             partition width, to show what wide partitions cost.
+
 Usage:
     python cassandra_benchmark.py <keyspace> <table> [options]
 
@@ -13,24 +51,54 @@ Examples:
     python cassandra_benchmark.py mykeyspace mytable
     python cassandra_benchmark.py mykeyspace mytable --host 10.0.0.5 --port 9042
     python cassandra_benchmark.py mykeyspace mytable --inserts 5000 --reads 2000
+    python cassandra_benchmark.py mykeyspace mytable --inserts 100000 --reads 100000 --concurrency 128
+    python cassandra_benchmark.py mykeyspace mytable --inserts 400000 --reads 400000 --concurrency 64 --processes 4
+    python cassandra_benchmark.py mykeyspace mytable --inserts 600000 --rate 2000 --concurrency 256
+    python cassandra_benchmark.py mykeyspace mytable --inserts 300000 --rate 5000 --ramp linear --ramp-start-rate 500 --ramp-duration 120
+    python cassandra_benchmark.py mykeyspace mytable --inserts 1000000 --concurrency 64 --latency-log latency.csv --log-interval 5
+    python cassandra_benchmark.py mykeyspace mytable --collection-size 10-50 --text-size 100-400 --blob-size 1024
+    python cassandra_benchmark.py mykeyspace mytable --row-size-bytes 2000 --row-size-dist lognormal --row-size-stdev 800
+    python cassandra_benchmark.py mykeyspace mytable --row-size-from row_sizes.txt --row-size-table prod.orders
+    python cassandra_benchmark.py mykeyspace mytable --mix read_row=60,read_partition=10,write=20,update=10 --operations 50000
+    python cassandra_benchmark.py mykeyspace mytable --workload workload.yaml --concurrency 64
+    python cassandra_benchmark.py mykeyspace mytable --inserts 100000 --batch-size 20 --batch-mode same-partition --concurrency 32
+    python cassandra_benchmark.py mykeyspace mytable --pk-pool-size 100 --ck-pool-size 5000 --inserts 500000 --scans 200 --fetch-size 1000
     python cassandra_benchmark.py mykeyspace mytable --username admin --password secret --ssl
     python cassandra_benchmark.py mykeyspace mytable --sigv4 --sigv4-region us-east-1 --ssl --ssl-certfile sf-class2-root.crt
 """
 
 import argparse
+import ipaddress
+import json
+import math
+import multiprocessing
+import os
 import random
 import string
 import sys
+import threading
 import time
 import uuid
-from collections import deque
+from collections import namedtuple
 from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from multiprocessing.connection import wait
 
 from cassandra.cluster import Cluster
 from cassandra.auth import PlainTextAuthProvider
 from cassandra import ConsistencyLevel
+from cassandra.query import BatchStatement, BatchType
 from ssl import SSLContext, PROTOCOL_TLS_CLIENT, CERT_REQUIRED
 
+from row_size_calculator import (MAX_ROW_SIZE_BYTES, READ_UNIT_BYTES, RowSizeHistogram, RowSizer,
+                                 build_table_schema, calculate_row_size, parse_cql_type,
+                                 parse_row_size_line, to_row_value)
+
+try:
+    import yaml
+except ImportError:  # PyYAML is only needed for YAML --workload files
+    yaml = None
+
 
 # ---------------------------------------------------------------------------
 # Schema introspection
@@ -39,7 +107,8 @@ from ssl import SSLContext, PROTOCOL_TLS_CLIENT, CERT_REQUIRED
 def get_table_schema(session, keyspace, table):
     """
     Query system_schema tables to retrieve column metadata, partition keys,
-    and clustering keys for the target table.
+    and clustering keys for the target table, and the field types of the
+    keyspace's user-defined types.
     """
     columns_query = (
         "SELECT column_name, type, kind, position "
@@ -75,15 +144,40 @@ def get_table_schema(session, keyspace, table):
     if not partition_keys:
         raise ValueError(f"Table {keyspace}.{table} not found or has no partition keys")
 
+    types_query = (
+        "SELECT type_name, field_names, field_types "
+        "FROM system_schema.types "
+        "WHERE keyspace_name = %s"
+    )
+    user_types = {
+        row.type_name: dict(zip(row.field_names, row.field_types))
+        for row in session.execute(types_query, (keyspace,))
+    }
+
     return {
         'partition_keys': partition_keys,
         'clustering_keys': clustering_keys,
         'regular_columns': regular_columns,
         'static_columns': static_columns,
         'column_types': column_types,
+        'user_types': user_types,
     }
 
 
+def table_columns(schema, regular_columns):
+    """
+    (column_name, data_type, kind, position) tuples of the key, static and
+    given regular columns of a get_table_schema result, the input of
+    build_table_schema.
+    """
+    column_types = schema['column_types']
+    columns = [(col, column_types[col], 'partition_key', i) for i, col in enumerate(schema['partition_keys'])]
+    columns += [(col, column_types[col], 'clustering', i) for i, col in enumerate(schema['clustering_keys'])]
+    columns += [(col, column_types[col], 'static', 0) for col in schema['static_columns']]
+    columns += [(col, column_types[col], 'regular', 0) for col in regular_columns]
+    return columns
+
+
 # ---------------------------------------------------------------------------
 # Synthetic data generation
 # ---------------------------------------------------------------------------
@@ -138,35 +232,6 @@ def generate_value(cql_type):
         return ''.join(random.choices(string.ascii_letters, k=16))
 
 
-def generate_key_pool(column_names, column_types, count):
-    """
-    Generate a pool of unique key-value tuples for a set of key columns.
-    Returns a list of dicts, each mapping column_name -> value.
-    """
-    seen = set()
-    pool = []
-
-    max_attempts = count * 10
-    attempts = 0
-    while len(pool) < count and attempts < max_attempts:
-        attempts += 1
-        values = {}
-        hashable_parts = []
-        for col in column_names:
-            val = generate_value(column_types[col])
-            if val is None:
-                break
-            values[col] = val
-            hashable_parts.append((col, str(val)))
-        else:
-            key = tuple(hashable_parts)
-            if key not in seen:
-                seen.add(key)
-                pool.append(values)
-
-    return pool
-
-
 def generate_regular_values(column_names, column_types):
     """Generate a single dict of random values for non-key columns."""
     values = {}
@@ -177,17 +242,520 @@ def generate_regular_values(column_names, column_types):
     return values
 
 
+# Values pre-generated per CQL type by ValueGenerator
+VALUE_POOL_SIZE = 4096
+
+# Size of the random buffers text and blob values are sliced from
+RANDOM_BUFFER_BYTES = 1 << 20
+
+TEXT_ALPHABET = (string.ascii_letters + string.digits).encode('ascii')
+
+
+class ValueGenerator:
+    """
+    Fast source of random regular column values for the insert loop. Calling
+    generate_value per column per row makes the client CPU the bottleneck, so
+    everything random is prepared once:
+      - text/varchar/ascii values are slices of one random alphanumeric string
+        and blobs zero-copy memoryview slices of one random byte buffer, with
+        lengths drawn from text_size and blob_size (min, max)
+      - every other scalar type draws from a pool of pool_size values built
+        with generate_value
+      - list, set, map, tuple, frozen and user-defined types (field types from
+        user_types, as read from system_schema.types) are built from generators
+        of their element, key, value and field types, with collection_size
+        (min, max) elements per collection. UDT values are namedtuples in
+        field order, which the driver binds without a registered class and
+        row_size_calculator sizes like dicts.
+    Values repeat across rows, which is fine for regular columns; unique keys
+    come from KeySpace.
+    """
+
+    def __init__(self, column_types, pool_size=VALUE_POOL_SIZE, buffer_size=RANDOM_BUFFER_BYTES,
+                 user_types=None, collection_size=(1, 5), text_size=(8, 32), blob_size=(8, 64)):
+        self.column_types = column_types
+        self.pool_size = pool_size
+        self.user_types = user_types or {}
+        self.collection_size = collection_size
+        self.text_size = text_size
+        self.blob_size = blob_size
+        buffer_size = max(buffer_size, 2 * max(text_size[1], blob_size[1]))
+        raw = random.randbytes(buffer_size)
+        table = bytes(TEXT_ALPHABET[i % len(TEXT_ALPHABET)] for i in range(256))
+        self.text_buffer = raw.translate(table).decode('ascii')
+        self.blob_buffer = memoryview(random.randbytes(buffer_size))
+        self.pools = {}
+
+    @staticmethod
+    def slicer(buffer, min_length, max_length):
+        """Function returning a slice of random offset and length from `buffer`."""
+        rand = random.random
+        span = max_length - min_length + 1
+        limit = len(buffer) - max_length
+
+        def value():
+            start = int(rand() * limit)
+            return buffer[start:start + min_length + int(rand() * span)]
+        return value
+
+    def column_generator(self, cql_type):
+        """Zero-argument function returning a random value of `cql_type`, or None if unsupported."""
+        return self.type_generator(parse_cql_type(cql_type))
+
+    def type_generator(self, cql_type, hashable=False):
+        """
+        Generator function for a parsed CqlType, or None if the type cannot be
+        generated. hashable=True (set elements and map keys) builds nested
+        lists as tuples and sets as frozensets, and gives up on maps.
+        """
+        name, params = cql_type.name, cql_type.params
+        if name == 'frozen' and params:
+            return self.type_generator(params[0], hashable)
+
+        if name in ('list', 'set') and len(params) == 1:
+            element = self.type_generator(params[0], hashable=hashable or name == 'set')
+            if element is None:
+                return None
+            count = self.count_generator()
+            if name == 'set':
+                container = frozenset if hashable else set
+            else:
+                container = tuple if hashable else list
+            return lambda: container(element() for _ in range(count()))
+
+        if name == 'map' and len(params) == 2:
+            key = self.type_generator(params[0], hashable=True)
+            value = self.type_generator(params[1])
+            if hashable or key is None or value is None:
+                return None
+            count = self.count_generator()
+            return lambda: {key(): value() for _ in range(count())}
+
+        if name == 'tuple' and params:
+            return self.fields_generator(params, hashable)
+
+        udt_name = cql_type.raw.split('.')[-1].strip('"')
+        udt = self.user_types.get(udt_name)
+        if udt is not None and not params:
+            fields = self.fields_generator([parse_cql_type(t) for t in udt.values()], hashable)
+            if fields is None:
+                return None
+            udt_class = namedtuple(udt_name, list(udt), rename=True)
+            return lambda: udt_class._make(fields())
+
+        if params:
+            return None
+        return self.scalar_generator(name)
+
+    def fields_generator(self, field_types, hashable):
+        """Generator of tuples with one value per field type (tuple and UDT values)."""
+        fields = [self.type_generator(field_type, hashable) for field_type in field_types]
+        if any(field is None for field in fields):
+            return None
+        return lambda: tuple([field() for field in fields])
+
+    def count_generator(self):
+        """Function returning a random element count in collection_size."""
+        rand = random.random
+        low, high = self.collection_size
+        span = high - low + 1
+        return lambda: low + int(rand() * span)
+
+    def scalar_generator(self, t):
+        """Generator of a scalar type: buffer slices for text and blob, a value pool otherwise."""
+        if t in ('text', 'varchar', 'ascii'):
+            return self.slicer(self.text_buffer, *self.text_size)
+        if t == 'blob':
+            return self.slicer(self.blob_buffer, *self.blob_size)
+
+        pool = self.pools.get(t)
+        if pool is None:
+            pool = self.pools[t] = [generate_value(t) for _ in range(self.pool_size)]
+        if pool[0] is None:
+            return None
+        rand = random.random
+        size = len(pool)
+        return lambda: pool[int(rand() * size)]
+
+    def text(self, length):
+        """Random alphanumeric string of `length` characters (at most the buffer size)."""
+        length = min(length, len(self.text_buffer))
+        start = int(random.random() * (len(self.text_buffer) - length + 1))
+        return self.text_buffer[start:start + length]
+
+    def blob(self, length):
+        """Random zero-copy blob of `length` bytes (at most the buffer size)."""
+        length = min(length, len(self.blob_buffer))
+        start = int(random.random() * (len(self.blob_buffer) - length + 1))
+        return self.blob_buffer[start:start + length]
+
+    def row_generator(self, column_names):
+        """Function returning a list of random values for `column_names`, in order."""
+        generators = [self.column_generator(self.column_types[col]) or (lambda: None)
+                      for col in column_names]
+        return lambda: [generate() for generate in generators]
+
+
+def parse_size_range(text):
+    """Parse 'N' or 'MIN-MAX' into a (min, max) tuple of non-negative ints."""
+    low, _, high = text.partition('-')
+    try:
+        size_range = (int(low), int(high or low))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected N or MIN-MAX, got {text!r}")
+    if size_range[0] < 0 or size_range[0] > size_range[1]:
+        raise argparse.ArgumentTypeError(f"invalid range {text!r}")
+    return size_range
+
+
+# ---------------------------------------------------------------------------
+# Row size targets
+# ---------------------------------------------------------------------------
+
+ROW_SIZE_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+# Column types whose values are resized to reach a target row size
+PADDING_TYPES = ('text', 'varchar', 'ascii', 'blob')
+
+
+def build_row_size_distribution(size_range, dist='fixed', stdev=None):
+    """
+    Return a function drawing target row sizes in bytes for a (min, max) range
+    (min == max for a single size):
+      fixed      always the midpoint
+      uniform    uniformly between min and max
+      normal     normal around the midpoint with `stdev` (default: 10% of it)
+      lognormal  lognormal with the same mean and stdev, for long-tailed tables
+    Draws are clipped to the range, or to [1, MAX_ROW_SIZE_BYTES] for a single size.
+    """
+    low, high = size_range
+    mean = (low + high) / 2
+    if stdev is None:
+        stdev = mean / 10
+    if low == high:
+        low, high = 1, MAX_ROW_SIZE_BYTES
+
+    def clip(size):
+        return min(max(int(size), low), high)
+
+    if dist == 'fixed':
+        size = clip(mean)
+        return lambda: size
+    if dist == 'uniform':
+        return lambda: random.randint(low, high)
+    if dist == 'normal':
+        return lambda: clip(random.gauss(mean, stdev))
+    if dist == 'lognormal':
+        sigma = math.sqrt(math.log(1 + (stdev / mean) ** 2))
+        mu = math.log(mean) - sigma ** 2 / 2
+        return lambda: clip(random.lognormvariate(mu, sigma))
+    raise ValueError(f"Unknown row size distribution: {dist}")
+
+
+def load_row_size_distribution(path, table_name):
+    """
+    Return (function drawing row sizes, description) from a row size sampler
+    line for `table_name` in `path` (the output of row_size_sampler.py or
+    row_size_dump.py; any single line is used if none matches). Lines with a
+    histogram are sampled bucket by bucket, older lines as a normal distribution
+    with their average and stdev, clipped to their min and max.
+    """
+    with open(path, 'r') as f:
+        tables = dict(parsed for parsed in map(parse_row_size_line, f) if parsed)
+    if table_name not in tables:
+        if len(tables) != 1:
+            raise ValueError(f"{path} has no row size line for {table_name}")
+        table_name, = tables
+    fields = tables[table_name]
+
+    histogram = RowSizeHistogram.from_fields(fields)
+    if histogram is not None:
+        return (histogram.size_sampler(),
+                f"{table_name} histogram ({histogram.count} rows, average {histogram.average:.0f} bytes)")
+
+    def number(key):
+        return float(fields.get(key, '0').split()[0])
+    average, stdev = number('average'), number('stdev')
+    if not average:
+        raise ValueError(f"{path} has no row sizes for {table_name}")
+    low = max(1, int(number('min')))
+    high = max(low, int(number('max')))
+    return (lambda: min(max(int(random.gauss(average, stdev)), low), high),
+            f"{table_name} average {average:.0f} bytes, stdev {stdev:.0f} bytes")
+
+
+class PaddedRowGenerator:
+    """
+    Regular column values sized so that the encoded size of each row (the
+    calculate_row_size throughput size, as row_size_sampler.py reports it)
+    follows a target distribution. The other columns are generated by a
+    ValueGenerator and the row is sized with a RowSizer over the written
+    columns; the text and blob regular columns then share the remaining bytes.
+    Rows whose other columns alone exceed the target get empty padding.
+    """
+
+    def __init__(self, values, schema, writable_regular, target_size):
+        column_types = schema['column_types']
+        self.values = values
+        self.target_size = target_size
+        self.writable_regular = writable_regular
+        self.pad_columns = [col for col in writable_regular
+                            if parse_cql_type(column_types[col]).name in PADDING_TYPES]
+        self.pad_blob = [parse_cql_type(column_types[col]).name == 'blob' for col in self.pad_columns]
+        self.other_columns = [col for col in writable_regular if col not in self.pad_columns]
+        self.other_values = values.row_generator(self.other_columns)
+
+        # calculate_row_size arguments for the columns actually written
+        self.table_schema = build_table_schema(table_columns(schema, writable_regular),
+                                               schema.get('user_types'))
+        self.sizer = RowSizer(**self.table_schema)
+        self.pad_overhead = len(self.pad_columns) * self.sizer.column_id_size
+
+    def row(self, pk_vals, ck_vals):
+        """Return (row dict including keys, target size) for one generated row."""
+        row = dict(pk_vals)
+        row.update(ck_vals)
+        row.update(zip(self.other_columns, self.other_values()))
+        target = self.target_size()
+        remaining = max(0, target - self.sizer.size_row(row) - self.pad_overhead)
+        share, extra = divmod(remaining, len(self.pad_columns))
+        for i, (col, is_blob) in enumerate(zip(self.pad_columns, self.pad_blob)):
+            length = share + (1 if i < extra else 0)
+            row[col] = self.values.blob(length) if is_blob else self.values.text(length)
+        return row, target
+
+    def __call__(self, pk_vals, ck_vals):
+        row, _ = self.row(pk_vals, ck_vals)
+        return [row[col] for col in self.writable_regular]
+
+    def check(self, keys, sample_rows=1000):
+        """
+        Size `sample_rows` generated rows with calculate_row_size and return
+        (target histogram, generated histogram, rows above target).
+        """
+        targets = RowSizeHistogram()
+        generated = RowSizeHistogram()
+        above = 0
+        for n in range(min(sample_rows, keys.size)):
+            row, target = self.row(*keys.inserted_key(n))
+            size = calculate_row_size(row, **self.table_schema)
+            targets.add(target)
+            generated.add(size)
+            above += size > target
+        return targets, generated, above
+
+
+def print_row_size_check(targets, generated, above):
+    """Print the target and generated row size distributions side by side."""
+    print(f"\nRow size check (calculate_row_size on {generated.count} generated rows):")
+    for label, histogram in (('target', targets), ('generated', generated)):
+        print(f"  {label + ':':<11} avg {histogram.average:.0f} bytes, p50 {histogram.percentile(50)}, "
+              f"p99 {histogram.percentile(99)}, max {histogram.max}, "
+              f"{histogram.expected_write_units:.2f} WCU / {histogram.expected_read_units:.2f} RCU per row")
+    if above:
+        print(f"  {above} rows exceed their target: their non-padding columns alone are larger")
+
+
+# ---------------------------------------------------------------------------
+# Lazy key space
+# ---------------------------------------------------------------------------
+
+# Odd multiplier that spreads consecutive ordinals over an integer type's range
+ORDINAL_SPREAD = 0x9E3779B97F4A7C15
+
+INTEGER_KEY_BITS = {'tinyint': 8, 'smallint': 16, 'int': 32, 'bigint': 64, 'varint': 64}
+
+# Number of distinct values key_value can derive for the bounded key types;
+# any type not listed here and not integer is unbounded (or unsupported, see key_capacity)
+KEY_TYPE_CAPACITY = {
+    'boolean': 2, 'float': 1 << 24, 'double': 1 << 53, 'inet': 1 << 32,
+    'uuid': 1 << 62, 'timeuuid': 1 << 40, 'timestamp': 1 << 40, 'date': 1 << 16,
+    'time': 86400 * 10**9, 'blob': 1 << 64,
+}
+
+UNBOUNDED_KEY_CAPACITY = 1 << 64
+
+TIMESTAMP_KEY_BASE = datetime(2020, 1, 1)
+
+# 100ns intervals from the UUID epoch (1582-10-15) to 2020-01-01
+TIMEUUID_KEY_BASE = 0x01B21DD213814000 + 1577836800 * 10**7
+
+
+def column_capacity(cql_type):
+    """Distinct values key_value can derive for a key column type; 0 if unsupported."""
+    t = cql_type.lower()
+    if t.startswith(('frozen', 'list', 'set', 'map', 'tuple')):
+        return 0
+    if t in INTEGER_KEY_BITS:
+        return 1 << INTEGER_KEY_BITS[t]
+    return KEY_TYPE_CAPACITY.get(t, UNBOUNDED_KEY_CAPACITY)
+
+
+def key_capacity(column_names, column_types):
+    """Number of distinct keys over a set of key columns (the product of their capacities)."""
+    capacity = 1
+    for col in column_names:
+        capacity *= column_capacity(column_types[col])
+    return capacity
+
+
+def key_value(cql_type, ordinal, seed):
+    """
+    Value number `ordinal` of a key column type. The mapping is injective on
+    range(column_capacity(cql_type)) for a given seed, so distinct ordinals
+    always give distinct keys. Integer, uuid, timeuuid, blob and text values
+    also depend on the seed, so runs with different seeds write different rows.
+    """
+    t = cql_type.lower()
+    if t in INTEGER_KEY_BITS:
+        bits = INTEGER_KEY_BITS[t]
+        return ((ordinal * ORDINAL_SPREAD + seed) & ((1 << bits) - 1)) - (1 << (bits - 1))
+    elif t == 'boolean':
+        return bool(ordinal)
+    elif t in ('float', 'double'):
+        return float(ordinal)
+    elif t == 'decimal':
+        from decimal import Decimal
+        return Decimal(ordinal)
+    elif t == 'uuid':
+        return uuid.UUID(int=((seed & 0xFFFFFFFFFFFFFFFF) << 64) | ordinal, version=4)
+    elif t == 'timeuuid':
+        ts = TIMEUUID_KEY_BASE + ordinal
+        clock_seq = seed & 0x3FFF
+        return uuid.UUID(fields=(ts & 0xFFFFFFFF, (ts >> 32) & 0xFFFF, ((ts >> 48) & 0x0FFF) | 0x1000,
+                                 0x80 | (clock_seq >> 8), clock_seq & 0xFF,
+                                 ((seed >> 16) & 0xFFFFFFFFFFFF) | 0x010000000000))
+    elif t == 'timestamp':
+        return TIMESTAMP_KEY_BASE + timedelta(milliseconds=ordinal)
+    elif t == 'date':
+        from cassandra.util import Date
+        return Date(ordinal)
+    elif t == 'time':
+        from cassandra.util import Time
+        return Time(ordinal)
+    elif t == 'blob':
+        return ((ordinal * ORDINAL_SPREAD + seed) & 0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big')
+    elif t == 'inet':
+        return str(ipaddress.IPv4Address(ordinal))
+    else:
+        return f"{seed & 0xFFFFFF:06x}-{ordinal:x}"
+
+
+class IndexPermutation:
+    """
+    Pseudo-random bijection over range(size) in O(1) memory: a Feistel network
+    over the smallest even number of bits that covers `size`, with cycle
+    walking to map back into the range (fewer than four passes on average).
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size, seed):
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.mask = (1 << self.half_bits) - 1
+        rng = random.Random(seed)
+        self.keys = [rng.getrandbits(64) for _ in range(self.ROUNDS)]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        half_bits, mask = self.half_bits, self.mask
+        value = index
+        while True:
+            left, right = value >> half_bits, value & mask
+            for key in self.keys:
+                mixed = ((right ^ key) * ORDINAL_SPREAD) & 0xFFFFFFFFFFFFFFFF
+                left, right = right, left ^ ((mixed ^ (mixed >> 29)) & mask)
+            value = (left << half_bits) | right
+            if value < self.size:
+                return value
+
+
+class KeySpace:
+    """
+    The pk x ck row keys of a benchmark run, derived on demand instead of being
+    materialized. Row index i maps to partition ordinal i // ck_count and
+    clustering ordinal i % ck_count, and each ordinal to key values through
+    key_value (spread over multiple key columns as mixed-radix digits), so
+    keys are unique without being stored. Insert number n writes row
+    order[n], a seeded IndexPermutation, which visits every row once in random
+    order; the rows written by the first n inserts are order[0..n-1], so reads
+    can pick any of them by index. With grouped=True the permutation is over
+    partitions instead, and inserts fill one partition after the other (all of
+    its clustering ordinals in turn), so consecutive inserts share a partition.
+
+    With shard=(index, shards) only partition ordinals congruent to `index`
+    modulo `shards` are used, which keeps concurrent workers on disjoint
+    partitions.
+    """
+
+    def __init__(self, partition_keys, clustering_keys, column_types, pk_count, ck_count,
+                 seed, shard=None, grouped=False):
+        self.partition_keys = partition_keys
+        self.clustering_keys = clustering_keys
+        self.column_types = column_types
+        self.seed = seed
+        self.shard_index, self.shards = shard or (0, 1)
+
+        pk_capacity = key_capacity(partition_keys, column_types)
+        shard_capacity = max(0, (pk_capacity - self.shard_index + self.shards - 1) // self.shards)
+        self.pk_count = min(pk_count, shard_capacity)
+        if clustering_keys:
+            self.ck_count = min(ck_count, key_capacity(clustering_keys, column_types))
+        else:
+            self.ck_count = 1
+        self.size = self.pk_count * self.ck_count
+        self.grouped = grouped
+        if not self.size:
+            self.order = None
+        elif grouped:
+            self.order = IndexPermutation(self.pk_count, seed)
+        else:
+            self.order = IndexPermutation(self.size, seed)
+
+    def key_values(self, column_names, ordinal):
+        """Dict of key values for `ordinal`, one mixed-radix digit per column."""
+        values = {}
+        for col in column_names:
+            cql_type = self.column_types[col]
+            ordinal, digit = divmod(ordinal, column_capacity(cql_type))
+            values[col] = key_value(cql_type, digit, self.seed)
+        return values
+
+    def row_key(self, index):
+        """(pk_vals, ck_vals) of row `index`."""
+        pk_ordinal, ck_ordinal = divmod(index, self.ck_count)
+        pk_vals = self.key_values(self.partition_keys, pk_ordinal * self.shards + self.shard_index)
+        ck_vals = self.key_values(self.clustering_keys, ck_ordinal) if self.clustering_keys else {}
+        return pk_vals, ck_vals
+
+    def inserted_key(self, n):
+        """(pk_vals, ck_vals) written by insert number `n`."""
+        if self.grouped:
+            pk_index, ck_ordinal = divmod(n, self.ck_count)
+            return self.row_key(self.order[pk_index] * self.ck_count + ck_ordinal)
+        return self.row_key(self.order[n])
+
+
 # ---------------------------------------------------------------------------
 # Prepared statement builders
 # ---------------------------------------------------------------------------
 
-def build_insert_statement(session, keyspace, table, all_columns):
+def build_insert_statement(session, keyspace, table, all_columns, ttl=None):
     """
-    Build and return a prepared INSERT statement covering all provided columns.
+    Build and return a prepared INSERT statement covering all provided columns,
+    written with a TTL of `ttl` seconds if given.
     """
     col_names = ', '.join(all_columns)
     placeholders = ', '.join(['?'] * len(all_columns))
     cql = f"INSERT INTO {keyspace}.{table} ({col_names}) VALUES ({placeholders})"
+    if ttl:
+        cql += f" USING TTL {ttl}"
     print(f"  Preparing INSERT: {cql}")
     try:
         stmt = session.prepare(cql)
@@ -222,68 +790,786 @@ def build_read_partition_clustering_statement(session, keyspace, table, partitio
     return stmts
 
 
+def build_update_statement(session, keyspace, table, key_columns, set_columns):
+    """
+    Build and return a prepared UPDATE of `set_columns` by full primary key.
+    Bind values are the new column values followed by the key values.
+    """
+    set_clause = ', '.join([f"{col} = ?" for col in set_columns])
+    where_clause = ' AND '.join([f"{col} = ?" for col in key_columns])
+    cql = f"UPDATE {keyspace}.{table} SET {set_clause} WHERE {where_clause}"
+    return session.prepare(cql)
+
+
+def build_delete_statement(session, keyspace, table, key_columns):
+    """
+    Build and return a prepared DELETE of one row by full primary key.
+    """
+    where_clause = ' AND '.join([f"{col} = ?" for col in key_columns])
+    cql = f"DELETE FROM {keyspace}.{table} WHERE {where_clause}"
+    return session.prepare(cql)
+
+
+def build_scan_statement(session, keyspace, table, partition_keys, clustering_key, limit):
+    """
+    Build and return a prepared range scan within a partition: rows from a
+    value of the first clustering column onwards, at most `limit` of them.
+    """
+    where_clause = ' AND '.join([f"{col} = ?" for col in partition_keys])
+    cql = (f"SELECT * FROM {keyspace}.{table} WHERE {where_clause} "
+           f"AND {clustering_key} >= ? LIMIT {limit}")
+    return session.prepare(cql)
+
+
+# ---------------------------------------------------------------------------
+# Mixed workloads
+# ---------------------------------------------------------------------------
+
+# Operation types of a mixed workload, in report order:
+#   write           INSERT of the next row of the key space
+#   ttl_write       the same INSERT, USING TTL
+#   update          UPDATE of the regular columns of a written row
+#   delete          DELETE of a written row
+#   read_partition  SELECT * by partition key
+#   read_row        SELECT * by partition key and 1..N clustering columns
+#   scan            SELECT * by partition key from a clustering value, with LIMIT
+WORKLOAD_OPERATIONS = ('write', 'ttl_write', 'update', 'delete', 'read_partition', 'read_row', 'scan')
+
+DEFAULT_WORKLOAD_OPERATIONS = 10000
+DEFAULT_TTL_SECONDS = 86400
+DEFAULT_SCAN_LIMIT = 100
+
+# mix is {operation type: weight}; operations the number of operations of the phase
+Workload = namedtuple('Workload', ['mix', 'operations', 'ttl', 'scan_limit'])
+
+
+def parse_mix(text):
+    """Parse 'op=weight,op=weight,...' into a {operation type: weight} dict."""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in WORKLOAD_OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"unknown operation {name!r} (expected one of {', '.join(WORKLOAD_OPERATIONS)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected {name}=WEIGHT, got {item!r}")
+    return mix
+
+
+def build_workload(mix, operations=None, ttl=None, scan_limit=None):
+    """
+    Validate a workload definition and return it as a Workload, with defaults
+    for the options left out. Raises ValueError for unknown operation types,
+    negative weights or a mix without any weight.
+    """
+    unknown = sorted(set(mix) - set(WORKLOAD_OPERATIONS))
+    if unknown:
+        raise ValueError(f"unknown workload operations: {', '.join(unknown)} "
+                         f"(expected {', '.join(WORKLOAD_OPERATIONS)})")
+    mix = {name: float(mix[name]) for name in WORKLOAD_OPERATIONS if name in mix}
+    if any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+        raise ValueError("workload weights must be non-negative and not all zero")
+    workload = Workload(
+        mix={name: weight for name, weight in mix.items() if weight},
+        operations=int(DEFAULT_WORKLOAD_OPERATIONS if operations is None else operations),
+        ttl=int(ttl or DEFAULT_TTL_SECONDS),
+        scan_limit=int(scan_limit or DEFAULT_SCAN_LIMIT),
+    )
+    if workload.operations < 0 or workload.ttl <= 0 or workload.scan_limit <= 0:
+        raise ValueError("workload operations must be >= 0, ttl and scan_limit positive")
+    return workload
+
+
+def load_workload(path):
+    """
+    Read a workload definition from a YAML file (JSON without PyYAML): a
+    mapping with a `mix` of {operation type: weight} and optional
+    `operations`, `ttl` and `scan_limit`, e.g.
+
+        mix: {read_row: 60, read_partition: 10, write: 20, ttl_write: 5, delete: 5}
+        operations: 100000
+        ttl: 3600
+
+    Returns a dict of build_workload arguments.
+    """
+    with open(path, 'r') as f:
+        if yaml is not None:
+            definition = yaml.safe_load(f)
+        elif path.endswith('.json'):
+            definition = json.load(f)
+        else:
+            raise ValueError(f"PyYAML is required to read {path}: pip install pyyaml")
+    if not isinstance(definition, dict) or not isinstance(definition.get('mix'), dict):
+        raise ValueError(f"{path} must define a 'mix' mapping of operation type to weight")
+    unknown = sorted(set(definition) - {'mix', 'operations', 'ttl', 'scan_limit'})
+    if unknown:
+        raise ValueError(f"{path}: unknown workload keys: {', '.join(unknown)}")
+    return definition
+
+
+def describe_mix(mix):
+    """'name share, ...' summary of a workload mix."""
+    total = sum(mix.values())
+    return ', '.join(f"{name} {weight / total:.0%}" for name, weight in mix.items())
+
+
+# ---------------------------------------------------------------------------
+# Latency histograms
+# ---------------------------------------------------------------------------
+
+class LatencyHistogram:
+    """
+    Mergeable latency histogram in the style of HdrHistogram. Latencies are
+    kept in whole microseconds: exactly below 2**SUB_BUCKET_BITS, and above that
+    in log-scale buckets of 2**(SUB_BUCKET_BITS - 1) sub-buckets per power of
+    two, so percentiles are accurate to about 0.2% and the size depends on the
+    latency range rather than on the number of operations. Histograms are
+    plain picklable objects, which is how worker processes report back.
+    """
+
+    SUB_BUCKET_BITS = 10
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = None
+
+    @classmethod
+    def bucket_index(cls, value_us):
+        """Bucket of a value; each bucket is a contiguous range of microseconds."""
+        shift = value_us.bit_length() - cls.SUB_BUCKET_BITS
+        if shift <= 0:
+            return value_us
+        return (shift << cls.SUB_BUCKET_BITS) + (value_us >> shift)
+
+    @classmethod
+    def bucket_upper_bound(cls, index):
+        """Largest value in microseconds that falls into bucket `index`."""
+        shift = index >> cls.SUB_BUCKET_BITS
+        if shift == 0:
+            return index
+        sub_bucket = index & ((1 << cls.SUB_BUCKET_BITS) - 1)
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, latency_ms, count=1):
+        """Record one latency in milliseconds, `count` times."""
+        value_us = max(0, int(round(latency_ms * 1000)))
+        index = self.bucket_index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total_us += value_us * count
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if self.max_us is None or value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other):
+        """Add the counts of another histogram to this one."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        for us in (other.min_us, other.max_us):
+            if us is not None:
+                self.min_us = us if self.min_us is None else min(self.min_us, us)
+                self.max_us = us if self.max_us is None else max(self.max_us, us)
+        return self
+
+    def percentile(self, pct):
+        """Latency in milliseconds at or below which `pct` percent of the values fall."""
+        if not self.count:
+            return 0
+        rank = max(1, int(self.count * pct / 100 + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_upper_bound(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    @property
+    def min_ms(self):
+        return (self.min_us or 0) / 1000
+
+    @property
+    def max_ms(self):
+        return (self.max_us or 0) / 1000
+
+    @property
+    def mean_ms(self):
+        return self.total_us / self.count / 1000 if self.count else 0
+
+
+LATENCY_LOG_HEADER = ('timestamp,phase,interval_start_s,interval_s,count,ops_per_sec,'
+                      'p50_ms,p90_ms,p99_ms,p99_9_ms,max_ms')
+
+
+def open_latency_log(path):
+    """Open an interval latency log (CSV, see LatencyRecorder) and write its header."""
+    log = open(path, 'w', encoding='utf-8')
+    log.write(LATENCY_LOG_HEADER + '\n')
+    return log
+
+
+class LatencyRecorder:
+    """
+    Thread-safe latency sink for one benchmark phase. Every latency goes into
+    the phase histogram and, when a log is given, into an interval histogram
+    that snapshot() writes to the log as one CSV line and then resets, so
+    throughput and tail latency can be followed over the course of a run.
+    """
+
+    def __init__(self, phase, log=None, interval=10.0):
+        self.phase = phase
+        self.log = log
+        self.interval = interval
+        self.histogram = LatencyHistogram()
+        self.interval_histogram = LatencyHistogram()
+        self.lock = threading.Lock()
+        self.start = self.interval_start = time.monotonic()
+
+    def record(self, latency_ms):
+        with self.lock:
+            self.histogram.record(latency_ms)
+            if self.log:
+                self.interval_histogram.record(latency_ms)
+
+    def maybe_snapshot(self):
+        """Write a snapshot if the current interval has run its length."""
+        if self.log and time.monotonic() - self.interval_start >= self.interval:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write the current interval to the log and start the next one."""
+        now = time.monotonic()
+        with self.lock:
+            histogram, self.interval_histogram = self.interval_histogram, LatencyHistogram()
+        started, self.interval_start = self.interval_start, now
+        duration = now - started
+        rate = histogram.count / duration if duration > 0 else 0
+        percentiles = ','.join(f"{histogram.percentile(pct):.3f}" for pct in (50, 90, 99, 99.9))
+        self.log.write(f"{time.time():.3f},{self.phase},{started - self.start:.3f},{duration:.3f},"
+                       f"{histogram.count},{rate:.1f},{percentiles},{histogram.max_ms:.3f}\n")
+        self.log.flush()
+
+
+class OperationStats:
+    """
+    Thread-safe latency histograms and error counts keyed by operation type,
+    for phases that interleave several kinds of request (see run_operations).
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, latency_ms):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+            self.histograms[name].record(latency_ms)
+
+    def record_error(self, name):
+        with self.lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+class BatchStats:
+    """
+    Per-row view of a batched insert phase, passed to run_operations as
+    op_stats with the number of rows of each batch as its context: a row is
+    written when its batch is, so the batch's latency is recorded once per
+    row, and the rows of failed batches are counted as errors.
+    """
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.failed_rows = 0
+        self.lock = threading.Lock()
+
+    def record(self, rows, latency_ms):
+        with self.lock:
+            self.histogram.record(latency_ms, count=rows)
+
+    def record_error(self, rows):
+        with self.lock:
+            self.failed_rows += rows
+
+
+# ---------------------------------------------------------------------------
+# Operation execution
+# ---------------------------------------------------------------------------
+
+# Requests allowed in flight in --rate mode when --concurrency is left at 1
+OPEN_LOOP_MAX_IN_FLIGHT = 1024
+
+# Floor for scheduled rates, so a ramp starting at 0 ops/sec still advances
+MIN_SCHEDULED_RATE = 1.0
+
+RAMP_PROFILES = ('constant', 'step', 'linear', 'sine')
+
+
+def build_rate_profile(rate, ramp='constant', start_rate=0.0, duration=60.0, steps=5):
+    """
+    Return a function mapping seconds since the start of a phase to the target
+    ops/sec of the open-loop scheduler:
+      constant  `rate` throughout
+      step      `steps` equal steps from start_rate up to `rate` over `duration`, then `rate`
+      linear    straight line from start_rate to `rate` over `duration`, then `rate`
+      sine      oscillates between start_rate and `rate` with period `duration`
+    """
+    if ramp == 'constant' or duration <= 0:
+        return lambda elapsed: rate
+    span = rate - start_rate
+    if ramp == 'linear':
+        return lambda elapsed: start_rate + span * min(elapsed / duration, 1.0)
+    if ramp == 'step':
+        steps = max(steps, 2)
+        return lambda elapsed: start_rate + span * min(int(elapsed / duration * steps), steps - 1) / (steps - 1)
+    if ramp == 'sine':
+        return lambda elapsed: start_rate + span * (1 - math.cos(2 * math.pi * elapsed / duration)) / 2
+    raise ValueError(f"Unknown ramp profile: {ramp}")
+
+
+def run_operations(session, operations, total, label, concurrency=1, progress=True,
+                   rate=None, latency_log=None, log_interval=10.0, op_stats=None):
+    """
+    Execute `total` operations taken from an iterator of
+    (statement, bind_values, context) tuples and return
+    (LatencyHistogram, errors, elapsed_seconds). With `latency_log`, a snapshot
+    of the interval histogram is written every `log_interval` seconds (see
+    LatencyRecorder).
+
+    With concurrency 1 each operation is a blocking session.execute, so
+    throughput is bounded by the round-trip latency. With concurrency N, up to N
+    requests are kept in flight with execute_async: a semaphore bounds the
+    window, and the driver callbacks record the latency and release a slot.
+    progress=False silences the periodic progress lines. With `op_stats` (an
+    OperationStats), every latency and error is also recorded under the
+    operation's context, so a mixed phase can be reported per operation type.
+
+    `rate` (see build_rate_profile) switches to open-loop scheduling: operation
+    i+1 is due 1/rate seconds after operation i, independently of responses, and
+    latency is measured from the due time rather than the actual send time. If
+    the window is full or the client falls behind, the wait counts as latency
+    instead of silently lowering the offered load.
+    """
+    recorder = LatencyRecorder(label, latency_log, log_interval)
+    errors = 0
+    lock = threading.Lock()
+    start_time = time.time()
+
+    def record_latency(latency_ms, context):
+        recorder.record(latency_ms)
+        if op_stats:
+            op_stats.record(context, latency_ms)
+
+    def record_error(e, context):
+        nonlocal errors
+        if op_stats:
+            op_stats.record_error(context)
+        with lock:
+            errors += 1
+            if errors <= 3:
+                print(f"  {label.capitalize()} error ({errors}): {e}")
+
+    def report_progress(done):
+        recorder.maybe_snapshot()
+        if progress and (done % 500 == 0 or done == total):
+            elapsed = time.time() - start_time
+            rate = done / elapsed if elapsed > 0 else 0
+            print(f"  {done}/{total} {label}s  ({rate:.0f} ops/sec)")
+
+    if concurrency <= 1 and rate is None:
+        for i, (statement, bind_values, context) in enumerate(islice(operations, total)):
+            try:
+                t0 = time.monotonic()
+                session.execute(statement, bind_values)
+                record_latency((time.monotonic() - t0) * 1000, context)
+            except Exception as e:
+                record_error(e, context)
+            report_progress(i + 1)
+        elapsed = time.time() - start_time
+        return finish_recording(recorder), errors, elapsed
+
+    if concurrency <= 1:
+        concurrency = OPEN_LOOP_MAX_IN_FLIGHT
+    window = threading.BoundedSemaphore(concurrency)
+
+    def on_result(_, t0, context):
+        record_latency((time.monotonic() - t0) * 1000, context)
+        window.release()
+
+    def on_error(e, t0, context):
+        window.release()
+        record_error(e, context)
+
+    schedule_start = due = time.monotonic()
+    for i, (statement, bind_values, context) in enumerate(islice(operations, total)):
+        if rate is not None:
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        window.acquire()
+        t0 = due if rate is not None else time.monotonic()
+        try:
+            future = session.execute_async(statement, bind_values)
+        except Exception as e:
+            on_error(e, t0, context)
+        else:
+            future.add_callbacks(callback=on_result, callback_args=(t0, context),
+                                 errback=on_error, errback_args=(t0, context))
+        report_progress(i + 1)
+        if rate is not None:
+            due += 1.0 / max(rate(due - schedule_start), MIN_SCHEDULED_RATE)
+
+    # Wait for the requests still in flight by taking every slot of the window
+    for _ in range(concurrency):
+        window.acquire()
+    elapsed = time.time() - start_time
+    for _ in range(concurrency):
+        window.release()
+
+    return finish_recording(recorder), errors, elapsed
+
+
+def finish_recording(recorder):
+    """Flush the last partial interval of a recorder and return its phase histogram."""
+    if recorder.log and recorder.interval_histogram.count:
+        recorder.snapshot()
+    return recorder.histogram
+
+
+# ---------------------------------------------------------------------------
+# Batched inserts
+# ---------------------------------------------------------------------------
+
+BATCH_MODES = ('same-partition', 'cross-partition')
+
+
+def count_batches(rows, batch_size, partition_rows=None):
+    """
+    Number of batches of at most `batch_size` rows needed to write `rows`
+    consecutive inserts; with `partition_rows`, batches never span two
+    partitions of that many rows.
+    """
+    if not partition_rows:
+        return -(-rows // batch_size)
+    full, rest = divmod(rows, partition_rows)
+    return full * -(-partition_rows // batch_size) + -(-rest // batch_size)
+
+
+def batch_operations(rows, batch_size, partition_rows=None):
+    """
+    Group an iterator of (statement, bind_values) rows into unlogged
+    BatchStatements of up to `batch_size` rows, cut at every `partition_rows`
+    rows if given (see count_batches). Yields run_operations tuples whose
+    context is the number of rows in the batch.
+    """
+    batch, size = None, 0
+    for n, (statement, bind_values) in enumerate(rows):
+        if size and (size == batch_size or (partition_rows and n % partition_rows == 0)):
+            yield batch, None, size
+            size = 0
+        if not size:
+            batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        batch.add(statement, bind_values)
+        size += 1
+    if size:
+        yield batch, None, size
+
+
+# ---------------------------------------------------------------------------
+# Partition scans
+# ---------------------------------------------------------------------------
+
+# The driver's default page size
+DEFAULT_FETCH_SIZE = 5000
+
+
+class ScanTotals:
+    """Accumulated rows, pages, read units, time and latencies of a set of partition scans."""
+
+    def __init__(self):
+        self.scans = 0
+        self.rows = 0
+        self.pages = 0
+        self.read_units = 0
+        self.seconds = 0.0
+        self.first_row = LatencyHistogram()
+        self.scan = LatencyHistogram()
+
+    def record(self, rows, pages, first_row_ms, scan_ms, read_units):
+        self.scans += 1
+        self.rows += rows
+        self.pages += pages
+        self.read_units += read_units
+        self.seconds += scan_ms / 1000
+        self.first_row.record(first_row_ms)
+        self.scan.record(scan_ms)
+
+    def merge(self, other):
+        self.scans += other.scans
+        self.rows += other.rows
+        self.pages += other.pages
+        self.read_units += other.read_units
+        self.seconds += other.seconds
+        self.first_row.merge(other.first_row)
+        self.scan.merge(other.scan)
+        return self
+
+
+class ScanStats:
+    """
+    Results of full partition scans, in total and by partition width: the
+    number of rows a scan returned, in power-of-two buckets (bucket b holds
+    widths 2**(b-1) to 2**b - 1, bucket 0 empty partitions). Plain picklable
+    objects, merged like LatencyHistogram across worker processes.
+    """
+
+    def __init__(self, fetch_size):
+        self.fetch_size = fetch_size
+        self.total = ScanTotals()
+        self.widths = {}
+
+    def record(self, rows, pages, first_row_ms, scan_ms, read_units):
+        width = rows.bit_length()
+        if width not in self.widths:
+            self.widths[width] = ScanTotals()
+        self.widths[width].record(rows, pages, first_row_ms, scan_ms, read_units)
+        self.total.record(rows, pages, first_row_ms, scan_ms, read_units)
+
+    def merge(self, other):
+        for width, totals in other.widths.items():
+            self.widths.setdefault(width, ScanTotals()).merge(totals)
+        self.total.merge(other.total)
+        return self
+
+    @staticmethod
+    def width_label(width):
+        if width <= 1:
+            return str(width)
+        return f"{1 << (width - 1)}-{(1 << width) - 1}"
+
+
+def result_row_sizer(schema):
+    """
+    Function returning the encoded size (see RowSizer) of a row read back
+    from the table as a driver named tuple. Values are converted with
+    to_row_value, so driver collections and UDT values are sized as such;
+    null columns are not stored and are left out.
+    """
+    sizer = RowSizer(**build_table_schema(table_columns(schema, schema['regular_columns']),
+                                          schema.get('user_types')))
+    return lambda row: sizer.size_row({col: to_row_value(value) for col, value in row._asdict().items()
+                                       if value is not None})
+
+
+def run_scans(session, statement, partitions, total, fetch_size, size_row=None,
+              concurrency=1, progress=True):
+    """
+    Read `total` partitions, whose bind values are taken from the iterator
+    `partitions`, to the end with `fetch_size` rows per page, on `concurrency`
+    threads of blocking requests. Returns (ScanStats, errors, elapsed_seconds).
+
+    For each scan the time to the first page (the first row), the time to the
+    last page and the rows and pages returned are recorded. With `size_row`
+    (see result_row_sizer) each page is also charged
+    max(1, ceil(page bytes / 4 KB)) estimated read units, the metering of a
+    strongly consistent read request; the sizing is not counted in the scan
+    time.
+    """
+    stats = ScanStats(fetch_size)
+    lock = threading.Lock()
+    errors = 0
+    done = 0
+    start_time = time.time()
+    partitions = islice(partitions, total)
+
+    def scan(bind_values):
+        t0 = time.monotonic()
+        result = session.execute(statement, bind_values)
+        first_row_ms = (time.monotonic() - t0) * 1000
+        rows = pages = read_units = 0
+        sizing = 0.0
+        while True:
+            page = result.current_rows
+            rows += len(page)
+            pages += 1
+            if size_row:
+                s0 = time.monotonic()
+                read_units += max(1, -(-sum(map(size_row, page)) // READ_UNIT_BYTES))
+                sizing += time.monotonic() - s0
+            if not result.has_more_pages:
+                break
+            result.fetch_next_page()
+        scan_ms = (time.monotonic() - t0 - sizing) * 1000
+        with lock:
+            stats.record(rows, pages, first_row_ms, scan_ms, read_units)
+
+    def worker():
+        nonlocal errors, done
+        while True:
+            with lock:
+                bind_values = next(partitions, None)
+            if bind_values is None:
+                return
+            try:
+                scan(bind_values)
+            except Exception as e:
+                with lock:
+                    errors += 1
+                    if errors <= 3:
+                        print(f"  Scan error ({errors}): {e}")
+            with lock:
+                done += 1
+                if progress and (done % 100 == 0 or done == total):
+                    elapsed = time.time() - start_time
+                    print(f"  {done}/{total} scans  ({done / elapsed:.0f} partitions/sec)")
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, min(concurrency, total)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, errors, time.time() - start_time
+
+
+def print_scan_widths(stats):
+    """Print per-partition scan results by partition width (see ScanStats)."""
+    print(f"\n  PARTITION SCANS BY WIDTH (fetch size {stats.fetch_size}, per partition):")
+    print(f"    {'Rows':>11} {'Scans':>7} {'Pages':>7} {'1st row p50':>11} {'Scan p50':>9} "
+          f"{'Scan p99':>9} {'Rows/sec':>10} {'Pages/sec':>9} {'RCU':>8}")
+    widths = [(ScanStats.width_label(width), stats.widths[width]) for width in sorted(stats.widths)]
+    for label, totals in widths + [('all', stats.total)]:
+        if not totals.scans:
+            continue
+        seconds = totals.seconds or float('inf')
+        print(f"    {label:>11} {totals.scans:>7} {totals.pages / totals.scans:>7.1f} "
+              f"{totals.first_row.percentile(50):>11.2f} {totals.scan.percentile(50):>9.2f} "
+              f"{totals.scan.percentile(99):>9.2f} {totals.rows / seconds:>10.0f} "
+              f"{totals.pages / seconds:>9.1f} {totals.read_units / totals.scans:>8.1f}")
+    print("    (latencies in ms; Pages and RCU, the estimated read units, per scan)")
+
+
 # ---------------------------------------------------------------------------
 # Benchmark runner
 # ---------------------------------------------------------------------------
 
 def run_benchmark(session, keyspace, table, schema, num_inserts, num_reads,
-                  pk_pool_size, ck_pool_size):
+                  pk_pool_size, ck_pool_size, concurrency=1, shard=None, verbose=True,
+                  rate=None, latency_log=None, log_interval=10.0, seed=None, value_options=None,
+                  row_size=None, workload=None, batch_size=1, batch_mode='same-partition',
+                  num_scans=0, fetch_size=DEFAULT_FETCH_SIZE):
     """
     Main benchmark loop:
-    1. Generate value pools for partition keys and clustering keys
-    2. Build all combinations as the insert pool
-    3. Prepare statements
-    4. Randomly insert (no duplicates until all combinations exhausted)
-    5. Randomly read (partition-only or partition+clustering)
+    1. Define the pk x ck key space (pk_pool_size partitions of ck_pool_size rows)
+    2. Prepare statements
+    3. Randomly insert (every row of the key space at most once)
+    4. Randomly read previously inserted rows (partition-only or partition+clustering),
+       or with a `workload` (see build_workload) run its operation mix instead
+    5. Read `num_scans` random written partitions to the end (see run_scans)
+
+    Inserts and reads keep `concurrency` requests in flight, or follow the
+    open-loop `rate` profile from the start of each phase, and write interval
+    snapshots to `latency_log` every `log_interval` seconds (see run_operations).
+    Keys are derived lazily from `seed` (random if None), and `shard`
+    restricts the partitions to one slice of the key space (see KeySpace).
+    `value_options` are extra ValueGenerator arguments (collection, text and
+    blob sizes), and `row_size` an optional (function drawing target row sizes,
+    description) pair that text and blob columns are padded to (see
+    PaddedRowGenerator). With verbose=False only errors are printed and the
+    summary is left to the caller.
+
+    Returns {'inserts': (count, LatencyHistogram, errors, elapsed), 'reads': ...},
+    or None when the benchmark could not run. With a workload, 'reads' is
+    replaced by 'mixed' for the whole mixed phase and one entry per operation
+    type issued (see WORKLOAD_OPERATIONS), all timed over the mixed phase.
+
+    With batch_size > 1 the inserts are written in unlogged batches (see
+    batch_operations): same-partition batches group consecutive rows of one
+    partition (the key space is then filled partition by partition),
+    cross-partition batches consecutive rows of the random insert order.
+    'batches' then holds the per-batch results and 'inserts' the per-row
+    ones: each row's latency is the latency of its batch, and the throughput
+    is the effective rows/sec.
+
+    Scans add 'scans' (count, scan LatencyHistogram, errors, elapsed) and
+    'scan_widths', their ScanStats.
     """
+    log = print if verbose else (lambda *a, **k: None)
     column_types = schema['column_types']
     partition_keys = schema['partition_keys']
     clustering_keys = schema['clustering_keys']
     regular_columns = schema['regular_columns']
 
-    # Determine which regular columns we can write to (skip complex types)
-    writable_regular = [c for c in regular_columns if generate_value(column_types[c]) is not None]
-
-    print(f"\n--- Schema for {keyspace}.{table} ---")
-    print(f"  Partition keys:  {partition_keys}")
-    print(f"  Clustering keys: {clustering_keys}")
-    print(f"  Regular columns: {regular_columns}")
-    print(f"  Static columns:  {schema['static_columns']}")
-    print(f"  Column types:    {column_types}")
-
-    # Step 1: Generate key value pools
-    print(f"\nGenerating {pk_pool_size} partition key values...")
-    pk_pool = generate_key_pool(partition_keys, column_types, pk_pool_size)
-    if not pk_pool:
+    # Determine which regular columns we can write to (skip types we cannot generate)
+    values = ValueGenerator(column_types, user_types=schema.get('user_types'), **(value_options or {}))
+    writable_regular = [c for c in regular_columns if values.column_generator(column_types[c]) is not None]
+
+    log(f"\n--- Schema for {keyspace}.{table} ---")
+    log(f"  Partition keys:  {partition_keys}")
+    log(f"  Clustering keys: {clustering_keys}")
+    log(f"  Regular columns: {regular_columns}")
+    log(f"  Static columns:  {schema['static_columns']}")
+    log(f"  Column types:    {column_types}")
+    if schema.get('user_types'):
+        log(f"  User types:      {schema['user_types']}")
+    skipped = [c for c in regular_columns if c not in writable_regular]
+    if skipped:
+        log(f"  Not written (unsupported types): {skipped}")
+
+    # Step 1: Define the key space; keys are derived on demand, never stored
+    if seed is None:
+        seed = random.getrandbits(64)
+    same_partition = batch_size > 1 and batch_mode == 'same-partition'
+    keys = KeySpace(partition_keys, clustering_keys, column_types, pk_pool_size, ck_pool_size,
+                    seed, shard=shard, grouped=same_partition)
+    if not keys.pk_count:
         print("ERROR: Could not generate partition key values. Check data types.")
         return
-    print(f"  Generated {len(pk_pool)} unique partition key combinations")
-
-    ck_pool = []
-    if clustering_keys:
-        print(f"Generating {ck_pool_size} clustering key values...")
-        ck_pool = generate_key_pool(clustering_keys, column_types, ck_pool_size)
-        if not ck_pool:
-            print("ERROR: Could not generate clustering key values. Check data types.")
+    if not keys.ck_count:
+        print("ERROR: Could not generate clustering key values. Check data types.")
+        return
+    if workload is not None:
+        if 'scan' in workload.mix and not clustering_keys:
+            print("ERROR: scan operations need a table with clustering columns.")
             return
-        print(f"  Generated {len(ck_pool)} unique clustering key combinations")
-
-    # Step 2: Build all insert combinations (pk x ck)
-    if ck_pool:
-        all_combos = [(pk, ck) for pk in pk_pool for ck in ck_pool]
-    else:
-        all_combos = [(pk, {}) for pk in pk_pool]
-
-    total_combos = len(all_combos)
-    print(f"\nTotal unique row combinations: {total_combos}")
-
-    effective_inserts = min(num_inserts, total_combos)
-    print(f"Inserts to perform: {effective_inserts} (requested: {num_inserts})")
-    print(f"Reads to perform:   {num_reads}")
-
-    # Step 3: Prepare statements
+        if 'update' in workload.mix and not writable_regular:
+            print("ERROR: update operations need at least one writable regular column.")
+            return
+    log(f"\nPartition keys:    {keys.pk_count} (requested: {pk_pool_size})")
+    if clustering_keys:
+        log(f"Clustering keys:   {keys.ck_count} per partition (requested: {ck_pool_size})")
+    log(f"Total unique row combinations: {keys.size} (key seed: {seed})")
+
+    effective_inserts = min(num_inserts, keys.size)
+    log(f"Inserts to perform: {effective_inserts} (requested: {num_inserts})")
+    if workload is None:
+        log(f"Reads to perform:   {num_reads}")
+    if num_scans:
+        log(f"Partition scans:    {num_scans} (fetch size {fetch_size})")
+    if workload is not None:
+        log(f"Mixed operations:   {workload.operations} ({describe_mix(workload.mix)})")
+        if 'ttl_write' in workload.mix:
+            log(f"TTL writes:         USING TTL {workload.ttl}")
+        if 'scan' in workload.mix:
+            log(f"Range scans:        LIMIT {workload.scan_limit}")
+    if batch_size > 1:
+        log(f"Batch size:         {batch_size} rows, unlogged, {batch_mode}")
+    log(f"Concurrency:        {concurrency}")
+    if rate is not None:
+        log(f"Target rate:        {rate(0):.0f} ops/sec at start (open-loop)")
+
+    # Step 2: Prepare statements
     all_insert_columns = partition_keys + clustering_keys + writable_regular
-    print(f"\nPreparing statements...")
+    log(f"\nPreparing statements...")
 
     prep_insert = build_insert_statement(session, keyspace, table, all_insert_columns)
     prep_read_pk = build_read_partition_statement(session, keyspace, table, partition_keys)
@@ -294,148 +1580,443 @@ def run_benchmark(session, keyspace, table, schema, num_inserts, num_reads,
             session, keyspace, table, partition_keys, clustering_keys
         )
 
-    print(f"  Prepared INSERT statement")
-    print(f"  Prepared {1 + len(prep_read_ck)} SELECT statements")
-
-    # Step 4: Randomized inserts (no repeats until pool exhausted)
-    print(f"\n--- Running {effective_inserts} inserts ---")
-    insert_queue = deque(random.sample(all_combos, total_combos))
-    inserted_rows = []
-
-    insert_latencies = []
-    insert_errors = 0
-    start_time = time.time()
-
-    for i in range(effective_inserts):
-        if not insert_queue:
-            # Reshuffle all combos for another pass
-            insert_queue = deque(random.sample(all_combos, total_combos))
+    prep_workload = {}
+    if workload is not None:
+        key_columns = partition_keys + clustering_keys
+        if 'ttl_write' in workload.mix:
+            prep_workload['ttl_write'] = build_insert_statement(
+                session, keyspace, table, all_insert_columns, ttl=workload.ttl
+            )
+        if 'update' in workload.mix:
+            prep_workload['update'] = build_update_statement(
+                session, keyspace, table, key_columns, writable_regular
+            )
+        if 'delete' in workload.mix:
+            prep_workload['delete'] = build_delete_statement(session, keyspace, table, key_columns)
+        if 'scan' in workload.mix:
+            prep_workload['scan'] = build_scan_statement(
+                session, keyspace, table, partition_keys, clustering_keys[0], workload.scan_limit
+            )
+
+    log(f"  Prepared INSERT statement")
+    log(f"  Prepared {1 + len(prep_read_ck)} SELECT statements")
+    if prep_workload:
+        log(f"  Prepared {len(prep_workload)} workload statements ({', '.join(prep_workload)})")
+
+    if row_size is not None:
+        regular_values = PaddedRowGenerator(values, schema, writable_regular, row_size[0])
+        if not regular_values.pad_columns:
+            log("\nWARNING: no text or blob regular column to pad, row sizes are not controlled")
+            regular_values = None
+        else:
+            log(f"\nTarget row sizes: {row_size[1]}, padding {regular_values.pad_columns}")
+            if verbose:
+                print_row_size_check(*regular_values.check(keys))
+    if row_size is None or regular_values is None:
+        row_values = values.row_generator(writable_regular)
+        regular_values = lambda pk_vals, ck_vals: row_values()
 
-        pk_vals, ck_vals = insert_queue.popleft()
-        reg_vals = generate_regular_values(writable_regular, column_types)
+    # Step 3: Randomized inserts, in the order of the key space permutation
+    log(f"\n--- Running {effective_inserts} inserts ---")
 
+    def insert_values(pk_vals, ck_vals):
         bind_values = []
         for col in partition_keys:
             bind_values.append(pk_vals[col])
         for col in clustering_keys:
             bind_values.append(ck_vals[col])
-        for col in writable_regular:
-            bind_values.append(reg_vals.get(col))
+        bind_values += regular_values(pk_vals, ck_vals)
+        return bind_values
+
+    def insert_operations():
+        for n in range(effective_inserts):
+            pk_vals, ck_vals = keys.inserted_key(n)
+            yield prep_insert, insert_values(pk_vals, ck_vals), None
+
+    if batch_size > 1:
+        partition_rows = keys.ck_count if same_partition else None
+        num_batches = count_batches(effective_inserts, batch_size, partition_rows)
+        rows = ((statement, bind_values) for statement, bind_values, _ in insert_operations())
+        batch_stats = BatchStats()
+        batch_latencies, batch_errors, insert_elapsed = run_operations(
+            session, batch_operations(rows, batch_size, partition_rows), num_batches, 'batch insert',
+            concurrency=concurrency, progress=verbose, rate=rate,
+            latency_log=latency_log, log_interval=log_interval, op_stats=batch_stats
+        )
+        insert_latencies = batch_stats.histogram
+        results = {
+            'batches': (num_batches, batch_latencies, batch_errors, insert_elapsed),
+            'inserts': (effective_inserts, insert_latencies, batch_stats.failed_rows, insert_elapsed),
+        }
+    else:
+        insert_latencies, insert_errors, insert_elapsed = run_operations(
+            session, insert_operations(), effective_inserts, 'insert',
+            concurrency=concurrency, progress=verbose, rate=rate,
+            latency_log=latency_log, log_interval=log_interval
+        )
+        results = {
+            'inserts': (effective_inserts, insert_latencies, insert_errors, insert_elapsed),
+        }
+
+    if workload is not None:
+        results.update(run_mixed_phase(
+            session, workload, keys, effective_inserts, insert_values, regular_values,
+            prep_insert, prep_read_pk, prep_read_ck, prep_workload,
+            log=log, concurrency=concurrency, progress=verbose, rate=rate,
+            latency_log=latency_log, log_interval=log_interval
+        ))
+    else:
+        # Step 4: Randomized reads of rows written by the inserts above
+        results['reads'] = (0, LatencyHistogram(), 0, 0.0)
+        log(f"\n--- Running {num_reads} reads ---")
+        if not insert_latencies.count:
+            log("  No rows inserted, skipping reads.")
+            return results
+        results['reads'] = run_reads(session, keys, effective_inserts, num_reads, prep_read_pk, prep_read_ck,
+                                     concurrency=concurrency, progress=verbose, rate=rate,
+                                     latency_log=latency_log, log_interval=log_interval)
+
+    # Step 5: Full scans of written partitions, page by page
+    if num_scans:
+        log(f"\n--- Running {num_scans} partition scans (fetch size {fetch_size}) ---")
+        if not insert_latencies.count:
+            log("  No rows inserted, skipping scans.")
+        else:
+            prep_scan = build_read_partition_statement(session, keyspace, table, partition_keys)
+            prep_scan.fetch_size = fetch_size
 
-        try:
-            t0 = time.monotonic()
-            session.execute(prep_insert, bind_values)
-            latency_ms = (time.monotonic() - t0) * 1000
-            insert_latencies.append(latency_ms)
-            inserted_rows.append((pk_vals, ck_vals))
-        except Exception as e:
-            insert_errors += 1
-            if insert_errors <= 3:
-                print(f"  Insert error ({insert_errors}): {e}")
+            def scan_partitions():
+                while True:
+                    pk_vals, _ = keys.inserted_key(int(random.random() * effective_inserts))
+                    yield [pk_vals[col] for col in partition_keys]
 
-        if (i + 1) % 500 == 0 or (i + 1) == effective_inserts:
-            elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed if elapsed > 0 else 0
-            print(f"  {i + 1}/{effective_inserts} inserts  ({rate:.0f} ops/sec)")
+            scan_stats, scan_errors, scan_elapsed = run_scans(
+                session, prep_scan, scan_partitions(), num_scans, fetch_size,
+                size_row=result_row_sizer(schema), concurrency=concurrency, progress=verbose
+            )
+            results['scans'] = (num_scans, scan_stats.total.scan, scan_errors, scan_elapsed)
+            results['scan_widths'] = scan_stats
 
-    insert_elapsed = time.time() - start_time
+    # Step 6: Print results
+    if verbose:
+        print_results(results)
+    return results
 
-    # Step 5: Randomized reads
-    print(f"\n--- Running {num_reads} reads ---")
-    if not inserted_rows:
-        print("  No rows inserted, skipping reads.")
-        return
 
-    read_latencies = []
-    read_errors = 0
-    start_time = time.time()
+def run_reads(session, keys, inserted, num_reads, prep_read_pk, prep_read_ck, **run_options):
+    """
+    Read `num_reads` random rows among the first `inserted` of the key space,
+    partition-only or partition+clustering at random, and return the phase
+    (count, LatencyHistogram, errors, elapsed). `run_options` are passed on
+    to run_operations.
+    """
+    partition_keys, clustering_keys = keys.partition_keys, keys.clustering_keys
 
-    for i in range(num_reads):
-        pk_vals, ck_vals = random.choice(inserted_rows)
+    def read_operations():
+        while True:
+            pk_vals, ck_vals = keys.inserted_key(int(random.random() * inserted))
 
-        # Randomly choose: partition-only read or partition+clustering read
-        use_clustering = clustering_keys and ck_vals and random.random() < 0.5
+            # Randomly choose: partition-only read or partition+clustering read
+            use_clustering = clustering_keys and ck_vals and random.random() < 0.5
 
-        try:
-            t0 = time.monotonic()
+            bind_values = [pk_vals[col] for col in partition_keys]
             if use_clustering:
                 # Pick a random depth of clustering columns (1..N)
                 depth = random.randint(1, len(clustering_keys))
-                stmt = prep_read_ck[depth]
-                bind_values = [pk_vals[col] for col in partition_keys]
                 bind_values += [ck_vals[col] for col in clustering_keys[:depth]]
-                session.execute(stmt, bind_values)
+                yield prep_read_ck[depth], bind_values, None
             else:
-                bind_values = [pk_vals[col] for col in partition_keys]
-                session.execute(prep_read_pk, bind_values)
-            latency_ms = (time.monotonic() - t0) * 1000
-            read_latencies.append(latency_ms)
-        except Exception as e:
-            read_errors += 1
-            if read_errors <= 3:
-                print(f"  Read error ({read_errors}): {e}")
+                yield prep_read_pk, bind_values, None
 
-        if (i + 1) % 500 == 0 or (i + 1) == num_reads:
-            elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed if elapsed > 0 else 0
-            print(f"  {i + 1}/{num_reads} reads  ({rate:.0f} ops/sec)")
+    read_latencies, read_errors, read_elapsed = run_operations(
+        session, read_operations(), num_reads, 'read', **run_options
+    )
+    return num_reads, read_latencies, read_errors, read_elapsed
 
-    read_elapsed = time.time() - start_time
 
-    # Step 6: Print results
-    print_results(
-        effective_inserts, insert_latencies, insert_errors, insert_elapsed,
-        num_reads, read_latencies, read_errors, read_elapsed
+def run_mixed_phase(session, workload, keys, inserted, insert_values, regular_values,
+                    prep_insert, prep_read_pk, prep_read_ck, prep_workload, log=print, **run_options):
+    """
+    Issue workload.operations operations drawn from the workload mix through a
+    single run_operations scheduler, so that they interleave on the wire.
+    Writes continue along the key space permutation after the `inserted` rows
+    (overwriting from its start once it is exhausted); updates, deletes, reads
+    and scans target a random row written so far. `run_options` are passed on
+    to run_operations.
+
+    Returns the 'mixed' phase and one phase per operation type issued, in the
+    format of run_benchmark's results.
+    """
+    partition_keys, clustering_keys = keys.partition_keys, keys.clustering_keys
+    names = list(workload.mix)
+    cum_weights = list(accumulate(workload.mix.values()))
+    issued = dict.fromkeys(names, 0)
+    written = inserted
+
+    log(f"\n--- Running {workload.operations} mixed operations ---")
+    if not written and not {'write', 'ttl_write'} & set(names):
+        log("  No rows inserted and no writes in the workload, skipping.")
+        return {'mixed': (0, LatencyHistogram(), 0, 0.0)}
+
+    def mixed_operations():
+        nonlocal written
+        while True:
+            name = random.choices(names, cum_weights=cum_weights)[0]
+            issued[name] += 1
+
+            if name in ('write', 'ttl_write'):
+                pk_vals, ck_vals = keys.inserted_key(written % keys.size)
+                written += 1
+                statement = prep_insert if name == 'write' else prep_workload[name]
+                yield statement, insert_values(pk_vals, ck_vals), name
+                continue
+
+            pk_vals, ck_vals = keys.inserted_key(int(random.random() * min(max(written, 1), keys.size)))
+            pk_bind = [pk_vals[col] for col in partition_keys]
+            ck_bind = [ck_vals[col] for col in clustering_keys]
+            if name == 'update':
+                yield prep_workload[name], regular_values(pk_vals, ck_vals) + pk_bind + ck_bind, name
+            elif name == 'delete':
+                yield prep_workload[name], pk_bind + ck_bind, name
+            elif name == 'scan':
+                yield prep_workload[name], pk_bind + ck_bind[:1], name
+            elif name == 'read_row' and clustering_keys:
+                # Pick a random depth of clustering columns (1..N)
+                depth = random.randint(1, len(clustering_keys))
+                yield prep_read_ck[depth], pk_bind + ck_bind[:depth], name
+            else:
+                yield prep_read_pk, pk_bind, name
+
+    op_stats = OperationStats()
+    latencies, errors, elapsed = run_operations(
+        session, mixed_operations(), workload.operations, 'operation', op_stats=op_stats, **run_options
     )
+    phases = {'mixed': (workload.operations, latencies, errors, elapsed)}
+    for name in names:
+        if issued[name]:
+            phases[name] = (issued[name], op_stats.histograms.get(name, LatencyHistogram()),
+                            op_stats.errors.get(name, 0), elapsed)
+    return phases
+
+
+# Report order and headings of run_benchmark's result phases
+RESULT_PHASES = ('batches', 'inserts', 'reads', 'mixed') + WORKLOAD_OPERATIONS + ('scans',)
+PHASE_LABELS = {'batches': 'INSERT BATCHES', 'inserts': 'INSERTS', 'reads': 'READS',
+                'mixed': 'MIXED OPERATIONS', 'scans': 'PARTITION SCANS'}
 
 
-def print_results(num_inserts, insert_latencies, insert_errors, insert_elapsed,
-                  num_reads, read_latencies, read_errors, read_elapsed):
-    """Print a summary of benchmark results."""
+def print_results(results):
+    """
+    Print a summary of benchmark results (see run_benchmark) from the
+    per-phase LatencyHistograms; each operation type of a mixed phase follows
+    the mixed total, with its throughput over the whole phase. After batched
+    inserts the INSERTS block is per row, and scans are followed by their
+    breakdown by partition width.
+    """
     print("\n" + "=" * 60)
     print("BENCHMARK RESULTS")
     print("=" * 60)
 
-    if insert_latencies:
-        insert_latencies.sort()
-        print(f"\n  INSERTS:")
-        print(f"    Total:      {num_inserts}")
-        print(f"    Errors:     {insert_errors}")
-        print(f"    Duration:   {insert_elapsed:.2f}s")
-        print(f"    Throughput: {num_inserts / insert_elapsed:.0f} ops/sec")
-        print(f"    Latency (ms):")
-        print(f"      Min:  {insert_latencies[0]:.2f}")
-        print(f"      Avg:  {sum(insert_latencies) / len(insert_latencies):.2f}")
-        print(f"      P50:  {percentile(insert_latencies, 50):.2f}")
-        print(f"      P90:  {percentile(insert_latencies, 90):.2f}")
-        print(f"      P99:  {percentile(insert_latencies, 99):.2f}")
-        print(f"      Max:  {insert_latencies[-1]:.2f}")
-
-    if read_latencies:
-        read_latencies.sort()
-        print(f"\n  READS:")
-        print(f"    Total:      {num_reads}")
-        print(f"    Errors:     {read_errors}")
-        print(f"    Duration:   {read_elapsed:.2f}s")
-        print(f"    Throughput: {num_reads / read_elapsed:.0f} ops/sec")
-        print(f"    Latency (ms):")
-        print(f"      Min:  {read_latencies[0]:.2f}")
-        print(f"      Avg:  {sum(read_latencies) / len(read_latencies):.2f}")
-        print(f"      P50:  {percentile(read_latencies, 50):.2f}")
-        print(f"      P90:  {percentile(read_latencies, 90):.2f}")
-        print(f"      P99:  {percentile(read_latencies, 99):.2f}")
-        print(f"      Max:  {read_latencies[-1]:.2f}")
+    for name in RESULT_PHASES:
+        if name in results:
+            label = PHASE_LABELS.get(name, f"MIXED / {name}")
+            if name == 'inserts' and 'batches' in results:
+                label = 'INSERTS (per row)'
+            print_phase_results(label, *results[name])
+    if 'scan_widths' in results:
+        print_scan_widths(results['scan_widths'])
 
     print("=" * 60)
 
 
-def percentile(sorted_data, pct):
-    """Return the value at the given percentile from a sorted list."""
-    if not sorted_data:
-        return 0
-    idx = int(len(sorted_data) * pct / 100)
-    idx = min(idx, len(sorted_data) - 1)
-    return sorted_data[idx]
+def print_phase_results(label, count, latencies, errors, elapsed):
+    """Print the results block of one phase; nothing if no operation succeeded."""
+    if not latencies.count:
+        return
+    summary = [('Min', latencies.min_ms), ('Avg', latencies.mean_ms)]
+    summary += [(f"P{pct:g}", latencies.percentile(pct)) for pct in (50, 90, 99, 99.9)]
+    summary.append(('Max', latencies.max_ms))
+
+    print(f"\n  {label}:")
+    print(f"    Total:      {count}")
+    print(f"    Errors:     {errors}")
+    print(f"    Duration:   {elapsed:.2f}s")
+    print(f"    Throughput: {count / elapsed:.0f} ops/sec")
+    print(f"    Latency (ms):")
+    for name, value in summary:
+        print(f"      {name + ':':<6} {value:.2f}")
+
+
+# ---------------------------------------------------------------------------
+# Multi-process load generation
+# ---------------------------------------------------------------------------
+
+def rate_profile_from_args(args, workers=1):
+    """The --rate/--ramp schedule of one of `workers` processes, or None without --rate."""
+    if args.rate is None:
+        return None
+    return build_rate_profile(args.rate / workers, args.ramp, args.ramp_start_rate / workers,
+                              args.ramp_duration, args.ramp_steps)
+
+
+def value_options_from_args(args):
+    """ValueGenerator size arguments from --collection-size, --text-size and --blob-size."""
+    return {
+        'collection_size': args.collection_size,
+        'text_size': args.text_size,
+        'blob_size': args.blob_size,
+    }
+
+
+def workload_from_args(args):
+    """Workload from --workload and/or --mix (which overrides its mix), or None."""
+    if not args.workload and not args.mix:
+        return None
+    definition = load_workload(args.workload) if args.workload else {}
+    if args.mix:
+        definition['mix'] = args.mix
+    for key in ('operations', 'ttl', 'scan_limit'):
+        if getattr(args, key) is not None:
+            definition[key] = getattr(args, key)
+    return build_workload(**definition)
+
+
+def row_size_from_args(args):
+    """(target row size function, description) from the --row-size-* options, or None."""
+    if args.row_size_from:
+        table_name = args.row_size_table or f"{args.keyspace}.{args.table}"
+        return load_row_size_distribution(args.row_size_from, table_name)
+    if args.row_size_bytes:
+        low, high = args.row_size_bytes
+        dist = args.row_size_dist or ('fixed' if low == high else 'uniform')
+        size = f"{low}" if low == high else f"{low}-{high}"
+        return (build_row_size_distribution(args.row_size_bytes, dist, args.row_size_stdev),
+                f"{dist} {size} bytes")
+    return None
+
+
+def split_evenly(total, parts, index):
+    """Share of `total` for part `index` when it is split as evenly as possible."""
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def benchmark_worker(index, args, conn):
+    """
+    Worker process for --processes: open its own Cluster/session, run its share
+    of the inserts and reads (or mixed operations) on its slice of the
+    partition key space, and send
+    {'index', 'error', 'phases'} back over `conn`, where each phase is
+    (count, LatencyHistogram, errors, elapsed). With --latency-log, worker N
+    writes its interval snapshots to <name>.N<ext>.
+    """
+    # A forked worker would otherwise replay the parent's random sequence
+    random.seed()
+    result = {'index': index, 'error': None, 'phases': None}
+    cluster = None
+    latency_log = None
+    try:
+        if args.latency_log:
+            root, ext = os.path.splitext(args.latency_log)
+            latency_log = open_latency_log(f"{root}.{index}{ext}")
+        workload = workload_from_args(args)
+        if workload is not None:
+            workload = workload._replace(
+                operations=split_evenly(workload.operations, args.processes, index))
+        cluster, session = create_session(args)
+        schema = get_table_schema(session, args.keyspace, args.table)
+        phases = run_benchmark(
+            session=session,
+            keyspace=args.keyspace,
+            table=args.table,
+            schema=schema,
+            num_inserts=split_evenly(args.inserts, args.processes, index),
+            num_reads=split_evenly(args.reads, args.processes, index),
+            pk_pool_size=split_evenly(args.pk_pool_size, args.processes, index),
+            ck_pool_size=args.ck_pool_size,
+            concurrency=args.concurrency,
+            shard=(index, args.processes),
+            verbose=False,
+            rate=rate_profile_from_args(args, args.processes),
+            latency_log=latency_log,
+            log_interval=args.log_interval,
+            seed=args.seed,
+            value_options=value_options_from_args(args),
+            row_size=row_size_from_args(args),
+            workload=workload,
+            batch_size=args.batch_size,
+            batch_mode=args.batch_mode,
+            num_scans=split_evenly(args.scans, args.processes, index),
+            fetch_size=args.fetch_size,
+        )
+        if phases is None:
+            result['error'] = 'benchmark could not run'
+        else:
+            result['phases'] = phases
+    except KeyboardInterrupt:
+        result['error'] = 'interrupted'
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        if cluster:
+            cluster.shutdown()
+        if latency_log:
+            latency_log.close()
+        conn.send(result)
+        conn.close()
+
+
+def run_parallel_benchmark(args):
+    """
+    Run the benchmark in args.processes worker processes and print the merged
+    results. Counts and errors are summed and histograms merged; the duration
+    of a phase is that of its slowest worker, so throughput is the aggregate
+    rate of all workers.
+    """
+    if args.seed is None:
+        # Workers must share the key seed for their shards to be disjoint
+        args.seed = random.getrandbits(64)
+    print(f"\nStarting {args.processes} worker processes "
+          f"(concurrency {args.concurrency} each)...")
+    workers = {}
+    for index in range(args.processes):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=benchmark_worker, args=(index, args, sender))
+        process.start()
+        sender.close()
+        workers[receiver] = (index, process)
+
+    merged = {}
+    failed = 0
+    while workers:
+        for receiver in wait(list(workers)):
+            index, process = workers.pop(receiver)
+            try:
+                result = receiver.recv()
+            except EOFError:
+                result = {'error': f'exited with code {process.exitcode}', 'phases': None}
+            process.join()
+
+            if result['error']:
+                failed += 1
+                print(f"  Worker {index} failed: {result['error']}")
+                continue
+            for name, phase in result['phases'].items():
+                if name == 'scan_widths':
+                    merged[name] = merged[name].merge(phase) if name in merged else phase
+                    continue
+                count, histogram, errors, elapsed = phase
+                totals = merged.setdefault(name, [0, LatencyHistogram(), 0, 0.0])
+                totals[0] += count
+                totals[1].merge(histogram)
+                totals[2] += errors
+                totals[3] = max(totals[3], elapsed)
+            print(f"  Worker {index} finished: " + ', '.join(
+                f"{result['phases'][name][0]} {name}" for name in ('inserts', 'reads', 'mixed', 'scans')
+                if name in result['phases']))
+
+    if failed == args.processes:
+        raise RuntimeError("all worker processes failed")
+    print_results(merged)
 
 
 # ---------------------------------------------------------------------------
@@ -509,18 +2090,8 @@ def create_session(args):
 # CLI
 # ---------------------------------------------------------------------------
 
-def parse_arguments():
-    parser = argparse.ArgumentParser(
-        description='Cassandra/Keyspaces small benchmark tool. '
-                    'Introspects table schema, generates synthetic data, '
-                    'and runs randomized insert/read operations.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=__doc__
-    )
-
-    parser.add_argument('keyspace', help='Target keyspace name')
-    parser.add_argument('table', help='Target table name')
-
+def add_connection_arguments(parser):
+    """Add the connection options read by create_session to an argument parser."""
     conn = parser.add_argument_group('connection')
     conn.add_argument('--host', default='127.0.0.1',
                        help='Cassandra contact point(s), comma-separated (default: 127.0.0.1)')
@@ -539,6 +2110,21 @@ def parse_arguments():
     conn.add_argument('--sigv4-region', default=None,
                        help='AWS region for SigV4 auth (default: resolved from AWS config)')
 
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description='Cassandra/Keyspaces small benchmark tool. '
+                    'Introspects table schema, generates synthetic data, '
+                    'and runs randomized insert/read operations.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument('keyspace', help='Target keyspace name')
+    parser.add_argument('table', help='Target table name')
+
+    add_connection_arguments(parser)
+
     bench = parser.add_argument_group('benchmark')
     bench.add_argument('--inserts', type=int, default=10000,
                         help='Number of insert operations (default: 1000)')
@@ -548,8 +2134,93 @@ def parse_arguments():
                         help='Number of unique partition key values to generate (default: 1000)')
     bench.add_argument('--ck-pool-size', type=int, default=10,
                         help='Number of unique clustering key values to generate (default: 10)')
-
-    return parser.parse_args()
+    bench.add_argument('--concurrency', type=int, default=1,
+                        help='Requests kept in flight with execute_async (default: 1, one blocking '
+                             'request at a time)')
+    bench.add_argument('--processes', type=int, default=1,
+                        help='Worker processes, each with its own connection and a disjoint slice '
+                             'of the partition keys; --inserts, --reads and --pk-pool-size are '
+                             'split between them and --concurrency applies to each (default: 1)')
+    bench.add_argument('--rate', type=float, default=None,
+                        help='Open-loop target rate in ops/sec (total across --processes); latency '
+                             'is measured from the scheduled send time. --concurrency then caps '
+                             f'requests in flight (default cap: {OPEN_LOOP_MAX_IN_FLIGHT})')
+    bench.add_argument('--ramp', choices=RAMP_PROFILES, default='constant',
+                        help='Rate profile for --rate: constant, step, linear or sine between '
+                             '--ramp-start-rate and --rate (default: constant)')
+    bench.add_argument('--ramp-start-rate', type=float, default=0.0,
+                        help='Starting (for sine: lowest) rate of the ramp in ops/sec (default: 0)')
+    bench.add_argument('--ramp-duration', type=float, default=60.0,
+                        help='Seconds to reach --rate; the period for sine (default: 60)')
+    bench.add_argument('--ramp-steps', type=int, default=5,
+                        help='Number of rate levels for --ramp step (default: 5)')
+    bench.add_argument('--seed', type=int, default=None,
+                        help='Seed for the partition/clustering key values and insert order; '
+                             'reuse it to address the rows of an earlier run (default: random)')
+    bench.add_argument('--collection-size', type=parse_size_range, default=(1, 5), metavar='N|MIN-MAX',
+                        help='Elements per generated list, set and map, at every nesting level '
+                             '(default: 1-5)')
+    bench.add_argument('--text-size', type=parse_size_range, default=(8, 32), metavar='N|MIN-MAX',
+                        help='Characters per generated text value (default: 8-32)')
+    bench.add_argument('--blob-size', type=parse_size_range, default=(8, 64), metavar='N|MIN-MAX',
+                        help='Bytes per generated blob value (default: 8-64)')
+    bench.add_argument('--row-size-bytes', type=parse_size_range, default=None, metavar='N|MIN-MAX',
+                        help='Pad text and blob regular columns so the encoded row size (as '
+                             'calculate_row_size and row_size_sampler.py measure it) hits this target')
+    bench.add_argument('--row-size-dist', choices=ROW_SIZE_DISTRIBUTIONS, default=None,
+                        help='Distribution of --row-size-bytes (default: fixed for N, uniform for MIN-MAX)')
+    bench.add_argument('--row-size-stdev', type=float, default=None,
+                        help='Standard deviation in bytes for the normal and lognormal '
+                             'distributions (default: 10%% of the mean)')
+    bench.add_argument('--row-size-from', default=None, metavar='FILE',
+                        help='Follow the row size distribution of a row_size_sampler.py or '
+                             'row_size_dump.py output line instead of --row-size-bytes')
+    bench.add_argument('--row-size-table', default=None, metavar='KEYSPACE.TABLE',
+                        help='Line to use from --row-size-from (default: the benchmarked table)')
+    bench.add_argument('--batch-size', type=int, default=1,
+                        help='Write the inserts in unlogged batches of up to N rows; latency is '
+                             'reported per batch and per row (Amazon Keyspaces accepts up to 30 '
+                             'statements per batch) (default: 1, no batches)')
+    bench.add_argument('--batch-mode', choices=BATCH_MODES, default='same-partition',
+                        help='Rows of one partition per batch, or rows of different partitions '
+                             '(default: same-partition)')
+    bench.add_argument('--scans', type=int, default=0,
+                        help='Partitions to read to the end, page by page, after the reads or '
+                             'mixed operations; reports latency, rows/sec, pages/sec and estimated '
+                             'RCU by partition width (default: 0, no scans)')
+    bench.add_argument('--fetch-size', type=int, default=DEFAULT_FETCH_SIZE,
+                        help=f'Rows per page of the --scans (default: {DEFAULT_FETCH_SIZE})')
+    bench.add_argument('--latency-log', default=None,
+                        help='Write a CSV line with the count, rate and p50/p90/p99/p99.9/max '
+                             'latency of every --log-interval to this file (with --processes, '
+                             'one file per worker: NAME.N.EXT)')
+    bench.add_argument('--log-interval', type=float, default=10.0,
+                        help='Seconds between latency log snapshots (default: 10)')
+
+    mixed = parser.add_argument_group('mixed workload')
+    mixed.add_argument('--workload', default=None, metavar='FILE',
+                        help='YAML (or JSON) workload definition with a mix of operation weights '
+                             'and optional operations, ttl and scan_limit; replaces the read '
+                             'phase with interleaved mixed operations after the inserts')
+    mixed.add_argument('--mix', type=parse_mix, default=None, metavar='OP=WEIGHT,...',
+                        help='Operation mix, overriding that of --workload; operations: '
+                             f"{', '.join(WORKLOAD_OPERATIONS)}")
+    mixed.add_argument('--operations', type=int, default=None,
+                        help='Mixed operations to run, total across --processes '
+                             f'(default: {DEFAULT_WORKLOAD_OPERATIONS})')
+    mixed.add_argument('--ttl', type=int, default=None,
+                        help=f'TTL in seconds of ttl_write operations (default: {DEFAULT_TTL_SECONDS})')
+    mixed.add_argument('--scan-limit', type=int, default=None,
+                        help=f'LIMIT of scan operations (default: {DEFAULT_SCAN_LIMIT})')
+
+    args = parser.parse_args()
+    if args.rate is not None and args.rate <= 0:
+        parser.error('--rate must be positive')
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    if args.fetch_size < 1:
+        parser.error('--fetch-size must be at least 1')
+    return args
 
 
 def main():
@@ -560,10 +2231,23 @@ def main():
     print(f"  Host:    {args.host}:{args.port}")
     print(f"  SSL:     {args.ssl}")
 
+    if args.processes > 1:
+        try:
+            run_parallel_benchmark(args)
+        except KeyboardInterrupt:
+            print("\nBenchmark interrupted by user.")
+        except Exception as e:
+            print(f"\nERROR: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     cluster = None
+    latency_log = None
     try:
         cluster, session = create_session(args)
         print(f"  Connected successfully")
+        if args.latency_log:
+            latency_log = open_latency_log(args.latency_log)
 
         schema = get_table_schema(session, args.keyspace, args.table)
 
@@ -576,6 +2260,18 @@ def main():
             num_reads=args.reads,
             pk_pool_size=args.pk_pool_size,
             ck_pool_size=args.ck_pool_size,
+            concurrency=args.concurrency,
+            rate=rate_profile_from_args(args),
+            latency_log=latency_log,
+            log_interval=args.log_interval,
+            seed=args.seed,
+            value_options=value_options_from_args(args),
+            row_size=row_size_from_args(args),
+            workload=workload_from_args(args),
+            batch_size=args.batch_size,
+            batch_mode=args.batch_mode,
+            num_scans=args.scans,
+            fetch_size=args.fetch_size,
         )
 
     except KeyboardInterrupt:
@@ -584,6 +2280,8 @@ def main():
         print(f"\nERROR: {e}", file=sys.stderr)
         sys.exit(1)
     finally:
+        if latency_log:
+            latency_log.close()
         if cluster:
             cluster.shutdown()
             print("\nConnection closed.")
@@ -9,7 +9,16 @@ import json
 import re
 from typing import Dict
 from tabulate import tabulate
-import json
+from row_size_calculator import RowSizeHistogram
+import hashlib
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed to vectorize the compression cross-check
+    np = None
 
 # ## Overview
 #
@@ -146,7 +155,8 @@ def parse_nodetool_output(lines):
                 'space_used': Decimal,
                 'compression_ratio': Decimal,
                 'write_count': Decimal,
-                'read_count': Decimal
+                'read_count': Decimal,
+                'partitions_estimate': Decimal
             },
             ...
         },
@@ -158,6 +168,7 @@ def parse_nodetool_output(lines):
     - compression_ratio: The SSTable compression ratio (unitless)
     - write_count: The total number of local writes recorded
     - read_count: The total number of local reads recorded
+    - partitions_estimate: The estimated number of local partitions (0 if not reported)
 
     Assumes that each table block starts after a line "Keyspace : <ks>" and "Table: <tablename>"
     When all data is collected for a table, it is stored in the keyspace's table map.
@@ -169,6 +180,7 @@ def parse_nodetool_output(lines):
     compression_ratio = None
     write_count = None
     read_count = None
+    partitions_estimate = None
 
     for line in lines:
         line = line.strip()
@@ -197,6 +209,7 @@ def parse_nodetool_output(lines):
                 compression_ratio = None
                 write_count = None
                 read_count = None
+                partitions_estimate = None
 
         # For lines within a table block, parse the required stats
         if current_keyspace and current_table:
@@ -220,6 +233,15 @@ def parse_nodetool_output(lines):
                     except ValueError:
                         compression_ratio = Decimal(1)
 
+            elif "Number of partitions (estimate):" in line:
+                # Format: "Number of partitions (estimate): X"
+                parts = line.split(':', 1)
+                if len(parts) == 2:
+                    try:
+                        partitions_estimate = Decimal(parts[1].strip())
+                    except InvalidOperation:
+                        partitions_estimate = Decimal(0)
+
             elif "Local read count:" in line:
                 # Format: "Local read count: X"
                 parts = line.split(':', 1)
@@ -250,7 +272,8 @@ def parse_nodetool_output(lines):
                         'space_used': space_used,
                         'compression_ratio': compression_ratio,
                         'read_count': read_count,
-                        'write_count': write_count
+                        'write_count': write_count,
+                        'partitions_estimate': partitions_estimate or Decimal(0)
                     }
 
                     # Reset for the next table
@@ -259,6 +282,7 @@ def parse_nodetool_output(lines):
                     compression_ratio = None
                     write_count = None
                     read_count = None
+                    partitions_estimate = None
 
     return data
 
@@ -424,6 +448,11 @@ def build_cassandra_local_set(samples, status_data, single_keyspace=None):
                                     'reads_monthly': Decimal,
                                     'has_ttl': Boolean,
                                     'sample_count': Decimal,
+                                    'write_units_per_write': Decimal or None,
+                                    'read_units_per_read': Decimal or None,
+                                    'partitions_estimate': Decimal,
+                                    'sampled_rows_per_partition': Decimal or None,
+                                    'row_size_sampled': Boolean,
                                 }
                             }
                         }
@@ -438,6 +467,9 @@ def build_cassandra_local_set(samples, status_data, single_keyspace=None):
             'keyspaces': {}
         }
     }
+
+    # Row size histograms merged across every node that reported one for a table
+    row_size_histograms = {}
    
     # Process each datacenter's samples
     for dc_name, dc_data in samples.items():
@@ -508,9 +540,19 @@ def build_cassandra_local_set(samples, status_data, single_keyspace=None):
                             average_bytes = Decimal(avg_number_str)
                             ttl_str = row_size_data[fully_qualified_table_name].get('default-ttl', 'y')
                             has_ttl = (ttl_str.strip() == 'n')
+                            histogram = RowSizeHistogram.from_fields(row_size_data[fully_qualified_table_name])
+                            # Rows per partition among the sampled rows, reported by row_size_sampler.py
+                            sampled_lines = Decimal(row_size_data[fully_qualified_table_name].get('lines', '0'))
+                            sampled_partitions = Decimal(row_size_data[fully_qualified_table_name].get('partitions', '0'))
+                            if sampled_partitions > 0 and sampled_lines > 0:
+                                sampled_rows_per_partition = sampled_lines / sampled_partitions
+                            else:
+                                sampled_rows_per_partition = None
                         else:
                             has_ttl = False
                             average_bytes = Decimal(1)
+                            histogram = None
+                            sampled_rows_per_partition = None
                         result['data']['keyspaces'][keyspace_name]['dcs'][dc_name]['tables'][table_name] = {
                             'total_compressed_bytes': Decimal(0),
                             'total_uncompressed_bytes': Decimal(0),
@@ -518,7 +560,10 @@ def build_cassandra_local_set(samples, status_data, single_keyspace=None):
                             'writes_monthly': Decimal(0),
                             'reads_monthly': Decimal(0),
                             'has_ttl': has_ttl,
-                            'sample_count': Decimal(0)
+                            'sample_count': Decimal(0),
+                            'partitions_estimate': Decimal(0),
+                            'sampled_rows_per_partition': sampled_rows_per_partition,
+                            'row_size_sampled': fully_qualified_table_name in row_size_data
                         }                    
                     
                     # Update table data
@@ -530,6 +575,21 @@ def build_cassandra_local_set(samples, status_data, single_keyspace=None):
                     table['reads_monthly'] += read_count/uptime_seconds * SECONDS_PER_MONTH
                     table['has_ttl'] = has_ttl
                     table['sample_count'] += Decimal(1)
+                    table['partitions_estimate'] += table_data.get('partitions_estimate', Decimal(0))
+
+                    # Expected units per row from the row size distribution, when the sampler reported one
+                    histogram_key = (dc_name, keyspace_name, table_name)
+                    if histogram is not None and histogram.count:
+                        row_size_histograms.setdefault(histogram_key, RowSizeHistogram()).merge(histogram)
+                    # The table dict is rebuilt for every node, so take the units from the
+                    # distribution merged so far, which may come from other nodes
+                    merged = row_size_histograms.get(histogram_key)
+                    if merged is not None:
+                        table['write_units_per_write'] = Decimal(str(merged.expected_write_units))
+                        table['read_units_per_read'] = Decimal(str(merged.expected_read_units))
+                    else:
+                        table['write_units_per_write'] = None
+                        table['read_units_per_read'] = None
 
                 
                 
@@ -550,6 +610,109 @@ def build_cassandra_local_set(samples, status_data, single_keyspace=None):
 
     return result
 
+# Tables whose sampled and tablestats uncompressed sizes differ by more than this factor are flagged
+COMPRESSION_CHECK_THRESHOLD = 2.0
+
+
+def cross_check_uncompressed_sizes(cassandra_set, threshold=COMPRESSION_CHECK_THRESHOLD):
+    """
+    Cross-check the tablestats uncompressed size (space_used / compression_ratio) of
+    every table with a row size sample against an estimate built from the sampled
+    rows alone:
+
+        sampled bytes = partitions * rows per partition * sampled average row size
+
+    where partitions is the tablestats partition estimate, rows per partition is
+    the number of sampled rows divided by the number of sampled partitions (the
+    'partitions' field of row_size_sampler.py lines) and the average row size is
+    the sampled encoded row size from the row_size_calculator rules. Tables
+    sampled without a partition count (tools/row-size-sampler.sh) are not checked.
+    The divergence (larger estimate / smaller estimate) is computed for all tables
+    at once, with NumPy when it is installed, and tables whose divergence exceeds
+    `threshold` are flagged. A flagged table usually has a bad or stale
+    compression ratio, which would skew the uncompressed size Keyspaces storage is
+    priced on.
+
+    Each checked table gets 'sampled_uncompressed_bytes' and 'uncompressed_divergence'
+    entries. Returns one dict per checked table:
+    {'keyspace', 'dc', 'table', 'tablestats_bytes', 'sampled_bytes', 'divergence', 'flagged'}
+    """
+    checked = []
+    for keyspace_name, keyspace_data in cassandra_set['data']['keyspaces'].items():
+        for dc_name, dc_data in keyspace_data['dcs'].items():
+            for table_name, table in dc_data['tables'].items():
+                if (table.get('row_size_sampled') and table.get('partitions_estimate', 0) > 0
+                        and table.get('sampled_rows_per_partition') and table['avg_row_size_bytes'] > 0):
+                    checked.append((keyspace_name, dc_name, table_name, table))
+    if not checked:
+        return []
+
+    partitions = [float(table['partitions_estimate']) for _, _, _, table in checked]
+    rows_per_partition = [float(table['sampled_rows_per_partition']) for _, _, _, table in checked]
+    row_bytes = [float(table['avg_row_size_bytes']) for _, _, _, table in checked]
+    tablestats_bytes = [float(table['total_uncompressed_bytes']) for _, _, _, table in checked]
+
+    if np is not None:
+        tablestats = np.array(tablestats_bytes)
+        sampled = np.array(partitions) * np.array(rows_per_partition) * np.array(row_bytes)
+        low = np.minimum(sampled, tablestats)
+        high = np.maximum(sampled, tablestats)
+        divergence = np.where(low > 0, high / np.where(low > 0, low, 1.0), np.inf)
+        sampled_bytes = sampled.tolist()
+        divergences = divergence.tolist()
+    else:
+        sampled_bytes = []
+        divergences = []
+        for p, rpp, rb, tb in zip(partitions, rows_per_partition, row_bytes, tablestats_bytes):
+            sampled = p * rpp * rb
+            low, high = min(sampled, tb), max(sampled, tb)
+            sampled_bytes.append(sampled)
+            divergences.append(high / low if low > 0 else math.inf)
+
+    results = []
+    for (keyspace_name, dc_name, table_name, table), sampled, divergence, stats_bytes in zip(
+            checked, sampled_bytes, divergences, tablestats_bytes):
+        table['sampled_uncompressed_bytes'] = Decimal(str(round(sampled)))
+        table['uncompressed_divergence'] = Decimal(str(round(divergence, 2))) if math.isfinite(divergence) else None
+        results.append({
+            'keyspace': keyspace_name,
+            'dc': dc_name,
+            'table': table_name,
+            'tablestats_bytes': stats_bytes,
+            'sampled_bytes': sampled,
+            'divergence': divergence,
+            'flagged': divergence > threshold,
+        })
+    return results
+
+
+def print_compression_cross_check(checks, threshold=COMPRESSION_CHECK_THRESHOLD):
+    """Print the tables whose sampled and tablestats uncompressed sizes diverge beyond the threshold."""
+    if not checks:
+        print("No sampled table reports a partition count (row_size_sampler.py), nothing to cross-check")
+        return
+    flagged = [check for check in checks if check['flagged']]
+    if not flagged:
+        print(f"All {len(checks)} sampled tables are within {threshold:g}x of the tablestats uncompressed size")
+        return
+
+    headers = ["Keyspace", "Table", "Region", "Tablestats uncompressed GB", "Sampled uncompressed GB", "Divergence"]
+    rows = [
+        [
+            check['keyspace'],
+            check['table'],
+            check['dc'],
+            f"{check['tablestats_bytes'] / float(GIGABYTE):,.2f}",
+            f"{check['sampled_bytes'] / float(GIGABYTE):,.2f}",
+            f"{check['divergence']:,.1f}x",
+        ]
+        for check in sorted(flagged, key=lambda check: check['divergence'], reverse=True)
+    ]
+    print(f"{len(flagged)} of {len(checks)} sampled tables diverge by more than {threshold:g}x; "
+          "check their compression ratio before pricing")
+    print(tabulate(rows, headers=headers, tablefmt="grid",
+                   colalign=("left", "left", "left", "right", "right", "right")))
+
 def build_keyspaces_set(cassandra_set, region_map):
     """
     Calculate totals and build a hierarchical data structure.
@@ -616,12 +779,17 @@ def build_keyspaces_set(cassandra_set, region_map):
                 number_of_nodes = dc_data['number_of_nodes']
                 number_of_samples = table_data['sample_count']
 
-                # Calculate write units
-                write_units_per_write = Decimal(1) if row_size_bytes < WRITE_UNIT_SIZE else math.ceil(row_size_bytes / WRITE_UNIT_SIZE)
+                # Calculate write units. Prefer the mean units per row over the sampled
+                # distribution, which charges rows that cross a 1KB/4KB boundary correctly.
+                write_units_per_write = table_data.get('write_units_per_write')
+                if write_units_per_write is None:
+                    write_units_per_write = Decimal(1) if row_size_bytes < WRITE_UNIT_SIZE else math.ceil(row_size_bytes / WRITE_UNIT_SIZE)
                 write_units_monthly = table_data['writes_monthly']/number_of_samples * write_units_per_write * number_of_nodes / replication_factor
 
                 # Calculate read units
-                read_units_per_read = Decimal(1) if row_size_bytes < READ_UNIT_SIZE else math.ceil(row_size_bytes / READ_UNIT_SIZE)
+                read_units_per_read = table_data.get('read_units_per_read')
+                if read_units_per_read is None:
+                    read_units_per_read = Decimal(1) if row_size_bytes < READ_UNIT_SIZE else math.ceil(row_size_bytes / READ_UNIT_SIZE)
                 read_units_monthly = table_data['reads_monthly']/number_of_samples * read_units_per_read * number_of_nodes / ((replication_factor -1) if replication_factor - 1 > 0 else 1)
 
                 # Calculate TTL units (same as writes if TTL is enabled)
@@ -669,10 +837,12 @@ def build_keyspaces_pricing(keyspaces_set, mcs_json=None):
     """
     # Helper to get price from mcs_json for a region and key
     def get_price(region, key, default=Decimal('0')):
-        #try:
-       #     return Decimal(mcs_json['regions'][region][key]['price'])
-       # except Exception:
-        return default
+        if mcs_json is None:
+            return default
+        try:
+            return Decimal(mcs_json['regions'][region][key]['price'])
+        except (KeyError, TypeError, InvalidOperation):
+            return default
 
     # Try to map region names from keyspaces_set to mcs_json regions
     #mcs_regions = list(mcs_json['regions'].keys())
@@ -1520,6 +1690,279 @@ def decimal_to_str(obj):
         return [decimal_to_str(item) for item in obj]
     return obj
 
+# ── local estimate server ──────────────────────────────────────────────────────
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / 'src' / 'calculator' / 'data'
+DEFAULT_REGION = "US East (N. Virginia)"
+
+# mcs.json names the on-demand rates by usage type; map them onto the keys
+# build_keyspaces_pricing asks for.
+_PRICE_KEY_ALIASES = {
+    'MCS-WriteUnits': 'On-Demand Write Units',
+    'MCS-ReadUnits': 'On-Demand Read Units',
+}
+
+# Capture fields accepted by the /estimate endpoint. Each can be sent inline
+# as text ("tablestats") or as a local file path ("tablestats_path").
+_CAPTURE_FIELDS = ('tablestats', 'info', 'status', 'rowsize', 'schema')
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache used by the estimate server to keep parsed
+    schemas and pricing results for recently seen capture hashes.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def load_pricing_index(mcs_path):
+    """
+    Load mcs.json and keep only the named rates for each region, in the
+    {'regions': {region: {key: {'price': str}}}} shape build_keyspaces_pricing reads.
+    """
+    with open(mcs_path, 'r') as f:
+        mcs = json.load(f)
+
+    index = {'regions': {}}
+    for region_name, rates in mcs['regions'].items():
+        region_rates = {}
+        for key, rate in rates.items():
+            # Skip the RegionlessRateCode hash entries, they duplicate the named ones
+            if key == rate.get('RegionlessRateCode'):
+                continue
+            region_rates[key] = {'price': rate['price']}
+            if key in _PRICE_KEY_ALIASES:
+                region_rates[_PRICE_KEY_ALIASES[key]] = {'price': rate['price']}
+        index['regions'][region_name] = region_rates
+    return index
+
+
+def estimate_from_captures(tablestat_lines, info_lines, row_size_lines=None, status_lines=None,
+                           schema=None, number_of_nodes=Decimal(0), single_keyspace=None,
+                           region_name=DEFAULT_REGION, mcs_json=None):
+    """
+    Run the single-node capture pipeline (parse -> cassandra set -> keyspaces set
+    -> pricing) and return the build_keyspaces_pricing result.
+    """
+    tablestats_data = parse_nodetool_output(tablestat_lines)
+    info_data = parse_nodetool_info(info_lines)
+    row_size_data = parse_row_size_info(row_size_lines or [])
+
+    if status_lines:
+        status_data = parse_nodetool_status(status_lines)
+    else:
+        status_data = {
+            'datacenters': {
+                info_data['dc']: {
+                    'node_count': Decimal(number_of_nodes)
+                }
+            }
+        }
+
+    dc_status = status_data['datacenters'].get(info_data['dc'])
+    if not dc_status or not dc_status['node_count']:
+        raise ValueError(f"Number of nodes for datacenter '{info_data['dc']}' is not set. "
+                         "Pass a status capture or number_of_nodes.")
+
+    samples = {
+        info_data['dc']: {
+            'nodes': {
+                info_data['id']: {
+                    'tablestats_data': tablestats_data,
+                    'schema': schema or {},
+                    'info_data': info_data,
+                    'row_size_data': row_size_data
+                }
+            }
+        }
+    }
+
+    cassandra_set = build_cassandra_local_set(samples, status_data, single_keyspace)
+    keyspaces_set = build_keyspaces_set(cassandra_set, {info_data['dc']: region_name})
+    return build_keyspaces_pricing(keyspaces_set, mcs_json)
+
+
+class EstimateServer(ThreadingHTTPServer):
+    """
+    Local HTTP server that keeps the pricing index, region map and parsed
+    schemas in memory between requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, data_dir=DEFAULT_DATA_DIR, cache_size=128):
+        super().__init__(server_address, EstimateRequestHandler)
+        data_dir = Path(data_dir)
+        self.pricing_index = load_pricing_index(data_dir / 'mcs.json')
+        with open(data_dir / 'regions.json', 'r') as f:
+            self.region_map = json.load(f)
+        self.schema_cache = LRUCache(cache_size)
+        self.result_cache = LRUCache(cache_size)
+
+    def resolve_region(self, region):
+        """Accept either a region code (us-east-1) or a long name (US East (N. Virginia))."""
+        if not region:
+            return DEFAULT_REGION
+        if region in self.pricing_index['regions']:
+            return region
+        long_name = self.region_map.get(region)
+        if long_name in self.pricing_index['regions']:
+            return long_name
+        raise ValueError(f"Unknown region: {region}")
+
+    def parse_schema(self, schema_content):
+        """Parse a schema capture once and reuse it for every request with the same content."""
+        key = hashlib.sha256(schema_content.encode('utf-8')).hexdigest()
+        schema = self.schema_cache.get(key)
+        if schema is None:
+            schema = parse_cassandra_schema(schema_content)
+            self.schema_cache.put(key, schema)
+        return schema
+
+    def estimate(self, request):
+        """
+        Price one capture set. Returns (capture_hash, cached, result) where result
+        has Decimals converted to strings.
+        """
+        captures = {}
+        for field in _CAPTURE_FIELDS:
+            if request.get(field) is not None:
+                captures[field] = request[field]
+            elif request.get(f'{field}_path'):
+                captures[field] = Path(request[f'{field}_path']).read_text()
+
+        if 'tablestats' not in captures or 'info' not in captures:
+            raise ValueError("tablestats and info captures are required")
+
+        region_name = self.resolve_region(request.get('region'))
+        number_of_nodes = Decimal(str(request.get('number_of_nodes', 0)))
+        single_keyspace = request.get('single_keyspace')
+
+        digest = hashlib.sha256()
+        for field in _CAPTURE_FIELDS:
+            digest.update(field.encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(captures.get(field, '').encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(json.dumps([region_name, str(number_of_nodes), single_keyspace]).encode('utf-8'))
+        capture_hash = digest.hexdigest()
+
+        result = self.result_cache.get(capture_hash)
+        if result is not None:
+            return capture_hash, True, result
+
+        schema = self.parse_schema(captures['schema']) if 'schema' in captures else None
+        pricing = estimate_from_captures(
+            captures['tablestats'].splitlines(True),
+            captures['info'].splitlines(True),
+            row_size_lines=captures.get('rowsize', '').splitlines(True),
+            status_lines=captures['status'].splitlines(True) if 'status' in captures else None,
+            schema=schema,
+            number_of_nodes=number_of_nodes,
+            single_keyspace=single_keyspace,
+            region_name=region_name,
+            mcs_json=self.pricing_index,
+        )
+        result = decimal_to_str(pricing)
+        self.result_cache.put(capture_hash, result)
+        return capture_hash, False, result
+
+
+class EstimateRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        GET  /health    cache statistics
+        GET  /regions   regions available in the pricing index
+        POST /estimate  JSON body with captures (inline text or *_path), region,
+                        number_of_nodes and single_keyspace; returns pricing JSON
+    """
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {
+                'status': 'ok',
+                'cached_results': len(self.server.result_cache),
+                'cached_schemas': len(self.server.schema_cache),
+                'cache_hits': self.server.result_cache.hits,
+                'cache_misses': self.server.result_cache.misses,
+            })
+        elif self.path == '/regions':
+            self._send_json(200, sorted(self.server.pricing_index['regions'].keys()))
+        else:
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/estimate':
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            capture_hash, cached, result = self.server.estimate(request)
+        except (ValueError, KeyError, OSError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self._send_json(200, result, headers={
+            'X-Capture-Hash': capture_hash,
+            'X-Cache': 'HIT' if cached else 'MISS',
+        })
+
+
+def serve(host, port, data_dir=DEFAULT_DATA_DIR, cache_size=128):
+    """Start the local estimate server and block until interrupted."""
+    # Request threads start from DefaultContext, so carry over the report precision
+    DefaultContext.prec = getcontext().prec
+    server = EstimateServer((host, port), data_dir=data_dir, cache_size=cache_size)
+    print(f"Serving Keyspaces estimates on http://{host}:{port} "
+          f"({len(server.pricing_index['regions'])} regions loaded)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down estimate server.")
+    finally:
+        server.server_close()
+
 def main():
     # Set decimal precision if needed
     getcontext().prec = 10
@@ -1528,8 +1971,8 @@ def main():
         description='Generate a report from nodetool tablestats and nodetool info and row size sampler outputs.'
     )
     parser.add_argument('--report-name', help='Name of the generated report', default='Amazon Keyspaces sizing')
-    parser.add_argument('--table-stats-file', help='Path to the nodetool tablestats output file', required=True)
-    parser.add_argument('--info-file', help='Path to the nodetool info output file', required=True)
+    parser.add_argument('--table-stats-file', help='Path to the nodetool tablestats output file')
+    parser.add_argument('--info-file', help='Path to the nodetool info output file')
     parser.add_argument('--status-file', help='Path to the nodetool status output file')
     parser.add_argument('--row-size-file', help='Path to the file containing row size information')
     parser.add_argument('--number-of-nodes', type=Decimal,
@@ -1540,10 +1983,31 @@ def main():
                         help='Calculate a single keyspace. Leave out to calculate all keyspaces')
     parser.add_argument('--schema-file', type=str, default=None,
                         help='Calculate a single keyspace. Leave out to calculate all keyspaces')
+    parser.add_argument('--compression-check-threshold', type=float, default=COMPRESSION_CHECK_THRESHOLD,
+                        help='Flag tables whose sampled and tablestats uncompressed sizes differ by more '
+                             f'than this factor (default: {COMPRESSION_CHECK_THRESHOLD:g})')
+
+    parser.add_argument('--serve', action='store_true',
+                        help='Run a local HTTP estimate server instead of a one-shot report')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address for --serve to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080,
+                        help='Port for --serve to listen on (default: 8080)')
+    parser.add_argument('--data-dir', default=str(DEFAULT_DATA_DIR),
+                        help='Directory containing mcs.json and regions.json')
+    parser.add_argument('--cache-size', type=int, default=128,
+                        help='Number of recent capture results kept by --serve (default: 128)')
 
     # Parse arguments
     args = parser.parse_args()
 
+    if args.serve:
+        serve(args.host, args.port, data_dir=args.data_dir, cache_size=args.cache_size)
+        return
+
+    if not args.table_stats_file or not args.info_file:
+        parser.error('--table-stats-file and --info-file are required unless --serve is used')
+
     number_of_nodes = args.number_of_nodes
 
     number_of_datacenters = args.number_of_datacenters
@@ -1630,6 +2094,10 @@ def main():
     print("------Cassandra Sizes------")
     print_cassnadra_sizes(res)
 
+    print("------Compression Cross-check------")
+    print_compression_cross_check(cross_check_uncompressed_sizes(res, args.compression_check_threshold),
+                                  args.compression_check_threshold)
+
     print("------Keyspaces Sizes------")
     print_keyspaces_sizes(kes_res)
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Script: row_size_benchmark.py
+Description: Micro-benchmark for row_size_calculator.py. Builds synthetic wide rows
+             with a mix of CQL types and reports how many values per second
+             calculate_data_type_size, the cached CqlType sizers and the scalar
+             and vectorized numeric sizers can size, and how many rows per
+             second calculate_row_size and RowSizer can size.
+
+Usage:
+    python row_size_benchmark.py [--rows N] [--columns N] [--seed N]
+
+Examples:
+    python row_size_benchmark.py
+    python row_size_benchmark.py --rows 200000 --columns 120
+"""
+
+import argparse
+import random
+import string
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from row_size_calculator import (RowSizer, calculate_data_type_size, calculate_numeric_size,
+                                 calculate_numeric_sizes, calculate_row_size, parse_cql_type, np)
+
+
+# Column types cycled through when building the benchmark schema, with a
+# generator for each one.
+MIXED_TYPES = [
+    ('text', lambda: ''.join(random.choices(string.ascii_letters, k=random.randint(8, 64)))),
+    ('int', lambda: random.randint(-2_147_483_648, 2_147_483_647)),
+    ('bigint', lambda: random.randint(-2**62, 2**62)),
+    ('blob', lambda: random.randbytes(random.randint(8, 64))),
+    ('boolean', lambda: random.choice([True, False])),
+    ('uuid', lambda: uuid.uuid4()),
+    ('timestamp', lambda: datetime(2024, 1, 1) + timedelta(seconds=random.randint(0, 86400 * 365))),
+    ('double', lambda: random.uniform(-1e12, 1e12)),
+    ('list<int>', lambda: [random.randint(0, 10**6) for _ in range(random.randint(0, 8))]),
+    ('map<text, int>', lambda: {f"k{i}": random.randint(0, 1000) for i in range(random.randint(0, 8))}),
+    ('frozen<list<text>>', lambda: [f"item{i}" for i in range(random.randint(0, 8))]),
+]
+
+
+def build_schema(num_columns):
+    """Return (partition_keys, clustering_keys, column_data_types) for a wide mixed-type table."""
+    column_data_types = {'pk': 'text', 'ck': 'bigint'}
+    for i in range(num_columns):
+        column_data_types[f"c{i}"] = MIXED_TYPES[i % len(MIXED_TYPES)][0]
+    return ['pk'], ['ck'], column_data_types
+
+
+def build_rows(num_rows, num_columns):
+    """Generate num_rows rows matching build_schema(num_columns)."""
+    rows = []
+    for n in range(num_rows):
+        row = {'pk': f"partition-{n % 1000}", 'ck': n}
+        for i in range(num_columns):
+            row[f"c{i}"] = MIXED_TYPES[i % len(MIXED_TYPES)][1]()
+        rows.append(row)
+    return rows
+
+
+def time_it(label, count, fn, unit='rows'):
+    """Run fn once and print the elapsed time and throughput."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed:8.3f}s  {count / elapsed:12,.0f} {unit}/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark row size calculation on mixed-type wide rows.')
+    parser.add_argument('--rows', type=int, default=50000, help='Number of rows to size (default: 50000)')
+    parser.add_argument('--columns', type=int, default=60, help='Regular columns per row (default: 60)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    partition_keys, clustering_keys, column_data_types = build_schema(args.columns)
+    print(f"Generating {args.rows} rows with {args.columns} mixed-type columns...")
+    rows = build_rows(args.rows, args.columns)
+
+    scalar_values = [(value, column_data_types[col]) for row in rows
+                     for col, value in row.items() if not isinstance(value, (list, dict))]
+    bound_values = [(value, parse_cql_type(data_type).size) for value, data_type in scalar_values]
+
+    print(f"Type dispatch ({len(scalar_values)} scalar values):")
+    time_it('calculate_data_type_size', len(scalar_values), lambda: [
+        calculate_data_type_size(value, data_type) for value, data_type in scalar_values
+    ], unit='values')
+    time_it('CqlType.size', len(scalar_values), lambda: [
+        size(value) for value, size in bound_values
+    ], unit='values')
+
+    int_values = [value for value, data_type in scalar_values if data_type in ('int', 'bigint')]
+    print(f"Numeric sizing ({len(int_values)} int/bigint values):")
+    time_it('calculate_numeric_size', len(int_values), lambda: [
+        calculate_numeric_size(value) for value in int_values
+    ], unit='values')
+    if np is not None:
+        int_array = np.array(int_values, dtype=np.int64)
+        time_it('calculate_numeric_sizes', len(int_values), lambda: calculate_numeric_sizes(int_array),
+                unit='values')
+
+    print("Row sizing:")
+    time_it('calculate_row_size', args.rows, lambda: [
+        calculate_row_size(row, partition_keys, clustering_keys, [], {}, column_data_types)
+        for row in rows
+    ])
+    sizer = RowSizer(partition_keys, clustering_keys, [], {}, column_data_types)
+    time_it('RowSizer.size_rows', args.rows, lambda: sum(sizer.size_rows(rows)))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,9 +6,22 @@ storage requirements. It implements all the rules from the Amazon Keyspaces docu
 for calculating row sizes.
 """
 
+import bisect
+import heapq
+import ipaddress
 import json
 import math
-from typing import Dict, List, Any, Union
+import random
+import re
+from collections.abc import Mapping
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the batch RowSizer API
+    np = None
 
 
 def calculate_column_id_size(total_columns: int) -> int:
@@ -55,6 +68,11 @@ def calculate_string_size(value: str) -> int:
     return len(value.encode('utf-8'))
 
 
+# Powers of ten used to correct the bit-length digit estimate. 10**39 covers the
+# 38 significant digits Keyspaces stores; larger values fall back to str().
+_POW10 = [10 ** i for i in range(40)]
+
+
 def calculate_numeric_size(value: Union[int, float]) -> int:
     """
     Rule: Numeric types (INT, BIGINT, SMALLINT, TINYINT, VARINT) are stored with variable length.
@@ -63,17 +81,55 @@ def calculate_numeric_size(value: Union[int, float]) -> int:
     """
     if value is None:
         return 1  # Null value is 1 byte
-    
-    # Convert to string and remove leading/trailing zeros
-    str_value = str(abs(value)).strip('0')
-    if not str_value:
-        str_value = '0'
-    
-    # Count significant digits
-    significant_digits = len(str_value)
-    
+
+    if not isinstance(value, int):
+        # Non-integer values are counted by their decimal digits
+        return calculate_decimal_size(value)
+
+    # Count significant digits with integer arithmetic instead of str()
+    n = value if value >= 0 else -value
+    if not n % 10:
+        if not n:
+            return 2  # 0 is one significant digit
+        n //= 10
+        while not n % 10:
+            n //= 10
+
+    # floor(bit_length * log10(2)), then correct by at most one digit
+    significant_digits = (n.bit_length() * 1233) >> 12
+    if significant_digits >= len(_POW10):
+        significant_digits = len(str(n))
+    elif n >= _POW10[significant_digits]:
+        significant_digits += 1
+
     # 1 byte per 2 significant digits + 1 byte
-    return math.ceil(significant_digits / 2) + 1
+    return (significant_digits + 1) // 2 + 1
+
+
+def calculate_numeric_sizes(values: "np.ndarray") -> "np.ndarray":
+    """
+    Vectorized calculate_numeric_size for a NumPy integer array (up to 64 bits).
+    Returns an int64 array of sizes, one per value.
+    """
+    if np is None:
+        raise ImportError("numpy is required for calculate_numeric_sizes. "
+                          "Install it with: pip install numpy")
+    values = np.asarray(values)
+    if values.dtype.kind == 'u':
+        magnitudes = values.astype(np.uint64)
+    else:
+        # abs(-2**63) wraps to -2**63 in int64 but is exact once viewed as uint64
+        magnitudes = np.abs(values.astype(np.int64)).astype(np.uint64)
+
+    # Trim trailing zeros; a uint64 has at most 19 of them
+    trailing = (magnitudes % 10 == 0) & (magnitudes != 0)
+    while trailing.any():
+        magnitudes[trailing] //= 10
+        trailing = (magnitudes % 10 == 0) & (magnitudes != 0)
+
+    powers = np.array(_POW10[:20], dtype=np.uint64)
+    digits = np.maximum(np.searchsorted(powers, magnitudes, side='right'), 1)
+    return ((digits + 1) // 2 + 1).astype(np.int64)
 
 
 def calculate_blob_size(value: bytes) -> int:
@@ -94,55 +150,224 @@ def calculate_boolean_size(value: bool) -> int:
     return 1
 
 
+# Rule: Fixed-width types are stored with their native serialized width, so
+# their size does not depend on the value.
+FIXED_WIDTH_TYPE_SIZES = {
+    'uuid': 16,
+    'timeuuid': 16,
+    'timestamp': 8,
+    'date': 4,
+    'time': 8,
+    'double': 8,
+    'float': 4,
+    'counter': 8,
+}
+
+
+def calculate_decimal_size(value: Union[Decimal, float, int, str]) -> int:
+    """
+    Rule: DECIMAL is a numeric type stored with variable length.
+    Size is approximately 1 byte per two significant digits + 1 byte.
+    Leading and trailing zeros are trimmed.
+    """
+    if value is None:
+        return 1  # Null value is 1 byte
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    digits = value.as_tuple().digits
+    # Trim leading and trailing zeros from the digit tuple
+    start = 0
+    end = len(digits)
+    while start < end and digits[start] == 0:
+        start += 1
+    while end > start and digits[end - 1] == 0:
+        end -= 1
+    significant_digits = max(1, end - start)
+    return math.ceil(significant_digits / 2) + 1
+
+
+def calculate_inet_size(value: Any) -> int:
+    """
+    Rule: INET is stored as the raw address bytes.
+    - IPv4: 4 bytes
+    - IPv6: 16 bytes
+    """
+    if value is None:
+        return 1  # Null value is 1 byte
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+        return value.max_prefixlen // 8
+    return 16 if ':' in str(value) else 4
+
+
+def _vint_size(value: int) -> int:
+    """Size of a zigzag-encoded signed variable-length integer (1-9 bytes)."""
+    unsigned = (value << 1) ^ (value >> 63)
+    bits = max(1, unsigned.bit_length())
+    return min(9, (9 * bits + 63) >> 6)
+
+
+def calculate_duration_size(value: Any) -> int:
+    """
+    Rule: DURATION is stored as three variable-length integers for months, days
+    and nanoseconds, each 1-9 bytes.
+    Values without months/days/nanoseconds fields (for example the literal
+    '1h30m') are sized as their string representation.
+    """
+    if value is None:
+        return 1  # Null value is 1 byte
+    if hasattr(value, 'nanoseconds'):
+        return (_vint_size(getattr(value, 'months', 0))
+                + _vint_size(getattr(value, 'days', 0))
+                + _vint_size(value.nanoseconds))
+    return _text_value_size(value)
+
+
+def _text_value_size(value: Any) -> int:
+    """String size of a value without re-encoding ASCII-only strings."""
+    if value is None:
+        return 1  # Null value is 1 byte
+    if value.__class__ is not str:
+        value = str(value)
+    return len(value) if value.isascii() else len(value.encode('utf-8'))
+
+
+def _blob_value_size(value: Any) -> int:
+    """Blob size of bytes, a hex string representation, or any bytes-like value."""
+    if value is None:
+        return 1  # Null value is 1 byte
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        # Assume hex string representation
+        return len(value) // 2
+    return len(bytes(value))
+
+
+def _fixed_width_sizer(width: int) -> Callable[[Any], int]:
+    """Return a size function for a fixed-width type that never inspects the value."""
+    def size(value):
+        return 1 if value is None else width
+    return size
+
+
+# Size function for each scalar CQL type. Types not listed here are sized as strings.
+_SCALAR_SIZERS = {
+    'ascii': _text_value_size,
+    'text': _text_value_size,
+    'varchar': _text_value_size,
+    'int': calculate_numeric_size,
+    'bigint': calculate_numeric_size,
+    'smallint': calculate_numeric_size,
+    'tinyint': calculate_numeric_size,
+    'varint': calculate_numeric_size,
+    'decimal': calculate_decimal_size,
+    'blob': _blob_value_size,
+    'boolean': calculate_boolean_size,
+    'inet': calculate_inet_size,
+    'duration': calculate_duration_size,
+}
+_SCALAR_SIZERS.update({name: _fixed_width_sizer(width) for name, width in FIXED_WIDTH_TYPE_SIZES.items()})
+
+
+class CqlType:
+    """
+    Parsed CQL data type, e.g. frozen<map<text, list<int>>> becomes
+    CqlType('frozen', (CqlType('map', (CqlType('text'), CqlType('list', (CqlType('int'),)))),)).
+
+    `size` is bound once when the type is parsed and sizes a single value of
+    this type under the calculate_data_type_size rules. `fixed_size` is the
+    non-null size of fixed-width types and None for variable-length types.
+    """
+
+    __slots__ = ('name', 'params', 'raw', 'size', 'fixed_size')
+
+    def __init__(self, name: str, params: Tuple['CqlType', ...] = (), raw: str = None):
+        self.name = name
+        self.params = params
+        self.raw = raw if raw is not None else name
+        self.size = _SCALAR_SIZERS.get(name, _text_value_size)
+        self.fixed_size = FIXED_WIDTH_TYPE_SIZES.get(name) if not params else None
+
+    def __repr__(self):
+        return f"CqlType({self.raw!r})"
+
+
+@lru_cache(maxsize=None)
+def parse_cql_type(data_type: str) -> CqlType:
+    """
+    Parse a CQL type string into a CqlType tree. Results are cached, so each
+    distinct type string is parsed once per process. The string is scanned once
+    with an explicit stack of open <...> groups, so deep nesting cannot hit the
+    recursion limit; unbalanced brackets parse as a scalar type.
+    """
+    raw = data_type.strip()
+    if '<' not in raw or not raw.endswith('>'):
+        return CqlType(raw.lower(), raw=raw)
+
+    # (type name, offset of the type in raw, parameters of the enclosing group)
+    stack = []
+    params = []
+    start = 0
+    for i, ch in enumerate(raw):
+        if ch == '<':
+            stack.append((raw[start:i].strip().lower(), start, params))
+            params = []
+            start = i + 1
+        elif ch == ',' or ch == '>':
+            part = raw[start:i].strip()
+            if part:
+                params.append(CqlType(part.lower(), raw=part))
+            start = i + 1
+            if ch == '>':
+                if not stack:
+                    return CqlType(raw.lower(), raw=raw)
+                name, type_start, parent_params = stack.pop()
+                parent_params.append(CqlType(name, tuple(params), raw=raw[type_start:i + 1].strip()))
+                params = parent_params
+
+    if stack or len(params) != 1:
+        return CqlType(raw.lower(), raw=raw)
+    return params[0]
+
+
 def calculate_data_type_size(value: Any, data_type: str) -> int:
     """
     Rule: Calculate the size of a data value based on its data type.
-    Supports: string types, numeric types, blob, boolean, null.
+    Supports: string types, numeric types (including decimal), blob, boolean,
+    inet, duration, null, and the fixed-width types in FIXED_WIDTH_TYPE_SIZES
+    (uuid, timeuuid, timestamp, date, time, double, float, counter).
     """
     if value is None:
         return 1  # Null value is 1 byte
-    
-    data_type_lower = data_type.lower()
-    
-    if data_type_lower in ['ascii', 'text', 'varchar']:
-        return calculate_string_size(str(value))
-    elif data_type_lower in ['int', 'bigint', 'smallint', 'tinyint', 'varint']:
-        return calculate_numeric_size(value)
-    elif data_type_lower == 'blob':
-        if isinstance(value, bytes):
-            return calculate_blob_size(value)
-        elif isinstance(value, str):
-            # Assume hex string representation
-            return len(value) // 2
-        else:
-            return calculate_blob_size(bytes(value))
-    elif data_type_lower == 'boolean':
-        return calculate_boolean_size(value)
-    else:
-        # Default: try to calculate as string
-        return calculate_string_size(str(value))
+    return parse_cql_type(data_type).size(value)
 
 
-def calculate_partition_key_column_size(value: Any, data_type: str, column_id_size: int) -> int:
+def calculate_partition_key_column_size(value: Any, data_type: str, column_id_size: int,
+                                        user_types: Dict[str, Dict[str, str]] = None) -> int:
     """
     Rule: Partition key columns can contain up to 2048 bytes of data.
     Each key column requires 3 bytes of metadata.
     Data is stored twice (for efficient querying and built-in indexing).
     Size = (data_type_size * 2) + column_id_size + 3 bytes metadata
+    Frozen, tuple and UDT key values are sized serialized (see key_data_sizer).
     """
-    data_size = calculate_data_type_size(value, data_type)
+    data_size = key_data_sizer(data_type, user_types)(value)
     # Data is stored twice
     return (data_size * 2) + column_id_size + 3
 
 
-def calculate_clustering_column_size(value: Any, data_type: str, column_id_size: int) -> int:
+def calculate_clustering_column_size(value: Any, data_type: str, column_id_size: int,
+                                     user_types: Dict[str, Dict[str, str]] = None) -> int:
     """
     Rule: Clustering columns can store up to 850 bytes of data.
     Requires 20% of data value size for metadata (1 byte per 5 bytes).
     Data is stored twice (for efficient querying and built-in indexing).
     Size = (data_type_size * 2) + (data_type_size * 0.2) + column_id_size
+    Frozen, tuple and UDT key values are sized serialized (see key_data_sizer).
     """
-    data_size = calculate_data_type_size(value, data_type)
+    data_size = key_data_sizer(data_type, user_types)(value)
     # Data is stored twice
     # Metadata is 20% of data value (1 byte per 5 bytes)
     metadata_size = math.ceil(data_size / 5)
@@ -159,11 +384,136 @@ def calculate_regular_column_size(value: Any, data_type: str, column_id_size: in
     return data_size + column_id_size
 
 
-def calculate_collection_size(collection: Union[List, Dict], column_id_size: int, element_data_type: str = None) -> int:
+# Type names sized as collections and the containers accepted as their values
+_SEQUENCE_COLLECTION_TYPES = ('list', 'set')
+_SEQUENCE_VALUES = (list, tuple, set, frozenset)
+
+
+def _resolve_udt(cql_type: CqlType, user_types: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    """Return the field schema for a UDT type, or None if it is not a known UDT."""
+    if not user_types or cql_type.params:
+        return None
+    return user_types.get(_unquote_identifier(cql_type.raw.split('.')[-1]))
+
+
+def calculate_serialized_value_size(value: Any, data_type: Union[str, CqlType],
+                                    user_types: Dict[str, Dict[str, str]] = None) -> int:
     """
-    Rule: Collection types (LIST, MAP) require 3 bytes of metadata.
+    Size a value as it is serialized inside a frozen type, a collection element
+    or a UDT field, resolving nested element, key, value and field types.
+
+    - Scalars: the calculate_data_type_size rules
+    - LIST/SET: 4 bytes per element + each element at its element type
+    - MAP: 4 bytes per key + 4 bytes per value + each key and value at their types
+    - TUPLE: 4 bytes per component + each component at its type
+    - UDT: 4 bytes per field in the type (including empty fields) + each
+      non-null field value at its field type. UDTs missing from user_types
+      fall back to 4 bytes per field with values sized as text. UDT values
+      are dicts or, as the driver returns and binds them, namedtuples.
+
+    The type tree is walked with an explicit stack, so deeply nested values
+    cannot hit the recursion limit.
+    """
+    cql_type = parse_cql_type(data_type) if isinstance(data_type, str) else data_type
+    size = 0
+    stack = [(value, cql_type)]
+    while stack:
+        value, cql_type = stack.pop()
+        while cql_type.name == 'frozen' and cql_type.params:
+            cql_type = cql_type.params[0]
+
+        if value is None:
+            size += 1
+            continue
+
+        name = cql_type.name
+        params = cql_type.params
+        if name in _SEQUENCE_COLLECTION_TYPES and params:
+            if isinstance(value, _SEQUENCE_VALUES):
+                size += 4 * len(value)
+                element_type = params[0]
+                stack.extend((element, element_type) for element in value)
+            else:
+                size += 4
+        elif name == 'map' and len(params) == 2:
+            if isinstance(value, dict):
+                size += 8 * len(value)
+                key_type, value_type = params
+                for k, v in value.items():
+                    stack.append((k, key_type))
+                    stack.append((v, value_type))
+            else:
+                size += 4
+        elif name == 'tuple' and params and isinstance(value, _SEQUENCE_VALUES):
+            size += 4 * len(params)
+            stack.extend(zip(value, params))
+        elif isinstance(value, dict) or hasattr(value, '_asdict'):
+            if not isinstance(value, dict):
+                value = value._asdict()
+            udt_schema = _resolve_udt(cql_type, user_types)
+            if udt_schema is None:
+                size += 4 * len(value) + sum(_text_value_size(v) for v in value.values())
+                continue
+            size += 4 * len(udt_schema)
+            for field_name, field_value in value.items():
+                field_data_type = udt_schema.get(field_name)
+                if field_data_type is not None and field_value is not None:
+                    stack.append((field_value, parse_cql_type(field_data_type)))
+        else:
+            size += cql_type.size(value)
+    return size
+
+
+def is_serialized_type(data_type: Union[str, CqlType], user_types: Dict[str, Dict[str, str]] = None) -> bool:
+    """
+    True for types whose values are stored serialized as a whole and sized with
+    calculate_serialized_value_size: frozen types, tuples (which are always
+    frozen) and UDTs found in user_types.
+    """
+    cql_type = parse_cql_type(data_type) if isinstance(data_type, str) else data_type
+    return cql_type.name in ('frozen', 'tuple') or _resolve_udt(cql_type, user_types) is not None
+
+
+def key_data_sizer(data_type: str, user_types: Dict[str, Dict[str, str]] = None) -> Callable[[Any], int]:
+    """
+    Return a function giving the data size of a partition key or clustering
+    column value, the size the key limits apply to: frozen collections,
+    tuples and UDTs at their serialized size, other types under the
+    calculate_data_type_size rules.
+    """
+    cql_type = parse_cql_type(data_type)
+    if is_serialized_type(cql_type, user_types):
+        return lambda value: calculate_serialized_value_size(value, cql_type, user_types)
+    return cql_type.size
+
+
+def _collection_types(data_type: Union[str, CqlType]) -> Tuple[CqlType, CqlType]:
+    """
+    Return the (element or key type, value type) of a collection type. A scalar
+    type is used for every element, key and value, and no type means text.
+    """
+    cql_type = parse_cql_type(data_type or 'text') if not isinstance(data_type, CqlType) else data_type
+    while cql_type.name == 'frozen' and cql_type.params:
+        cql_type = cql_type.params[0]
+    if cql_type.name == 'map' and len(cql_type.params) == 2:
+        return cql_type.params
+    if cql_type.name in _SEQUENCE_COLLECTION_TYPES and cql_type.params:
+        return cql_type.params[0], cql_type.params[0]
+    return cql_type, cql_type
+
+
+def calculate_collection_size(collection: Union[List, Dict], column_id_size: int,
+                              element_data_type: Union[str, CqlType] = None,
+                              user_types: Dict[str, Dict[str, str]] = None) -> int:
+    """
+    Rule: Collection types (LIST, SET, MAP) require 3 bytes of metadata.
     Each element requires 1 byte of metadata.
     Size = column_id + sum(size of nested elements + 1 byte metadata) + 3 bytes
+
+    element_data_type is either the collection's own type, e.g. map<text, list<int>>,
+    whose element, key and value types are resolved separately, or a single
+    type used for every element, key and value. Nested elements are sized with
+    calculate_serialized_value_size.
     """
     # Base metadata for collection
     size = column_id_size + 3
@@ -171,33 +521,38 @@ def calculate_collection_size(collection: Union[List, Dict], column_id_size: int
     if collection is None:
         return size  # Empty collection
     
-    if isinstance(collection, list):
-        # LIST: each element has 1 byte metadata
+    key_type, value_type = _collection_types(element_data_type)
+    if isinstance(collection, _SEQUENCE_VALUES):
+        # LIST/SET: each element has 1 byte metadata
         for element in collection:
-            element_size = calculate_data_type_size(element, element_data_type or 'text')
-            size += element_size + 1
+            size += calculate_serialized_value_size(element, value_type, user_types) + 1
     elif isinstance(collection, dict):
         # MAP: each key-value pair has metadata
         for key, value in collection.items():
-            key_size = calculate_data_type_size(key, element_data_type or 'text')
-            value_size = calculate_data_type_size(value, element_data_type or 'text')
+            key_size = calculate_serialized_value_size(key, key_type, user_types)
+            value_size = calculate_serialized_value_size(value, value_type, user_types)
             size += key_size + value_size + 1  # 1 byte metadata per pair
     
     return size
 
 
-def calculate_udt_size(udt_data: Dict[str, Any], udt_schema: Dict[str, str], column_id_size: int) -> int:
+def calculate_udt_size(udt_data: Dict[str, Any], udt_schema: Dict[str, str], column_id_size: int,
+                       user_types: Dict[str, Dict[str, str]] = None) -> int:
     """
     Rule: User-defined type (UDT) requires 3 bytes for metadata.
     Each UDT element requires 1 byte of metadata.
     Field name identifier size depends on number of fields (1-3 bytes).
-    Field value size depends on the data type.
+    Field value size depends on the data type; frozen fields, including nested
+    UDTs found in user_types, are sized with calculate_serialized_value_size.
     """
     # Base metadata for UDT
     size = column_id_size + 3
     
     if not udt_data:
         return size
+    if hasattr(udt_data, '_asdict'):
+        # UDT value as returned by the driver
+        udt_data = udt_data._asdict()
     
     total_fields = len(udt_schema)
     field_id_size = calculate_udt_field_id_size(total_fields)
@@ -212,12 +567,7 @@ def calculate_udt_size(udt_data: Dict[str, Any], udt_schema: Dict[str, str], col
         size += field_id_size
         
         # Field value size
-        if field_data_type.startswith('frozen<'):
-            # Handle frozen UDT or frozen collections
-            size += calculate_frozen_type_size(field_value, field_data_type)
-        else:
-            # Regular scalar data type
-            size += calculate_data_type_size(field_value, field_data_type)
+        size += calculate_serialized_value_size(field_value, field_data_type, user_types)
         
         # 1 byte metadata per UDT element
         size += 1
@@ -225,35 +575,15 @@ def calculate_udt_size(udt_data: Dict[str, Any], udt_schema: Dict[str, str], col
     return size
 
 
-def calculate_frozen_type_size(value: Any, data_type: str) -> int:
+def calculate_frozen_type_size(value: Any, data_type: str, user_types: Dict[str, Dict[str, str]] = None) -> int:
     """
     Rule: Frozen UDT or frozen collections use CQL binary protocol serialization.
     - Frozen UDT: 4 bytes per field (including empty fields)
     - Frozen LIST/SET: 4 bytes per element + CQL binary protocol serialization
     - Frozen MAP: 4 bytes per key + 4 bytes per value + CQL binary protocol serialization
+    Nested values are sized at their own types; see calculate_serialized_value_size.
     """
-    if data_type.startswith('frozen<udt'):
-        # For frozen UDT, estimate 4 bytes per field
-        if isinstance(value, dict):
-            return len(value) * 4 + sum(calculate_data_type_size(v, 'text') for v in value.values())
-        return 4
-    elif data_type.startswith('frozen<list') or data_type.startswith('frozen<set'):
-        # Frozen LIST/SET: 4 bytes per element
-        if isinstance(value, list):
-            return sum(4 + calculate_data_type_size(item, 'text') for item in value)
-        return 4
-    elif data_type.startswith('frozen<map'):
-        # Frozen MAP: 4 bytes per key + 4 bytes per value
-        if isinstance(value, dict):
-            total = 0
-            for k, v in value.items():
-                total += 4 + calculate_data_type_size(k, 'text')
-                total += 4 + calculate_data_type_size(v, 'text')
-            return total
-        return 4
-    else:
-        # Default: treat as regular data type
-        return calculate_data_type_size(value, data_type.replace('frozen<', '').replace('>', ''))
+    return calculate_serialized_value_size(value, data_type, user_types)
 
 
 def calculate_static_column_size(value: Any, data_type: str, column_id_size: int) -> int:
@@ -275,7 +605,8 @@ def calculate_row_size(
     column_data_types: Dict[str, str],
     include_row_metadata: bool = False,
     include_client_timestamps: bool = False,
-    include_ttl: bool = False
+    include_ttl: bool = False,
+    user_types: Dict[str, Dict[str, str]] = None
 ) -> int:
     """
     Calculate the total encoded size of a Cassandra row in Amazon Keyspaces.
@@ -291,6 +622,8 @@ def calculate_row_size(
         include_row_metadata: If True, add 100 bytes for row metadata (for storage size)
         include_client_timestamps: If True, add 20-40 bytes for client-side timestamps
         include_ttl: If True, add 8 bytes per row + 8 bytes per column for TTL metadata
+        user_types: UDT definitions used for UDTs nested in collections, frozen
+                    types and other UDTs, mapping type name to {field_name: data_type}
     
     Returns:
         Total encoded size of the row in bytes
@@ -309,7 +642,8 @@ def calculate_row_size(
         if pk_col in row:
             value = row[pk_col]
             data_type = column_data_types.get(pk_col, 'text')
-            total_size += calculate_partition_key_column_size(value, data_type, column_id_size)
+            total_size += calculate_partition_key_column_size(
+                value, data_type, column_id_size, _column_user_types(pk_col, data_type, udt_schemas, user_types))
     
     # Calculate clustering columns size
     # Rule: Clustering columns are stored twice + 20% metadata each
@@ -317,7 +651,8 @@ def calculate_row_size(
         if ck_col in row:
             value = row[ck_col]
             data_type = column_data_types.get(ck_col, 'text')
-            total_size += calculate_clustering_column_size(value, data_type, column_id_size)
+            total_size += calculate_clustering_column_size(
+                value, data_type, column_id_size, _column_user_types(ck_col, data_type, udt_schemas, user_types))
     
     # Calculate regular columns size
     regular_columns = set(row.keys()) - set(partition_keys) - set(clustering_keys) - set(static_columns)
@@ -326,12 +661,19 @@ def calculate_row_size(
             value = row[col]
             data_type = column_data_types.get(col, 'text')
             
+            # Tuples are always frozen, whether or not the type says so
+            is_frozen = parse_cql_type(data_type).name in ('frozen', 'tuple')
+            
             # Check if it's a UDT
-            if col in udt_schemas:
-                total_size += calculate_udt_size(value, udt_schemas[col], column_id_size)
+            if col in udt_schemas and not is_frozen:
+                total_size += calculate_udt_size(value, udt_schemas[col], column_id_size, user_types)
+            # Check if it's a frozen UDT, frozen collection or tuple
+            elif is_frozen:
+                column_user_types = _column_user_types(col, data_type, udt_schemas, user_types)
+                total_size += calculate_frozen_type_size(value, data_type, column_user_types) + column_id_size
             # Check if it's a collection
-            elif isinstance(value, (list, dict)) and not data_type.startswith('frozen'):
-                total_size += calculate_collection_size(value, column_id_size, data_type)
+            elif isinstance(value, (list, dict, set, tuple)):
+                total_size += calculate_collection_size(value, column_id_size, data_type, user_types)
             else:
                 total_size += calculate_regular_column_size(value, data_type, column_id_size)
     
@@ -362,6 +704,985 @@ def calculate_row_size(
     return total_size
 
 
+def _column_user_types(col: str, data_type: str, udt_schemas: Dict[str, Dict[str, str]],
+                       user_types: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """user_types, plus the column's own UDT schema when udt_schemas has one for it."""
+    if col not in udt_schemas:
+        return user_types
+    return dict(user_types or {}, **{_udt_name(data_type): udt_schemas[col]})
+
+
+class RowSizeVariants(NamedTuple):
+    """
+    Every size calculate_row_size can report for one row, derived from a single
+    traversal of the row:
+    - throughput: encoded row size used for capacity units
+    - storage: throughput + 100 bytes of row metadata
+    - storage_with_ttl: storage + 8 bytes per row + 8 bytes per column
+    - storage_with_client_timestamps: storage + 30 bytes (20-40, average 30)
+    - storage_with_ttl_and_client_timestamps: storage + both
+    """
+    throughput: int
+    storage: int
+    storage_with_ttl: int
+    storage_with_client_timestamps: int
+    storage_with_ttl_and_client_timestamps: int
+
+    @classmethod
+    def from_throughput_size(cls, throughput: int, column_count: int) -> 'RowSizeVariants':
+        """Build the variants from a throughput size and the number of columns in the row."""
+        storage = throughput + 100
+        ttl = 8 + column_count * 8
+        client_timestamps = 30
+        return cls(
+            throughput,
+            storage,
+            storage + ttl,
+            storage + client_timestamps,
+            storage + ttl + client_timestamps,
+        )
+
+
+def calculate_row_size_variants(
+    row: Dict[str, Any],
+    partition_keys: List[str],
+    clustering_keys: List[str],
+    static_columns: List[str],
+    udt_schemas: Dict[str, Dict[str, str]],
+    column_data_types: Dict[str, str],
+    user_types: Dict[str, Dict[str, str]] = None
+) -> RowSizeVariants:
+    """
+    Calculate the throughput size and every storage size variant of a row in one
+    pass, instead of calling calculate_row_size once per combination of the
+    include_row_metadata, include_client_timestamps and include_ttl flags.
+    Arguments are the same as calculate_row_size.
+    """
+    throughput = calculate_row_size(row, partition_keys, clustering_keys, static_columns,
+                                    udt_schemas, column_data_types, user_types=user_types)
+    return RowSizeVariants.from_throughput_size(throughput, len(row))
+
+
+class RowSizer:
+    """
+    Compiled row sizer for a single table.
+
+    The table schema is resolved once into a per-column sizing closure so that
+    sizing a row is a dictionary lookup and a function call per column, instead
+    of rebuilding column sets and redoing the data type dispatch on every row as
+    calculate_row_size does. Sizes follow the same rules as calculate_row_size,
+    except that the column identifier size is derived from every column in the
+    schema rather than from the columns present in each row.
+
+    Example:
+        sizer = RowSizer(['account'], ['user'], [], {}, column_data_types)
+        sizes = sizer.size_batch(rows)
+        stats = summarize_row_sizes(sizes)
+    """
+
+    def __init__(
+        self,
+        partition_keys: List[str],
+        clustering_keys: List[str],
+        static_columns: List[str],
+        udt_schemas: Dict[str, Dict[str, str]],
+        column_data_types: Dict[str, str],
+        include_row_metadata: bool = False,
+        include_client_timestamps: bool = False,
+        include_ttl: bool = False,
+        user_types: Dict[str, Dict[str, str]] = None
+    ):
+        self.partition_keys = list(partition_keys)
+        self.clustering_keys = list(clustering_keys)
+        self.static_columns = list(static_columns)
+        self.udt_schemas = dict(udt_schemas)
+        self.column_data_types = dict(column_data_types)
+        self.user_types = dict(user_types or {})
+        self.include_ttl = include_ttl
+
+        all_columns = set(self.partition_keys + self.clustering_keys + self.static_columns)
+        all_columns.update(self.column_data_types.keys())
+        all_columns.update(self.udt_schemas.keys())
+        all_columns.discard(None)
+        self.column_id_size = calculate_column_id_size(len(all_columns))
+
+        # Fixed per-row overhead from the storage/TTL/timestamp options
+        self.row_overhead = 0
+        if include_row_metadata:
+            self.row_overhead += 100
+        if include_client_timestamps:
+            # Approximately 20-40 bytes, use average of 30
+            self.row_overhead += 30
+        if include_ttl:
+            # 8 bytes per row, plus 8 bytes per column added in size_row
+            self.row_overhead += 8
+
+        self._column_sizers = {col: self._compile_column(col) for col in all_columns}
+
+    def key_data_sizer(self, col: str) -> Callable[[Any], int]:
+        """Return the data size function of a key column (see key_data_sizer)."""
+        data_type = self.column_data_types.get(col, 'text')
+        return key_data_sizer(data_type, _column_user_types(col, data_type, self.udt_schemas, self.user_types))
+
+    def _compile_column(self, col: str) -> Callable[[Any], int]:
+        """Build the sizing closure for one column based on its role and data type."""
+        data_type = self.column_data_types.get(col, 'text')
+        column_id_size = self.column_id_size
+        value_size = parse_cql_type(data_type).size
+
+        if col in self.partition_keys:
+            # Stored twice + 3 bytes metadata
+            key_size = self.key_data_sizer(col)
+            return lambda value: (key_size(value) * 2) + column_id_size + 3
+
+        if col in self.clustering_keys:
+            value_size = self.key_data_sizer(col)
+            # Stored twice + 20% metadata
+            def clustering_size(value):
+                data_size = value_size(value)
+                return (data_size * 2) + math.ceil(data_size / 5) + column_id_size
+            return clustering_size
+
+        if col in self.static_columns:
+            # Static columns don't count toward row size
+            return lambda value: 0
+
+        user_types = self.user_types
+        cql_type = parse_cql_type(data_type)
+        # Tuples are always frozen, whether or not the type says so
+        is_frozen = cql_type.name in ('frozen', 'tuple')
+
+        if col in self.udt_schemas and not is_frozen:
+            udt_schema = self.udt_schemas[col]
+            return lambda value: calculate_udt_size(value, udt_schema, column_id_size, user_types)
+
+        if is_frozen:
+            user_types = _column_user_types(col, data_type, self.udt_schemas, user_types)
+            return lambda value: calculate_serialized_value_size(value, cql_type, user_types) + column_id_size
+
+        def regular_size(value):
+            if isinstance(value, (list, dict, set, tuple)):
+                return calculate_collection_size(value, column_id_size, cql_type, user_types)
+            return value_size(value) + column_id_size
+        return regular_size
+
+    def _column_sizer(self, col: str) -> Callable[[Any], int]:
+        """Return the closure for a column, compiling columns missing from the schema as text."""
+        sizer = self._column_sizers.get(col)
+        if sizer is None:
+            sizer = self._column_sizers[col] = self._compile_column(col)
+        return sizer
+
+    def size_row(self, row: Dict[str, Any]) -> int:
+        """Return the encoded size of a single row in bytes."""
+        sizers = self._column_sizers
+        total_size = self.row_overhead
+        for col, value in row.items():
+            sizer = sizers.get(col) or self._column_sizer(col)
+            total_size += sizer(value)
+        if self.include_ttl:
+            total_size += len(row) * 8
+        return total_size
+
+    def size_rows(self, rows: Iterable[Dict[str, Any]]) -> Iterator[int]:
+        """Lazily size an iterable of rows, yielding one size per row."""
+        size_row = self.size_row
+        for row in rows:
+            yield size_row(row)
+
+    def size_row_variants(self, row: Dict[str, Any]) -> RowSizeVariants:
+        """
+        Return the throughput size and every storage size variant of a row from
+        one pass over its columns. The sizer's own include_* options are ignored.
+        """
+        sizers = self._column_sizers
+        throughput = 0
+        for col, value in row.items():
+            sizer = sizers.get(col) or self._column_sizer(col)
+            throughput += sizer(value)
+        return RowSizeVariants.from_throughput_size(throughput, len(row))
+
+    def size_batch(self, rows: Iterable[Dict[str, Any]]) -> "np.ndarray":
+        """Size a batch of rows and return the sizes as a NumPy int64 array."""
+        if np is None:
+            raise ImportError("numpy is required for RowSizer.size_batch. "
+                              "Install it with: pip install numpy")
+        count = len(rows) if hasattr(rows, '__len__') else -1
+        return np.fromiter(self.size_rows(rows), dtype=np.int64, count=count)
+
+
+def summarize_row_sizes(sizes: Union["np.ndarray", List[int]]) -> Dict[str, float]:
+    """
+    Summarize a batch of row sizes using the same fields the row size sampler
+    reports: lines, average, stdev, min, max. stdev is the population standard
+    deviation.
+    """
+    if len(sizes) == 0:
+        return {'lines': 0, 'average': 0.0, 'stdev': 0.0, 'min': 0, 'max': 0}
+
+    if np is not None:
+        sizes = np.asarray(sizes, dtype=np.int64)
+        return {
+            'lines': int(sizes.size),
+            'average': float(sizes.mean()),
+            'stdev': float(sizes.std()),
+            'min': int(sizes.min()),
+            'max': int(sizes.max()),
+        }
+
+    count = len(sizes)
+    average = sum(sizes) / count
+    variance = sum((size - average) ** 2 for size in sizes) / count
+    return {
+        'lines': count,
+        'average': average,
+        'stdev': math.sqrt(variance),
+        'min': min(sizes),
+        'max': max(sizes),
+    }
+
+
+# Capacity unit sizes used to derive the expected units per row
+WRITE_UNIT_BYTES = 1024  # 1 KB per write capacity unit
+READ_UNIT_BYTES = 4096   # 4 KB per read capacity unit
+
+
+class RowSizeHistogram:
+    """
+    Constant-memory, mergeable distribution of row sizes.
+
+    Sizes are counted in log-scale buckets with 16 sub-buckets per power of two
+    (sizes under 32 bytes are exact, larger sizes are within ~6%), which is
+    enough for percentiles. The expected write and read units per row are
+    tracked exactly: each row adds ceil(size / 1 KB) write units and
+    ceil(size / 4 KB) read units, so rows that cross a unit boundary are
+    charged as they are billed instead of being hidden in the average.
+
+    Histograms from different samplers, token ranges or nodes can be combined
+    with merge(), and written to or read from a row size sampler line with
+    to_fields() / from_fields().
+    """
+
+    SUB_BUCKET_BITS = 4
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.min = None
+        self.max = None
+        self.write_units = 0
+        self.read_units = 0
+        self.buckets = {}
+
+    @classmethod
+    def bucket_index(cls, size: int) -> int:
+        """Map a size in bytes to its bucket index."""
+        bits = cls.SUB_BUCKET_BITS
+        if size < (2 << bits):
+            return size
+        shift = size.bit_length() - bits - 1
+        return (shift << bits) + (size >> shift)
+
+    @classmethod
+    def bucket_bounds(cls, index: int) -> Tuple[int, int]:
+        """Return the inclusive (lower, upper) sizes covered by a bucket."""
+        bits = cls.SUB_BUCKET_BITS
+        if index < (2 << bits):
+            return index, index
+        shift = (index >> bits) - 1
+        mantissa = index - (shift << bits)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def add(self, size: int, count: int = 1) -> None:
+        """Record `count` rows of `size` bytes."""
+        self.count += count
+        self.total += size * count
+        self.squares += size * size * count
+        if self.min is None or size < self.min:
+            self.min = size
+        if self.max is None or size > self.max:
+            self.max = size
+        self.write_units += max(1, -(-size // WRITE_UNIT_BYTES)) * count
+        self.read_units += max(1, -(-size // READ_UNIT_BYTES)) * count
+        index = self.bucket_index(size)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def add_many(self, sizes: Iterable[int]) -> None:
+        """Record every size in an iterable or NumPy array."""
+        if np is not None and isinstance(sizes, np.ndarray):
+            values, counts = np.unique(sizes.astype(np.int64), return_counts=True)
+            for size, count in zip(values.tolist(), counts.tolist()):
+                self.add(size, count)
+            return
+        for size in sizes:
+            self.add(size)
+
+    def merge(self, other: 'RowSizeHistogram') -> 'RowSizeHistogram':
+        """Fold another histogram into this one and return self."""
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.write_units += other.write_units
+        self.read_units += other.read_units
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        return self
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    @property
+    def stdev(self) -> float:
+        """Population standard deviation."""
+        if not self.count:
+            return 0
+        return math.sqrt(max(0, self.squares / self.count - self.average ** 2))
+
+    @property
+    def expected_write_units(self) -> float:
+        """Mean write capacity units per row over the distribution."""
+        return self.write_units / self.count if self.count else 0
+
+    @property
+    def expected_read_units(self) -> float:
+        """Mean read capacity units per row over the distribution."""
+        return self.read_units / self.count if self.count else 0
+
+    def percentile(self, pct: float) -> int:
+        """Return the upper bound of the bucket holding the pct-th percentile, capped at max."""
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self.bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def size_sampler(self, rand: Callable[[], float] = random.random) -> Callable[[], int]:
+        """
+        Return a function drawing random sizes from this distribution: a bucket
+        is picked with probability proportional to its count and a size uniformly
+        within its bounds, clipped to [min, max]. Used to generate benchmark rows
+        that follow a sampled table's row sizes.
+        """
+        if not self.count:
+            raise ValueError("cannot sample an empty histogram")
+        indexes = sorted(self.buckets)
+        cumulative = []
+        seen = 0
+        for index in indexes:
+            seen += self.buckets[index]
+            cumulative.append(seen)
+        bounds = [self.bucket_bounds(index) for index in indexes]
+        low_limit = self.min if self.min is not None else 0
+        high_limit = self.max if self.max is not None else bounds[-1][1]
+
+        def sample() -> int:
+            lower, upper = bounds[bisect.bisect_right(cumulative, rand() * seen)]
+            lower, upper = max(lower, low_limit), min(upper, high_limit)
+            return lower + int(rand() * (upper - lower + 1)) if upper > lower else lower
+        return sample
+
+    def to_fields(self) -> Dict[str, str]:
+        """
+        Fields appended to a row size sampler line. The histogram is encoded as
+        space-separated index'x'count pairs so the line stays parseable by
+        parse_row_size_info.
+        """
+        encoded = ' '.join(f"{index}x{count}" for index, count in sorted(self.buckets.items()))
+        return {
+            'p50': f"{self.percentile(50)} bytes",
+            'p90': f"{self.percentile(90)} bytes",
+            'p99': f"{self.percentile(99)} bytes",
+            'write-units': f"{self.expected_write_units:.4f}",
+            'read-units': f"{self.expected_read_units:.4f}",
+            'histogram': encoded,
+        }
+
+    @classmethod
+    def from_fields(cls, fields: Dict[str, str]) -> 'RowSizeHistogram':
+        """
+        Rebuild a histogram from a parsed row size sampler line (as returned by
+        parse_row_size_info). Returns None when the line has no histogram.
+        """
+        encoded = fields.get('histogram')
+        if not encoded:
+            return None
+        histogram = cls()
+        for pair in encoded.split():
+            index, count = pair.split('x')
+            histogram.buckets[int(index)] = int(count)
+        histogram.count = sum(histogram.buckets.values())
+
+        def number(key):
+            return float(fields.get(key, '0').split()[0])
+
+        # Sums are rebuilt from the line's summary fields
+        average = number('average')
+        stdev = number('stdev')
+        histogram.total = average * histogram.count
+        histogram.squares = (stdev ** 2 + average ** 2) * histogram.count
+        histogram.min = int(number('min'))
+        histogram.max = int(number('max'))
+        histogram.write_units = number('write-units') * histogram.count
+        histogram.read_units = number('read-units') * histogram.count
+        return histogram
+
+
+def format_row_size_line(keyspace: str, table: str, stats: RowSizeHistogram, columns: int,
+                         blob: str, default_ttl: str, static: str, partitions: int = None) -> str:
+    """
+    Format one table's results in the row-size-sampler.sh output format, followed
+    by the number of distinct partitions the rows came from (when known), and the
+    percentiles, expected capacity units per row and bucket counts from the
+    RowSizeHistogram. This is the line format parse_row_size_info reads.
+    """
+    extra = ', '.join(f"{key}: {value}" for key, value in stats.to_fields().items())
+    if partitions is not None:
+        extra = f"partitions: {partitions}, {extra}"
+    return (f"{keyspace}.{table} = {{ lines: {stats.count}, columns: {columns}, "
+            f"average: {int(stats.average)} bytes, stdev: {int(stats.stdev)} bytes, "
+            f"min: {stats.min or 0} bytes, max: {stats.max or 0} bytes, "
+            f"blob: {blob}, default-ttl: {default_ttl}, static: {static}, {extra}}}")
+
+
+def parse_row_size_line(line: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a row size sampler line into ('keyspace.table', {field: value}), the
+    inverse of format_row_size_line and the same parsing as parse_row_size_info
+    in cost-estimate-report.py. Returns None for lines in any other format.
+    """
+    name, sep, body = line.strip().partition('=')
+    body = body.strip()
+    if not sep or not body.startswith('{') or not body.endswith('}'):
+        return None
+    fields = {}
+    for field in body[1:-1].split(','):
+        key, sep, value = field.partition(':')
+        if sep:
+            fields[key.strip()] = value.strip()
+    return name.strip(), fields
+
+
+def format_table_line(keyspace: str, table: str, schema: Dict[str, Any], default_ttl: int,
+                      stats: RowSizeHistogram, partitions: int = None) -> str:
+    """Derive the blob/default-ttl/static flags for a table and format its output line."""
+    column_types = schema['column_data_types']
+
+    # Flags follow row-size-sampler.sh: default-ttl is 'n' when default_time_to_live = 0
+    blob = 'y' if any('blob' in t.lower() for t in column_types.values()) else 'n'
+    ttl = 'n' if default_ttl == 0 else 'y'
+    static = 'y' if schema['static_columns'] else 'n'
+
+    return format_row_size_line(keyspace, table, stats, len(column_types), blob, ttl, static, partitions)
+
+
+# Amazon Keyspaces per-row quotas checked by RowLimitValidator
+MAX_ROW_SIZE_BYTES = 1024 * 1024       # 1 MB encoded row size
+MAX_PARTITION_KEY_BYTES = 2048         # combined data of the partition key columns
+MAX_CLUSTERING_COLUMN_BYTES = 850      # data of each clustering column
+
+
+class RowLimitReport:
+    """
+    Mergeable record of rows that exceed the Amazon Keyspaces row size and key
+    size limits: a violation count per (limit, column) and, for each, the top-k
+    largest offending primary keys kept in a bounded min-heap, so memory use does
+    not grow with the number of rows checked.
+
+    limit is 'row', 'partition_key' or 'clustering'; column is None for the row
+    limit, the comma separated partition key columns, or the clustering column.
+    """
+
+    def __init__(self, top_k: int = 10, limits: Dict[str, int] = None):
+        self.top_k = top_k
+        self.limits = dict(limits or {
+            'row': MAX_ROW_SIZE_BYTES,
+            'partition_key': MAX_PARTITION_KEY_BYTES,
+            'clustering': MAX_CLUSTERING_COLUMN_BYTES,
+        })
+        self.rows = 0
+        self.counts = {}
+        self.offenders = {}
+        self._seq = 0
+
+    @property
+    def violations(self) -> int:
+        return sum(self.counts.values())
+
+    def _push(self, entry: Tuple[str, str], size: int, key: str) -> None:
+        heap = self.offenders.setdefault(entry, [])
+        # The sequence number breaks size ties so keys are never compared
+        item = (size, self._seq, key)
+        self._seq += 1
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, item)
+        elif size > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def record(self, limit: str, column: str, size: int, key: str) -> None:
+        """Count one violation and keep its key if it is among the top-k largest."""
+        entry = (limit, column)
+        self.counts[entry] = self.counts.get(entry, 0) + 1
+        self._push(entry, size, key)
+
+    def merge(self, other: 'RowLimitReport') -> 'RowLimitReport':
+        """Fold another report into this one and return self."""
+        self.rows += other.rows
+        for entry, count in other.counts.items():
+            self.counts[entry] = self.counts.get(entry, 0) + count
+        for entry, heap in other.offenders.items():
+            for size, _, key in heap:
+                self._push(entry, size, key)
+        return self
+
+    def top_offenders(self, limit: str, column: str = None) -> List[Tuple[int, str]]:
+        """Return the kept (size, key) pairs for a limit and column, largest first."""
+        heap = self.offenders.get((limit, column), [])
+        return [(size, key) for size, _, key in sorted(heap, reverse=True)]
+
+    def format_lines(self, table: str) -> List[str]:
+        """Human-readable summary of the violations, one limit and column per block."""
+        if not self.counts:
+            return [f"{table}: {self.rows} rows within the Amazon Keyspaces row and key size limits"]
+
+        labels = {
+            'row': lambda column: 'row size',
+            'partition_key': lambda column: f"partition key ({column})",
+            'clustering': lambda column: f"clustering column {column}",
+        }
+        lines = [f"{table}: {self.violations} limit violations in {self.rows} rows"]
+        order = list(self.limits)
+        for (limit, column), count in sorted(self.counts.items(),
+                                             key=lambda item: (order.index(item[0][0]), item[0][1] or '')):
+            lines.append(f"  {labels[limit](column)} > {self.limits[limit]} bytes: {count} rows")
+            for size, key in self.top_offenders(limit, column):
+                lines.append(f"    {size} bytes  {key}")
+        return lines
+
+
+class RowLimitValidator:
+    """
+    Wraps a RowSizer to check every sized row against the Amazon Keyspaces
+    limits: the 1 MB row size, the 2048 byte partition key and the 850 byte
+    clustering column limits. Key sizes are the data sizes of the key values
+    (RowSizer.key_data_sizer, serialized for frozen, tuple and UDT keys);
+    the row size is the size the RowSizer reports.
+
+    size_row and size_rows return the same sizes as the wrapped RowSizer, so a
+    validator can be used anywhere a sizer is and the check costs no extra pass
+    over the rows. Violations are collected in `report`.
+
+    Example:
+        validator = RowLimitValidator(registry.get('store.orders'), top_k=20)
+        for size in validator.size_rows(rows):
+            histogram.add(size)
+        print('\\n'.join(validator.report.format_lines('store.orders')))
+    """
+
+    def __init__(
+        self,
+        sizer: RowSizer,
+        top_k: int = 10,
+        max_row_size: int = MAX_ROW_SIZE_BYTES,
+        max_partition_key_size: int = MAX_PARTITION_KEY_BYTES,
+        max_clustering_column_size: int = MAX_CLUSTERING_COLUMN_BYTES
+    ):
+        self.sizer = sizer
+        self.max_row_size = max_row_size
+        self.max_partition_key_size = max_partition_key_size
+        self.max_clustering_column_size = max_clustering_column_size
+        self.report = RowLimitReport(top_k, {
+            'row': max_row_size,
+            'partition_key': max_partition_key_size,
+            'clustering': max_clustering_column_size,
+        })
+
+        self._key_columns = sizer.partition_keys + sizer.clustering_keys
+        self._partition_key_label = ','.join(sizer.partition_keys)
+        self._partition_key_sizers = [(col, sizer.key_data_sizer(col)) for col in sizer.partition_keys]
+        self._clustering_sizers = [(col, sizer.key_data_sizer(col)) for col in sizer.clustering_keys]
+
+    def _row_key(self, row: Dict[str, Any]) -> str:
+        """Primary key of a row for the report, with long values truncated."""
+        parts = []
+        for col in self._key_columns:
+            value = str(row.get(col))
+            if len(value) > 64:
+                value = value[:61] + '...'
+            parts.append(f"{col}={value}")
+        return ', '.join(parts)
+
+    def size_row(self, row: Dict[str, Any]) -> int:
+        """Size a row with the wrapped RowSizer and record any limit it exceeds."""
+        size = self.sizer.size_row(row)
+        report = self.report
+        report.rows += 1
+
+        if size > self.max_row_size:
+            report.record('row', None, size, self._row_key(row))
+
+        key_size = 0
+        for col, value_size in self._partition_key_sizers:
+            if col in row:
+                key_size += value_size(row[col])
+        if key_size > self.max_partition_key_size:
+            report.record('partition_key', self._partition_key_label, key_size, self._row_key(row))
+
+        for col, value_size in self._clustering_sizers:
+            if col in row:
+                key_size = value_size(row[col])
+                if key_size > self.max_clustering_column_size:
+                    report.record('clustering', col, key_size, self._row_key(row))
+
+        return size
+
+    def size_rows(self, rows: Iterable[Dict[str, Any]]) -> Iterator[int]:
+        """Lazily size and check an iterable of rows, yielding one size per row."""
+        size_row = self.size_row
+        for row in rows:
+            yield size_row(row)
+
+
+def _split_top_level(text: str, sep: str = ',') -> List[str]:
+    """Split text on `sep` outside of (), <> and quotes."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ('"', "'"):
+            quote = ch
+        elif ch in '(<':
+            depth += 1
+        elif ch in ')>':
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def _unquote_identifier(name: str) -> str:
+    """Strip CQL double quotes from an identifier; unquoted identifiers are case-insensitive."""
+    name = name.strip()
+    if len(name) >= 2 and name[0] == '"' and name[-1] == '"':
+        return name[1:-1].replace('""', '"')
+    return name.lower()
+
+
+def _qualified_name(name: str, current_keyspace: str) -> Tuple[str, str]:
+    """Split `ks.name` (or `name` after USE ks) into (keyspace, name)."""
+    parts = _split_top_level(name, '.')
+    if len(parts) == 2:
+        return _unquote_identifier(parts[0]), _unquote_identifier(parts[1])
+    return current_keyspace, _unquote_identifier(parts[0])
+
+
+def _strip_cql_comments(cql: str) -> str:
+    """Remove --, // and /* */ comments from CQL text, leaving quoted strings intact."""
+    return re.sub(r"('(?:[^']|'')*')|/\*.*?\*/|(?:--|//)[^\n]*",
+                  lambda match: match.group(1) or ' ', cql, flags=re.DOTALL)
+
+
+def _udt_name(data_type: str) -> str:
+    """Return the type name with any frozen<...> wrapper and keyspace prefix removed."""
+    cql_type = parse_cql_type(data_type)
+    while cql_type.name == 'frozen' and cql_type.params:
+        cql_type = cql_type.params[0]
+    if cql_type.params:
+        return None
+    return _unquote_identifier(cql_type.raw.split('.')[-1])
+
+
+def build_table_schema(
+    columns: List[Tuple[str, str, str, int]],
+    user_types: Dict[str, Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Build the calculate_row_size / RowSizer arguments for one table.
+
+    Args:
+        columns: (column_name, data_type, kind, position) tuples, where kind is
+                 'partition_key', 'clustering', 'static' or 'regular' as in
+                 system_schema.columns
+        user_types: UDT definitions for the table's keyspace, mapping type name
+                    to an ordered {field_name: data_type} dict
+
+    Returns:
+        Dict with partition_keys, clustering_keys, static_columns, udt_schemas,
+        column_data_types and user_types
+    """
+    user_types = user_types or {}
+    partition_keys = []
+    clustering_keys = []
+    static_columns = []
+    udt_schemas = {}
+    column_data_types = {}
+
+    for name, data_type, kind, position in columns:
+        column_data_types[name] = data_type
+        if kind == 'partition_key':
+            partition_keys.append((position, name))
+        elif kind == 'clustering':
+            clustering_keys.append((position, name))
+        elif kind == 'static':
+            static_columns.append(name)
+
+        udt_name = _udt_name(data_type)
+        if udt_name in user_types:
+            udt_schemas[name] = dict(user_types[udt_name])
+
+    return {
+        'partition_keys': [name for _, name in sorted(partition_keys)],
+        'clustering_keys': [name for _, name in sorted(clustering_keys)],
+        'static_columns': static_columns,
+        'udt_schemas': udt_schemas,
+        'column_data_types': column_data_types,
+        'user_types': {name: dict(fields) for name, fields in user_types.items()},
+    }
+
+
+_CREATE_TYPE_RE = re.compile(
+    r'^CREATE\s+TYPE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>[\w."]+)\s*\((?P<body>.*)\)\s*$',
+    re.IGNORECASE | re.DOTALL)
+_CREATE_TABLE_RE = re.compile(
+    r'^CREATE\s+(?:TABLE|COLUMNFAMILY)\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>[\w."]+)\s*\((?P<rest>.*)$',
+    re.IGNORECASE | re.DOTALL)
+_USE_RE = re.compile(r'^USE\s+(?P<name>[\w"]+)\s*$', re.IGNORECASE)
+_PRIMARY_KEY_RE = re.compile(r'^PRIMARY\s+KEY\s*\((?P<key>.*)\)\s*$', re.IGNORECASE | re.DOTALL)
+_COLUMN_RE = re.compile(
+    r'^(?P<name>"(?:[^"]|"")+"|\w+)\s+(?P<type>.+?)(?P<static>\s+STATIC)?(?P<pk>\s+PRIMARY\s+KEY)?\s*$',
+    re.IGNORECASE | re.DOTALL)
+
+
+def _table_body(rest: str) -> str:
+    """Return the text inside the column-definition parentheses of a CREATE TABLE."""
+    depth = 1
+    for i, ch in enumerate(rest):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                return rest[:i]
+    return rest
+
+
+def parse_schema_cql(cql: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse CREATE TYPE and CREATE TABLE statements (for example the output of
+    `cqlsh -e "DESCRIBE SCHEMA"`) into per-table RowSizer arguments keyed by
+    'keyspace.table'. See build_table_schema for the value format.
+    """
+    statements = _split_top_level(_strip_cql_comments(cql), ';')
+    user_types = {}
+    tables = {}
+    current_keyspace = None
+
+    # UDTs must be known before tables that use them, wherever they appear
+    for statement in statements:
+        match = _CREATE_TYPE_RE.match(statement)
+        if match:
+            keyspace, type_name = _qualified_name(match.group('name'), current_keyspace)
+            fields = {}
+            for field in _split_top_level(match.group('body')):
+                field_name, field_type = field.split(None, 1)
+                fields[_unquote_identifier(field_name)] = field_type.strip()
+            user_types.setdefault(keyspace, {})[type_name] = fields
+        match = _USE_RE.match(statement)
+        if match:
+            current_keyspace = _unquote_identifier(match.group('name'))
+
+    current_keyspace = None
+    for statement in statements:
+        match = _USE_RE.match(statement)
+        if match:
+            current_keyspace = _unquote_identifier(match.group('name'))
+            continue
+
+        match = _CREATE_TABLE_RE.match(statement)
+        if not match:
+            continue
+        keyspace, table = _qualified_name(match.group('name'), current_keyspace)
+
+        definitions = []
+        primary_key = None
+        for item in _split_top_level(_table_body(match.group('rest'))):
+            pk_match = _PRIMARY_KEY_RE.match(item)
+            if pk_match:
+                primary_key = pk_match.group('key')
+                continue
+            column_match = _COLUMN_RE.match(item)
+            if not column_match:
+                continue
+            name = _unquote_identifier(column_match.group('name'))
+            definitions.append((name, column_match.group('type').strip(), bool(column_match.group('static'))))
+            if column_match.group('pk'):
+                primary_key = column_match.group('name')
+
+        partition_keys = []
+        clustering_keys = []
+        if primary_key:
+            key_parts = _split_top_level(primary_key)
+            first = key_parts[0]
+            if first.startswith('('):
+                partition_keys = [_unquote_identifier(k) for k in _split_top_level(first[1:-1])]
+            else:
+                partition_keys = [_unquote_identifier(first)]
+            clustering_keys = [_unquote_identifier(k) for k in key_parts[1:]]
+
+        columns = []
+        for name, data_type, is_static in definitions:
+            if name in partition_keys:
+                columns.append((name, data_type, 'partition_key', partition_keys.index(name)))
+            elif name in clustering_keys:
+                columns.append((name, data_type, 'clustering', clustering_keys.index(name)))
+            else:
+                columns.append((name, data_type, 'static' if is_static else 'regular', -1))
+
+        tables[f"{keyspace}.{table}"] = build_table_schema(columns, user_types.get(keyspace))
+
+    return tables
+
+
+_DEFAULT_TTL_RE = re.compile(r'\bdefault_time_to_live\s*=\s*(?P<ttl>\d+)', re.IGNORECASE)
+
+
+def parse_default_ttls(cql: str) -> Dict[str, int]:
+    """
+    Return the default_time_to_live table option of every CREATE TABLE in the
+    CQL text, keyed by 'keyspace.table'. Tables without the option map to 0.
+    """
+    ttls = {}
+    current_keyspace = None
+    for statement in _split_top_level(_strip_cql_comments(cql), ';'):
+        match = _USE_RE.match(statement)
+        if match:
+            current_keyspace = _unquote_identifier(match.group('name'))
+            continue
+        match = _CREATE_TABLE_RE.match(statement)
+        if not match:
+            continue
+        keyspace, table = _qualified_name(match.group('name'), current_keyspace)
+        rest = match.group('rest')
+        ttl_match = _DEFAULT_TTL_RE.search(rest[len(_table_body(rest)):])
+        ttls[f"{keyspace}.{table}"] = int(ttl_match.group('ttl')) if ttl_match else 0
+    return ttls
+
+
+def load_schema_from_session(session, keyspaces: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Read system_schema.types and system_schema.columns through a driver session
+    (the same source get_table_schema in cassandra_benchmark.py uses) and return
+    per-table RowSizer arguments keyed by 'keyspace.table'.
+    """
+    user_types = {}
+    for row in session.execute(
+            "SELECT keyspace_name, type_name, field_names, field_types FROM system_schema.types"):
+        if keyspaces and row.keyspace_name not in keyspaces:
+            continue
+        user_types.setdefault(row.keyspace_name, {})[row.type_name] = dict(zip(row.field_names, row.field_types))
+
+    columns = {}
+    for row in session.execute(
+            "SELECT keyspace_name, table_name, column_name, type, kind, position FROM system_schema.columns"):
+        if keyspaces and row.keyspace_name not in keyspaces:
+            continue
+        columns.setdefault((row.keyspace_name, row.table_name), []).append(
+            (row.column_name, row.type, row.kind, row.position))
+
+    return {
+        f"{keyspace}.{table}": build_table_schema(table_columns, user_types.get(keyspace))
+        for (keyspace, table), table_columns in columns.items()
+    }
+
+
+def to_row_value(value: Any) -> Any:
+    """
+    Convert a value returned by the Python driver into the JSON-style values
+    calculate_row_size and RowSizer expect: sets (including SortedSet) and
+    tuples become lists, maps (including OrderedMapSerializedKey) become dicts,
+    and UDT values (named tuples) become dicts of their fields.
+    """
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return value
+    if isinstance(value, Mapping):
+        return {to_row_value(k): to_row_value(v) for k, v in value.items()}
+    if hasattr(value, '_fields'):
+        return {field: to_row_value(getattr(value, field)) for field in value._fields}
+    if isinstance(value, (list, tuple, set, frozenset)) or type(value).__name__ == 'SortedSet':
+        return [to_row_value(v) for v in value]
+    return value
+
+
+class RowSizerRegistry:
+    """
+    Compiled RowSizers for every table in a schema, keyed by 'keyspace.table'.
+
+    Table schemas are loaded once (from a DESCRIBE SCHEMA file, CQL text or a live
+    session) and each table's RowSizer is compiled on first use and cached, so
+    tools can size rows for any table without passing key and type lists per call.
+
+    Example:
+        registry = RowSizerRegistry.from_schema_file('schema.cql')
+        size = registry.size_row('store.orders', row)
+    """
+
+    def __init__(self, table_schemas: Dict[str, Dict[str, Any]] = None, **sizer_options):
+        self.table_schemas = dict(table_schemas or {})
+        self.sizer_options = sizer_options
+        self._sizers = {}
+
+    @classmethod
+    def from_cql(cls, cql: str, **sizer_options) -> 'RowSizerRegistry':
+        return cls(parse_schema_cql(cql), **sizer_options)
+
+    @classmethod
+    def from_schema_file(cls, path: str, **sizer_options) -> 'RowSizerRegistry':
+        with open(path, 'r') as f:
+            return cls.from_cql(f.read(), **sizer_options)
+
+    @classmethod
+    def from_session(cls, session, keyspaces: List[str] = None, **sizer_options) -> 'RowSizerRegistry':
+        return cls(load_schema_from_session(session, keyspaces), **sizer_options)
+
+    def __contains__(self, table: str) -> bool:
+        return table in self.table_schemas
+
+    def tables(self) -> List[str]:
+        return sorted(self.table_schemas)
+
+    def add_table(self, table: str, schema: Dict[str, Any]) -> None:
+        """Register or replace a table schema, dropping any compiled sizer for it."""
+        self.table_schemas[table] = schema
+        self._sizers.pop(table, None)
+
+    def get(self, table: str) -> RowSizer:
+        """Return the compiled RowSizer for 'keyspace.table'."""
+        sizer = self._sizers.get(table)
+        if sizer is None:
+            if table not in self.table_schemas:
+                raise KeyError(f"Table {table} not found in schema")
+            sizer = self._sizers[table] = RowSizer(**self.table_schemas[table], **self.sizer_options)
+        return sizer
+
+    def size_row(self, table: str, row: Dict[str, Any]) -> int:
+        return self.get(table).size_row(row)
+
+
 # Example usage
 if __name__ == "__main__":
     # Example row matching the documentation example
@@ -378,70 +1699,20 @@ if __name__ == "__main__":
         "details": "text"
     }
     
-    # Calculate throughput capacity size (without row metadata, TTL, or client timestamps)
-    throughput_size = calculate_row_size(
-        example_row,
-        partition_keys,
-        clustering_keys,
-        static_columns,
-        udt_schemas,
-        column_data_types,
-        include_row_metadata=False,
-        include_client_timestamps=False,
-        include_ttl=False
-    )
-    
-    # Calculate storage size (with row metadata, without TTL or client timestamps)
-    storage_size = calculate_row_size(
-        example_row,
-        partition_keys,
-        clustering_keys,
-        static_columns,
-        udt_schemas,
-        column_data_types,
-        include_row_metadata=True,
-        include_client_timestamps=False,
-        include_ttl=False
-    )
-    
-    # Calculate size with TTL enabled
-    size_with_ttl = calculate_row_size(
-        example_row,
-        partition_keys,
-        clustering_keys,
-        static_columns,
-        udt_schemas,
-        column_data_types,
-        include_row_metadata=True,
-        include_client_timestamps=False,
-        include_ttl=True
-    )
-    
-    # Calculate size with client timestamps enabled
-    size_with_timestamps = calculate_row_size(
-        example_row,
-        partition_keys,
-        clustering_keys,
-        static_columns,
-        udt_schemas,
-        column_data_types,
-        include_row_metadata=True,
-        include_client_timestamps=True,
-        include_ttl=False
-    )
-    
-    # Calculate size with both TTL and client timestamps enabled
-    size_with_all = calculate_row_size(
+    # Throughput size and every storage size variant from one pass over the row
+    sizes = calculate_row_size_variants(
         example_row,
         partition_keys,
         clustering_keys,
         static_columns,
         udt_schemas,
-        column_data_types,
-        include_row_metadata=True,
-        include_client_timestamps=True,
-        include_ttl=True
+        column_data_types
     )
+    throughput_size = sizes.throughput
+    storage_size = sizes.storage
+    size_with_ttl = sizes.storage_with_ttl
+    size_with_timestamps = sizes.storage_with_client_timestamps
+    size_with_all = sizes.storage_with_ttl_and_client_timestamps
     
     print(f"Example row throughput size: {throughput_size} bytes")
     print(f"Example row storage size: {storage_size} bytes")
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+
+"""
+Script: row_size_dump.py
+Description: Sizes rows from table dumps with the Amazon Keyspaces rules in
+             row_size_calculator.py, without a connection to the cluster.
+             Reads NDJSON (for example `SELECT JSON *` output), CSV with a header
+             row, or headerless `COPY ... TO` files, using a DESCRIBE SCHEMA file
+             for key columns, data types and UDTs.
+
+             Records are streamed through a generator pipeline into a
+             RowSizeHistogram, so memory use stays constant however large the
+             dump is. With --processes, chunks of records are parsed and sized
+             in a process pool with a bounded number of chunks in flight.
+             With --validate, rows are also checked against the Amazon
+             Keyspaces 1 MB row, 2048 byte partition key and 850 byte
+             clustering column limits in the same pass, and the violations
+             per table and column are reported on stderr with the largest
+             offending keys.
+
+             Output uses the same line format as tools/row-size-sampler.sh and
+             row_size_sampler.py, which is read by parse_row_size_info in
+             cost-estimate-report.py.
+
+Usage:
+    python row_size_dump.py --schema schema.cql [options] KEYSPACE.TABLE=FILE [...] > rowsize.txt
+
+Examples:
+    cqlsh -e "SELECT JSON * FROM store.orders" > orders.json
+    python row_size_dump.py --schema schema.cql store.orders=orders.json
+    python row_size_dump.py --schema schema.cql --format csv store.orders=orders.csv.gz
+    python row_size_dump.py --schema schema.cql --format copy --processes 8 store.orders=orders.csv
+    python row_size_dump.py --schema schema.cql --format copy --columns id,ts,body store.orders=-
+    python row_size_dump.py --schema schema.cql --validate --top-k 20 store.orders=orders.json
+"""
+
+import argparse
+import contextlib
+import csv
+import gzip
+import json
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from decimal import Decimal, InvalidOperation
+
+from row_size_calculator import (RowLimitValidator, RowSizeHistogram, RowSizer, format_table_line,
+                                 _udt_name, parse_cql_type, parse_default_ttls, parse_schema_cql)
+
+
+INTEGER_TYPES = {'int', 'bigint', 'smallint', 'tinyint', 'varint', 'counter'}
+
+# Quoted string, bracket/separator, or bare token in a cqlsh collection literal
+_LITERAL_TOKEN_RE = re.compile(r"'((?:[^']|'')*)'|([\[\]{}(),:])|([^\s\[\]{}(),:']+)")
+
+
+# ---------------------------------------------------------------------------
+# Value parsing
+# ---------------------------------------------------------------------------
+
+def _hashable(value):
+    """Make a parsed literal usable as a map key (frozen collections as keys)."""
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple((k, _hashable(v)) for k, v in value.items())
+    return value
+
+
+def parse_cql_literal(text):
+    """
+    Parse a cqlsh collection, tuple or UDT literal as written by COPY TO, e.g.
+    "{'a': [1, 2], 'b': []}" or "{street: '1 Main St', zip: 98101}", into lists,
+    dicts and tuples of strings. Quoted values are unescaped, `null` becomes
+    None, and text without brackets is returned unchanged.
+    """
+    if not text.lstrip().startswith(('[', '{', '(')):
+        return text
+    # Open containers as [bracket, items, is_map]
+    stack = []
+    result = text
+    for match in _LITERAL_TOKEN_RE.finditer(text):
+        quoted, punct, bare = match.groups()
+        if punct in ('[', '{', '('):
+            stack.append([punct, [], False])
+            continue
+        if punct == ':':
+            if stack:
+                stack[-1][2] = True
+            continue
+        if punct == ',':
+            continue
+
+        if punct:
+            if not stack:
+                continue
+            bracket, items, is_map = stack.pop()
+            if is_map:
+                value = {_hashable(k): v for k, v in zip(items[0::2], items[1::2])}
+            elif bracket == '(':
+                value = tuple(items)
+            else:
+                value = items
+        elif quoted is not None:
+            value = quoted.replace("''", "'")
+        else:
+            value = None if bare.lower() == 'null' else bare
+
+        if stack:
+            stack[-1][1].append(value)
+        else:
+            result = value
+    return result
+
+
+def _udt_field_name(name):
+    """UDT field name of a literal key; cqlsh double-quotes case-sensitive field names."""
+    if isinstance(name, str) and len(name) >= 2 and name[0] == name[-1] == '"':
+        return name[1:-1].replace('""', '"')
+    return name
+
+
+def coerce_value(value, cql_type, user_types):
+    """
+    Convert string leaves of a dumped value to the Python types the sizer
+    expects for their CQL type: integers to int, decimals to Decimal and
+    0x-prefixed blobs to bytes. Collections, tuples and UDTs are walked with
+    their element, key, value and field types; frozen collection map keys
+    given as JSON strings are parsed as cqlsh literals.
+    """
+    if value is None:
+        return None
+    while cql_type.name == 'frozen' and cql_type.params:
+        cql_type = cql_type.params[0]
+    name = cql_type.name
+    params = cql_type.params
+
+    if isinstance(value, str):
+        try:
+            if name in INTEGER_TYPES:
+                return int(value)
+            if name == 'decimal':
+                return Decimal(value)
+        except (ValueError, InvalidOperation):
+            return value
+        if name == 'blob':
+            try:
+                return bytes.fromhex(value[2:] if value[:2].lower() == '0x' else value)
+            except ValueError:
+                return value
+        return value
+
+    if name in ('list', 'set') and params and isinstance(value, (list, tuple)):
+        return [coerce_value(v, params[0], user_types) for v in value]
+    if name == 'map' and len(params) == 2 and isinstance(value, dict):
+        key_type, value_type = params
+        # JSON object keys are strings, so collection keys arrive as cqlsh literals
+        parse_key = parse_cql_literal if key_type.params else None
+        return {_hashable(coerce_value(parse_key(k) if parse_key and isinstance(k, str) else k,
+                                       key_type, user_types)): coerce_value(v, value_type, user_types)
+                for k, v in value.items()}
+    if name == 'tuple' and params and isinstance(value, (list, tuple)):
+        return [coerce_value(v, t, user_types) for v, t in zip(value, params)]
+    if isinstance(value, dict):
+        fields = user_types.get(_udt_name(cql_type.raw), {})
+        return {field: coerce_value(v, parse_cql_type(fields[field]), user_types) if field in fields else v
+                for field, v in ((_udt_field_name(k), v) for k, v in value.items())}
+    return value
+
+
+def select_star_order(schema):
+    """Column order of SELECT * and COPY TO: partition keys, clustering keys, then the rest by name."""
+    keys = schema['partition_keys'] + schema['clustering_keys']
+    return keys + sorted(col for col in schema['column_data_types'] if col not in keys)
+
+
+# ---------------------------------------------------------------------------
+# Record streaming
+# ---------------------------------------------------------------------------
+
+def open_dump(path):
+    """
+    Open a dump file as text, reading stdin for '-' and decompressing .gz files.
+    Stdin is wrapped so leaving a `with` block does not close it.
+    """
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def read_records(stream, fmt, delimiter=','):
+    """
+    Yield raw records from a dump: one JSON object string per NDJSON line (other
+    lines, such as the cqlsh `[json]` header and row counts, are skipped), or one
+    list of fields per CSV row.
+    """
+    if fmt == 'ndjson':
+        for line in stream:
+            line = line.strip()
+            if line.startswith('{'):
+                yield line
+    else:
+        yield from csv.reader(stream, delimiter=delimiter)
+
+
+def chunked(records, size):
+    """Group an iterable of records into lists of at most `size` records."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class DumpResult:
+    """Row size histogram, unparseable record count and optional limit report for one table."""
+
+    def __init__(self, histogram=None, errors=0, limits=None):
+        self.histogram = histogram or RowSizeHistogram()
+        self.errors = errors
+        self.limits = limits
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        if other.limits is not None:
+            self.limits = other.limits if self.limits is None else self.limits.merge(other.limits)
+        return self
+
+
+class DumpTableSizer:
+    """
+    Turns raw dump records for one table into rows and sizes them into a
+    RowSizeHistogram. Built from plain arguments so that worker processes can
+    construct their own copy.
+    """
+
+    def __init__(self, schema, fmt, columns=None, null_value='', sizer_options=None, validate_top_k=None):
+        self.fmt = fmt
+        self.columns = columns or select_star_order(schema)
+        self.header = None
+        self.null_value = null_value
+        self.user_types = schema.get('user_types', {})
+        self.types = {col: parse_cql_type(t) for col, t in schema['column_data_types'].items()}
+        self.sizer = RowSizer(**schema, **(sizer_options or {}))
+        self.text_type = parse_cql_type('text')
+        # Top-k offending keys to keep per limit, or None to skip the limit checks
+        self.validate_top_k = validate_top_k
+        # Columns whose CSV values are cqlsh literals: collections, tuples, frozen types and UDTs
+        self.literal_columns = {col for col, t in self.types.items()
+                                if t.params or _udt_name(t.raw) in self.user_types or col in schema['udt_schemas']}
+
+    def parse_record(self, record):
+        """Convert one NDJSON line or CSV field list into a row dict."""
+        types = self.types
+        text_type = self.text_type
+        user_types = self.user_types
+        if self.fmt == 'ndjson':
+            row = json.loads(record, parse_float=Decimal)
+            return {col: coerce_value(value, types.get(col, text_type), user_types)
+                    for col, value in row.items()}
+
+        row = {}
+        null_value = self.null_value
+        literal_columns = self.literal_columns
+        for col, value in zip(self.header or self.columns, record):
+            if value == null_value:
+                row[col] = None
+                continue
+            if col in literal_columns:
+                value = parse_cql_literal(value)
+            row[col] = coerce_value(value, types.get(col, text_type), user_types)
+        return row
+
+    def size_records(self, records):
+        """
+        Size every record into a DumpResult, counting records that cannot be
+        parsed. With validate_top_k set, rows are also checked against the
+        Keyspaces row and key size limits in the same pass.
+        """
+        result = DumpResult()
+        sizer = self.sizer
+        if self.validate_top_k is not None:
+            sizer = RowLimitValidator(sizer, top_k=self.validate_top_k)
+            result.limits = sizer.report
+        add = result.histogram.add
+        size_row = sizer.size_row
+        parse_record = self.parse_record
+        for record in records:
+            try:
+                add(size_row(parse_record(record)))
+            except (ValueError, TypeError, AttributeError, ArithmeticError):
+                result.errors += 1
+        return result
+
+
+# Per-process table sizers, built lazily from the table configs passed to the pool initializer
+_worker_configs = {}
+_worker_sizers = {}
+
+
+def _init_worker(table_configs):
+    _worker_configs.update(table_configs)
+
+
+def _size_chunk(table, header, chunk):
+    sizer = _worker_sizers.get(table)
+    if sizer is None:
+        sizer = _worker_sizers[table] = DumpTableSizer(**_worker_configs[table])
+    sizer.header = header
+    return table, sizer.size_records(chunk)
+
+
+def size_dumps_parallel(inputs, table_configs, args):
+    """
+    Size every input in a process pool. Records are read in the parent and sent
+    to workers in chunks; at most two chunks per process are in flight, so the
+    parent never holds more than a bounded number of records.
+    """
+    results = {table: DumpResult() for table, _ in inputs}
+    max_pending = args.processes * 2
+
+    def collect(done):
+        for future in done:
+            table, result = future.result()
+            results[table].merge(result)
+
+    with ProcessPoolExecutor(max_workers=args.processes, initializer=_init_worker,
+                             initargs=(table_configs,)) as executor:
+        pending = set()
+        for table, path in inputs:
+            with open_dump(path) as stream:
+                records = read_records(stream, table_configs[table]['fmt'], args.delimiter)
+                header = next(records, None) if args.format == 'csv' else None
+                for chunk in chunked(records, args.chunk_size):
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(executor.submit(_size_chunk, table, header, chunk))
+        done, _ = wait(pending)
+        collect(done)
+
+    return results
+
+
+def size_dumps(inputs, table_configs, args):
+    """Size every input in this process, one record at a time."""
+    results = {}
+    for table, path in inputs:
+        sizer = DumpTableSizer(**table_configs[table])
+        with open_dump(path) as stream:
+            records = read_records(stream, table_configs[table]['fmt'], args.delimiter)
+            if args.format == 'csv':
+                sizer.header = next(records, None)
+            result = sizer.size_records(records)
+        if table in results:
+            result = results[table].merge(result)
+        results[table] = result
+    return results
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_input(value):
+    table, sep, path = value.partition('=')
+    if not sep or '.' not in table or not path:
+        raise argparse.ArgumentTypeError(f"expected KEYSPACE.TABLE=FILE, got '{value}'")
+    return table, path
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description='Estimate Amazon Keyspaces row sizes from NDJSON, CSV or COPY TO table dumps.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('inputs', nargs='+', type=parse_input, metavar='KEYSPACE.TABLE=FILE',
+                        help="Table and dump file to size ('-' reads stdin, .gz files are decompressed)")
+    parser.add_argument('--schema', required=True,
+                        help='CQL schema file with the CREATE TYPE / CREATE TABLE statements '
+                             '(e.g. output of cqlsh -e "DESCRIBE SCHEMA")')
+    parser.add_argument('--format', choices=['ndjson', 'csv', 'copy'], default='ndjson',
+                        help='ndjson: one JSON object per line (SELECT JSON); csv: CSV with a header row; '
+                             'copy: COPY TO output without a header (default: ndjson)')
+    parser.add_argument('--columns', default=None,
+                        help='Comma separated column order for --format copy '
+                             '(default: keys first, then the other columns by name, as COPY TO writes them)')
+    parser.add_argument('--delimiter', default=',', help='CSV field delimiter (default: ,)')
+    parser.add_argument('--null-value', default='',
+                        help='CSV string that represents null (default: empty string, as COPY TO writes)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Worker processes for parsing and sizing (default: 1, no pool)')
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help='Records per chunk sent to a worker process (default: 10000)')
+    parser.add_argument('--storage-size', action='store_true',
+                        help='Include the 100 byte row metadata (storage size) '
+                             'instead of reporting throughput size')
+    parser.add_argument('--validate', action='store_true',
+                        help='Also check every row against the 1 MB row, 2048 byte partition key and '
+                             '850 byte clustering column limits; the report is written to stderr and '
+                             'the exit status is 2 when any row exceeds a limit')
+    parser.add_argument('--top-k', type=int, default=10,
+                        help='Largest offending keys to report per limit and column with --validate (default: 10)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    with open(args.schema, 'r') as f:
+        cql = f.read()
+    schemas = parse_schema_cql(cql)
+    default_ttls = parse_default_ttls(cql)
+
+    # Large blobs and collections can exceed the csv module's default field limit
+    csv.field_size_limit(2 ** 31 - 1)
+
+    columns = [col.strip() for col in args.columns.split(',')] if args.columns else None
+    table_configs = {}
+    for table, path in args.inputs:
+        if table not in schemas:
+            print(f"ERROR: {table} not found in {args.schema}", file=sys.stderr)
+            sys.exit(1)
+        table_configs[table] = {
+            'schema': schemas[table],
+            'fmt': 'ndjson' if args.format == 'ndjson' else 'csv',
+            'columns': columns,
+            'null_value': args.null_value,
+            'sizer_options': {'include_row_metadata': args.storage_size},
+            'validate_top_k': args.top_k if args.validate else None,
+        }
+
+    start = time.monotonic()
+    try:
+        if args.processes > 1:
+            results = size_dumps_parallel(args.inputs, table_configs, args)
+        else:
+            results = size_dumps(args.inputs, table_configs, args)
+    except KeyboardInterrupt:
+        print("\nSizing interrupted by user.", file=sys.stderr)
+        sys.exit(1)
+    elapsed = max(time.monotonic() - start, 1e-9)
+
+    total_rows = 0
+    violations = 0
+    for table, result in results.items():
+        keyspace, table_name = table.split('.', 1)
+        print(format_table_line(keyspace, table_name, schemas[table], default_ttls.get(table, 0),
+                                result.histogram), flush=True)
+        if result.errors:
+            print(f"WARNING: skipped {result.errors} unparseable records for {table}", file=sys.stderr)
+        if result.limits is not None:
+            print('\n'.join(result.limits.format_lines(table)), file=sys.stderr)
+            violations += result.limits.violations
+        total_rows += result.histogram.count
+
+    print(f"Sized {total_rows} rows in {elapsed:.1f}s ({total_rows / elapsed:,.0f} rows/sec)", file=sys.stderr)
+    if violations:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+
+"""
+Script: row_size_sampler.py
+Description: Samples rows from every user table with the Python driver and sizes
+             them with the Amazon Keyspaces rules in row_size_calculator.py.
+             Rows are paged through with a bounded fetch size, split across
+             token ranges, and streamed through the sizer one at a time, so memory
+             use does not grow with the sample size. Output uses the same
+             line format as tools/row-size-sampler.sh, which is read by
+             parse_row_size_info in cost-estimate-report.py, plus the number
+             of distinct partitions the rows came from, which the report uses
+             to cross-check the tablestats uncompressed size.
+
+             Token ranges are read concurrently with execute_async and several
+             tables are sampled in parallel. A global in-flight request limit
+             and a global rows/sec budget keep the load on the cluster bounded,
+             and progress with an ETA is reported on stderr.
+
+             Blob columns are sized from their raw bytes, so unlike the shell
+             sampler the totals do not need to be halved for tables with blobs.
+
+             With --validate, sampled rows are also checked against the Amazon
+             Keyspaces row and key size limits, and violations with the largest
+             offending keys are reported on stderr.
+
+Usage:
+    python row_size_sampler.py [options] > rowsize.txt
+
+Examples:
+    python row_size_sampler.py --host 10.0.0.5
+    python row_size_sampler.py --host 10.0.0.5 --keyspace orders --rows 50000
+    python row_size_sampler.py --host 10.0.0.5 --rows-per-second 500 --fetch-size 200
+    python row_size_sampler.py --host 10.0.0.5 --table-concurrency 8 --concurrency 32
+    python row_size_sampler.py --host 10.0.0.5 --validate --top-k 20
+    python row_size_sampler.py --host cassandra.us-east-1.amazonaws.com --port 9142 --ssl --sigv4
+"""
+
+import argparse
+import math
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cassandra import ConsistencyLevel
+from cassandra.query import SimpleStatement
+
+from cassandra_benchmark import add_connection_arguments, create_session
+from row_size_calculator import (RowLimitValidator, RowSizeHistogram, RowSizerRegistry, format_table_line,
+                                 to_row_value)
+
+
+SYSTEM_KEYSPACES = {
+    'system', 'system_schema', 'system_traces', 'system_auth', 'system_distributed',
+    'system_views', 'system_virtual_schema', 'system_multiregion_info',
+    'dse_auth', 'dse_security', 'dse_leases', 'dse_perf', 'dse_system',
+    'OpsCenter', 'cfs', 'cfs_archive', 'dsefs', 'HiveMetaStore', 'spark_system',
+}
+
+# Murmur3Partitioner token ring bounds
+MIN_TOKEN = -2 ** 63
+MAX_TOKEN = 2 ** 63 - 1
+
+
+# ---------------------------------------------------------------------------
+# Schema discovery
+# ---------------------------------------------------------------------------
+
+def list_tables(session, keyspaces=None):
+    """
+    Return (keyspace, table, default_time_to_live) for every user table, optionally
+    restricted to the given keyspaces.
+    """
+    rows = session.execute(
+        "SELECT keyspace_name, table_name, default_time_to_live FROM system_schema.tables"
+    )
+    tables = []
+    for row in rows:
+        keyspace = row.keyspace_name
+        if keyspace in SYSTEM_KEYSPACES:
+            continue
+        if keyspaces and keyspace not in keyspaces:
+            continue
+        tables.append((keyspace, row.table_name, row.default_time_to_live or 0))
+    tables.sort()
+    return tables
+
+
+def split_token_ring(splits):
+    """Split the full token ring into contiguous (start, end] ranges."""
+    splits = max(1, splits)
+    width = (MAX_TOKEN - MIN_TOKEN) // splits
+    ranges = []
+    start = MIN_TOKEN
+    for i in range(splits):
+        end = MAX_TOKEN if i == splits - 1 else start + width
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+# ---------------------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------------------
+
+def table_sizer(registry, keyspace, table, args):
+    """Return the table's RowSizer, wrapped in a RowLimitValidator when --validate is set."""
+    sizer = registry.get(f"{keyspace}.{table}")
+    if args.validate:
+        sizer = RowLimitValidator(sizer, top_k=args.top_k)
+    return sizer
+
+
+def report_limits(keyspace, table, sizer):
+    """Print the limit violations found while sampling a table to stderr."""
+    if isinstance(sizer, RowLimitValidator):
+        print('\n'.join(sizer.report.format_lines(f"{keyspace}.{table}")), file=sys.stderr, flush=True)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every table being sampled. Callers reserve
+    the rows they are about to request and sleep off any debt, so the combined
+    read rate across all tables stays at or under `rate` rows/sec.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Progress:
+    """Tracks sampled rows and finished tables, and prints throughput and an ETA to stderr."""
+
+    def __init__(self, total_tables, rows_per_table, interval=10):
+        self.total_tables = total_tables
+        self.expected_rows = total_tables * rows_per_table
+        self.rows_per_table = rows_per_table
+        self.interval = interval
+        self.rows = 0
+        self.tables = 0
+        self._start = time.monotonic()
+        self._last_report = self._start
+        self._lock = threading.Lock()
+
+    def add_rows(self, count):
+        with self._lock:
+            self.rows += count
+        self.report()
+
+    def finish_table(self, sampled):
+        with self._lock:
+            self.tables += 1
+            # Small tables finish under their budget, so shrink the expected total
+            self.expected_rows -= max(0, self.rows_per_table - sampled)
+        self.report(force=self.tables == self.total_tables)
+
+    def report(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            elapsed = now - self._start
+            rate = self.rows / elapsed if elapsed > 0 else 0
+            remaining = max(0, self.expected_rows - self.rows)
+            eta = remaining / rate if rate > 0 else float('inf')
+            line = (f"  progress: {self.tables}/{self.total_tables} tables, "
+                    f"{self.rows} rows, {rate:.0f} rows/sec, "
+                    f"elapsed {format_duration(elapsed)}, ETA {format_duration(eta)}")
+        print(line, file=sys.stderr, flush=True)
+
+
+def format_duration(seconds):
+    """Format seconds as h:mm:ss, or '?' when unknown."""
+    if seconds == float('inf'):
+        return '?'
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def sample_table_async(session, keyspace, table, partition_keys, sizer, max_rows,
+                       fetch_size, token_splits, in_flight, limiter, progress=None,
+                       open_ranges=4):
+    """
+    Sample one table by reading its token ranges concurrently with execute_async.
+
+    The token ring is split into token_splits ranges. Up to open_ranges of them
+    are read at once, each paged with fetch_size rows, and the next range is
+    opened when one finishes, until max_rows rows are sampled. Every request
+    (first page or next page) takes a slot from the shared in_flight semaphore
+    and reserves fetch_size rows from the shared limiter. Driver callbacks only
+    release the slot and hand the page to this thread, where rows are sized, so
+    at most one page per open range is held in memory.
+
+    Rows of a partition are returned together, so a row whose partition key
+    differs from the previous row of its range starts a new sampled partition.
+    The last partition of a range may be cut off by the LIMIT.
+
+    Returns (RowSizeHistogram, number of sampled partitions) for the table.
+    """
+    token_expr = f"token({', '.join(partition_keys)})"
+    ranges = split_token_ring(token_splits)
+    per_range = max(1, math.ceil(max_rows / len(ranges)))
+
+    pending = deque(enumerate(ranges))
+    pages = queue.Queue()
+    stats = RowSizeHistogram()
+    size_row = sizer.size_row
+    # SELECT * returns the partition key columns first
+    key_length = len(partition_keys)
+    last_keys = {}
+    partitions = 0
+
+    def watch(future):
+        def on_page(rows):
+            in_flight.release()
+            pages.put((future, rows, None))
+
+        def on_error(exc):
+            in_flight.release()
+            pages.put((future, None, exc))
+
+        future.add_callbacks(callback=on_page, errback=on_error)
+
+    def submit_range():
+        i, (start, end) = pending.popleft()
+        # The first range must include the minimum token itself
+        lower_op = '>=' if i == 0 else '>'
+        cql = (f'SELECT * FROM "{keyspace}"."{table}" '
+               f'WHERE {token_expr} {lower_op} %s AND {token_expr} <= %s '
+               f'LIMIT {per_range}')
+        statement = SimpleStatement(cql, fetch_size=fetch_size,
+                                    consistency_level=ConsistencyLevel.LOCAL_ONE)
+        in_flight.acquire()
+        limiter.acquire(fetch_size)
+        watch(session.execute_async(statement, (start, end)))
+
+    def fetch_next_page(future):
+        in_flight.acquire()
+        limiter.acquire(fetch_size)
+        # Callbacks added in watch() fire again for the next page
+        future.start_fetching_next_page()
+
+    outstanding = 0
+    for _ in range(min(max(1, open_ranges), len(pending))):
+        submit_range()
+        outstanding += 1
+
+    errors = []
+    while outstanding:
+        future, rows, error = pages.get()
+        outstanding -= 1
+
+        if error is not None:
+            errors.append(error)
+        else:
+            sized = 0
+            for row in rows:
+                if stats.count >= max_rows:
+                    break
+                key = tuple(row[:key_length])
+                if last_keys.get(future) != key:
+                    last_keys[future] = key
+                    partitions += 1
+                stats.add(size_row({col: to_row_value(value) for col, value in row._asdict().items()}))
+                sized += 1
+            if progress:
+                progress.add_rows(sized)
+
+            if stats.count < max_rows and future.has_more_pages:
+                fetch_next_page(future)
+                outstanding += 1
+                continue
+
+        if pending and stats.count < max_rows:
+            submit_range()
+            outstanding += 1
+
+    if errors and not stats.count:
+        raise errors[0]
+    return stats, partitions
+
+
+def sample_table_parallel(session, keyspace, table, default_ttl, args, registry,
+                          in_flight, limiter, progress):
+    """Sample one table with sample_table_async and return its output line."""
+    schema = registry.table_schemas[f"{keyspace}.{table}"]
+    sizer = table_sizer(registry, keyspace, table, args)
+
+    stats = RowSizeHistogram()
+    partitions = 0
+    try:
+        stats, partitions = sample_table_async(
+            session, keyspace, table, schema['partition_keys'], sizer, args.rows,
+            fetch_size=args.fetch_size,
+            token_splits=args.token_splits,
+            in_flight=in_flight,
+            limiter=limiter,
+            progress=progress,
+            open_ranges=args.open_ranges,
+        )
+    finally:
+        progress.finish_table(stats.count)
+
+    report_limits(keyspace, table, sizer)
+    return format_table_line(keyspace, table, schema, default_ttl, stats, partitions)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description='Sample rows from each table and estimate Amazon Keyspaces row sizes.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    add_connection_arguments(parser)
+
+    sampling = parser.add_argument_group('sampling')
+    sampling.add_argument('--keyspace', action='append', default=None,
+                          help='Keyspace to sample (repeatable, default: all user keyspaces)')
+    sampling.add_argument('--rows', type=int, default=30000,
+                          help='Maximum rows to sample per table (default: 30000)')
+    sampling.add_argument('--fetch-size', type=int, default=100,
+                          help='Rows per page requested from the cluster (default: 100)')
+    sampling.add_argument('--token-splits', type=int, default=16,
+                          help='Number of token ranges each table sample is spread over (default: 16)')
+    sampling.add_argument('--open-ranges', type=int, default=4,
+                          help='Token ranges of a table read at once (default: 4)')
+    sampling.add_argument('--rows-per-second', type=float, default=0,
+                          help='Global read budget in rows/sec across all tables (default: unthrottled)')
+    sampling.add_argument('--concurrency', type=int, default=8,
+                          help='Maximum requests in flight across all tables (default: 8)')
+    sampling.add_argument('--table-concurrency', type=int, default=4,
+                          help='Number of tables sampled in parallel (default: 4)')
+    sampling.add_argument('--progress-interval', type=float, default=10,
+                          help='Seconds between progress reports on stderr (default: 10)')
+    sampling.add_argument('--storage-size', action='store_true',
+                          help='Include the 100 byte row metadata (storage size) '
+                               'instead of reporting throughput size')
+    sampling.add_argument('--validate', action='store_true',
+                          help='Also check sampled rows against the 1 MB row, 2048 byte partition key '
+                               'and 850 byte clustering column limits and report violations on stderr')
+    sampling.add_argument('--top-k', type=int, default=10,
+                          help='Largest offending keys to report per limit and column with --validate '
+                               '(default: 10)')
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    cluster = None
+    try:
+        cluster, session = create_session(args)
+
+        tables = list_tables(session, args.keyspace)
+        # Column types, keys and UDT fields for every table, read once from system_schema
+        registry = RowSizerRegistry.from_session(session, args.keyspace,
+                                                 include_row_metadata=args.storage_size)
+        in_flight = threading.BoundedSemaphore(max(1, args.concurrency))
+        limiter = RateLimiter(args.rows_per_second)
+        progress = Progress(len(tables), args.rows, interval=args.progress_interval)
+        print(f"Sampling {len(tables)} tables, up to {args.rows} rows each", file=sys.stderr)
+
+        with ThreadPoolExecutor(max_workers=max(1, args.table_concurrency)) as executor:
+            futures = {
+                executor.submit(sample_table_parallel, session, keyspace, table, default_ttl,
+                                args, registry, in_flight, limiter, progress): (keyspace, table)
+                for keyspace, table, default_ttl in tables
+            }
+            for future in as_completed(futures):
+                keyspace, table = futures[future]
+                try:
+                    print(future.result(), flush=True)
+                except Exception as e:
+                    print(f"ERROR sampling {keyspace}.{table}: {e}", file=sys.stderr)
+
+    except KeyboardInterrupt:
+        print("\nSampling interrupted by user.", file=sys.stderr)
+    except Exception as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if cluster:
+            cluster.shutdown()
+
+
+if __name__ == '__main__':
+    main()
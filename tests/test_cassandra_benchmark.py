@@ -0,0 +1,304 @@
+"""
+Tests for the benchmark helpers in cassandra_benchmark.py that do not need a
+cluster.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import io
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('cassandra')
+
+from cassandra.cqltypes import Int32Type
+from cassandra.util import OrderedMapSerializedKey, SortedSet
+
+import cassandra_benchmark
+from cassandra_benchmark import (BatchStats, IndexPermutation, KeySpace, LatencyHistogram, LatencyRecorder,
+                                 batch_operations, build_rate_profile, column_capacity, count_batches,
+                                 key_value, result_row_sizer, run_operations)
+
+
+SCHEMA = {
+    'partition_keys': ['k'],
+    'clustering_keys': ['c'],
+    'regular_columns': ['tags', 'scores', 'home', 'point'],
+    'static_columns': [],
+    'column_types': {
+        'k': 'int',
+        'c': 'int',
+        'tags': 'set<int>',
+        'scores': 'map<int, text>',
+        'home': 'address',
+        'point': 'tuple<int, int>',
+    },
+    'user_types': {'address': {'street': 'text', 'zip': 'int'}},
+}
+
+
+def driver_map(items):
+    """A map column value as the driver returns it."""
+    value = OrderedMapSerializedKey(Int32Type, 4)
+    for key, item in items.items():
+        value._insert_unchecked(key, Int32Type.serialize(key, 4), item)
+    return value
+
+
+def test_result_row_sizer_converts_driver_values():
+    Row = namedtuple('Row', ['k', 'c', 'tags', 'scores', 'home', 'point'])
+    Address = namedtuple('address', ['street', 'zip'])
+    size_row = result_row_sizer(SCHEMA)
+
+    driver_row = Row(1, 2, SortedSet([3, 1, 2]), driver_map({1: 'a', 20: 'bbbb'}),
+                     Address('Main St', 12345), (7, 8))
+    plain_row = Row(1, 2, [1, 2, 3], {1: 'a', 20: 'bbbb'}, {'street': 'Main St', 'zip': 12345}, [7, 8])
+
+    assert size_row(driver_row) == size_row(plain_row)
+
+
+class SerialSession:
+    """
+    Session whose requests are served one at a time by a single server thread;
+    `stalls` maps a request number to the seconds the server spends on it.
+    """
+
+    def __init__(self, stalls=None):
+        self.stalls = stalls or {}
+        self.server = ThreadPoolExecutor(max_workers=1)
+        self.requests = 0
+
+    def _serve(self, n):
+        time.sleep(self.stalls.get(n, 0))
+
+    def execute(self, statement, bind_values=None):
+        n, self.requests = self.requests, self.requests + 1
+        self._serve(n)
+
+    def execute_async(self, statement, bind_values=None):
+        n, self.requests = self.requests, self.requests + 1
+        return ServerFuture(self.server.submit(self._serve, n))
+
+
+class ServerFuture:
+    """The add_callbacks side of a driver ResponseFuture."""
+
+    def __init__(self, future):
+        self.future = future
+
+    def add_callbacks(self, callback, callback_args=(), errback=None, errback_args=()):
+        def done(future):
+            if future.exception() is None:
+                callback(future.result(), *callback_args)
+            else:
+                errback(future.exception(), *errback_args)
+        self.future.add_done_callback(done)
+
+
+def operations(context=None):
+    while True:
+        yield 'statement', (), context
+
+
+def exact_percentile(values, pct):
+    """The value at LatencyHistogram.percentile's rank of the sorted values."""
+    values = sorted(values)
+    return values[max(1, int(len(values) * pct / 100 + 0.5)) - 1]
+
+
+# Relative width of a LatencyHistogram bucket
+BUCKET_PRECISION = 2.0 ** -(LatencyHistogram.SUB_BUCKET_BITS - 1)
+
+
+def test_latency_percentiles_within_bucket_precision():
+    rng = random.Random(1)
+    latencies_us = [int(rng.lognormvariate(8, 1.5)) for _ in range(20000)] + [0, 1, 1023, 1024, 10 ** 7]
+    histogram = LatencyHistogram()
+    for us in latencies_us:
+        histogram.record(us / 1000)
+
+    assert histogram.count == len(latencies_us)
+    assert (histogram.min_ms, histogram.max_ms) == (min(latencies_us) / 1000, max(latencies_us) / 1000)
+    assert histogram.mean_ms == pytest.approx(sum(latencies_us) / len(latencies_us) / 1000)
+    for pct in (1, 10, 50, 90, 99, 99.9, 99.99, 100):
+        exact = exact_percentile(latencies_us, pct)
+        reported = histogram.percentile(pct) * 1000
+        # The bucket's upper bound: never below the exact value, at most one bucket width above
+        assert exact <= round(reported) <= exact * (1 + BUCKET_PRECISION) + 1, pct
+
+
+def test_latency_histograms_merge_across_workers():
+    rng = random.Random(2)
+    workers = [[rng.expovariate(1 / 5) for _ in range(1000)] for _ in range(4)]
+    merged = LatencyHistogram()
+    single = LatencyHistogram()
+    for latencies in workers:
+        worker = LatencyHistogram()
+        for latency in latencies:
+            worker.record(latency)
+            single.record(latency)
+        merged.merge(worker)
+    merged.merge(LatencyHistogram())
+
+    assert vars(merged) == vars(single)
+    assert merged.count == 4000
+
+
+def test_latency_recorder_interval_log():
+    log = io.StringIO()
+    recorder = LatencyRecorder('insert', log, interval=0)
+    for latency in (1.0, 2.0, 3.0):
+        recorder.record(latency)
+
+    recorder.snapshot()
+    recorder.snapshot()
+
+    first, second = [line.split(',') for line in log.getvalue().splitlines()]
+    assert first[1] == 'insert' and first[4] == '3' and first[-1] == '3.000'
+    assert second[4] == '0'
+    assert recorder.histogram.count == 3
+
+
+def test_rate_mode_measures_latency_from_the_scheduled_time():
+    # At 200 ops/sec a request is due every 5 ms. The server stalls 300 ms on
+    # request 10, so with a window of 2 the client cannot send the requests
+    # due during the stall; measured from their due time they wait in turn.
+    session = SerialSession(stalls={10: 0.3})
+
+    histogram, errors, _ = run_operations(session, operations(), 100, 'insert', concurrency=2,
+                                          progress=False, rate=build_rate_profile(200))
+
+    assert (histogram.count, errors) == (100, 0)
+    # Measured from the send time only the stalled request and the one queued
+    # behind it would exceed 100 ms
+    assert sum(histogram.counts[index] for index in histogram.counts
+               if LatencyHistogram.bucket_upper_bound(index) > 100_000) >= 20
+    assert histogram.max_ms >= 290
+
+
+def test_closed_loop_measures_latency_from_the_send_time():
+    session = SerialSession(stalls={10: 0.3})
+
+    histogram, errors, _ = run_operations(session, operations(), 100, 'insert', progress=False)
+
+    assert (histogram.count, errors) == (100, 0)
+    assert sum(histogram.counts[index] for index in histogram.counts
+               if LatencyHistogram.bucket_upper_bound(index) > 100_000) == 1
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 17, 100, 1000, 4097, 65537])
+def test_index_permutation_is_a_bijection(size):
+    permutation = IndexPermutation(size, seed=7)
+
+    assert sorted(permutation[i] for i in range(size)) == list(range(size))
+    with pytest.raises(IndexError):
+        permutation[size]
+
+
+def test_index_permutation_depends_on_the_seed():
+    orders = {tuple(IndexPermutation(1000, seed)[i] for i in range(1000)) for seed in range(3)}
+
+    assert len(orders) == 3
+
+
+@pytest.mark.parametrize('cql_type', ['tinyint', 'int', 'bigint', 'varint', 'uuid', 'timeuuid', 'timestamp',
+                                      'date', 'time', 'blob', 'inet', 'text', 'double', 'decimal'])
+def test_key_value_is_injective(cql_type):
+    capacity = column_capacity(cql_type)
+    ordinals = list(range(2000)) + [capacity - 1 - i for i in range(2000)]
+    ordinals = [ordinal for ordinal in set(ordinals) if 0 <= ordinal < min(capacity, 1 << 63)]
+
+    values = {key_value(cql_type, ordinal, seed=99) for ordinal in ordinals}
+
+    assert len(values) == len(ordinals)
+
+
+def key_tuple(keys, n):
+    pk_vals, ck_vals = keys.inserted_key(n)
+    return tuple(pk_vals.items()) + tuple(ck_vals.items())
+
+
+@pytest.mark.parametrize('grouped', [False, True])
+def test_key_space_inserts_write_every_row_once(grouped):
+    column_types = {'tenant': 'boolean', 'id': 'tinyint', 'day': 'date', 'seq': 'int'}
+    # 2 * 256 = 512 possible partitions, fewer than requested
+    keys = KeySpace(['tenant', 'id'], ['day', 'seq'], column_types, pk_count=600, ck_count=7,
+                    seed=3, grouped=grouped)
+
+    inserted = [key_tuple(keys, n) for n in range(keys.size)]
+
+    assert (keys.pk_count, keys.size) == (512, 512 * 7)
+    assert len(set(inserted)) == keys.size
+    assert set(inserted) == {tuple(pk.items()) + tuple(ck.items())
+                             for pk, ck in map(keys.row_key, range(keys.size))}
+    if grouped:
+        # Consecutive inserts fill one partition after the other
+        assert len({row[:2] for row in inserted[:7]}) == 1
+
+
+def test_key_space_shards_use_disjoint_partitions():
+    column_types = {'id': 'int', 'seq': 'int'}
+    shards = [KeySpace(['id'], ['seq'], column_types, pk_count=300, ck_count=3, seed=5, shard=(index, 3))
+              for index in range(3)]
+
+    partitions = [{key_tuple(keys, n)[:1] for n in range(keys.size)} for keys in shards]
+
+    assert all(len(shard) == 300 for shard in partitions)
+    assert not (partitions[0] & partitions[1] or partitions[0] & partitions[2] or partitions[1] & partitions[2])
+
+
+class RecordingBatch:
+    """Stands in for the driver's BatchStatement, keeping the added rows."""
+
+    def __init__(self, batch_type=None):
+        self.rows = []
+
+    def add(self, statement, bind_values=None):
+        self.rows.append(bind_values)
+
+
+@pytest.mark.parametrize('partition_rows', [None, 1, 4, 5, 7, 12])
+def test_batch_operations_match_count_batches(monkeypatch, partition_rows):
+    monkeypatch.setattr(cassandra_benchmark, 'BatchStatement', RecordingBatch)
+
+    for rows in range(0, 30):
+        for batch_size in (1, 2, 3, 5, 8):
+            inserts = (('statement', (n,)) for n in range(rows))
+            batches = list(batch_operations(inserts, batch_size, partition_rows))
+
+            assert len(batches) == count_batches(rows, batch_size, partition_rows), (rows, batch_size)
+            assert [bind_values for batch, _, _ in batches for bind_values in batch.rows] == \
+                [(n,) for n in range(rows)]
+            for batch, _, size in batches:
+                assert size == len(batch.rows) <= batch_size
+                if partition_rows:
+                    assert len({n // partition_rows for n, in batch.rows}) == 1
+
+
+def test_batch_stats_record_the_batch_latency_per_row():
+    stats = BatchStats()
+
+    stats.record(4, 12.5)
+
+    assert stats.histogram.count == 4
+    assert stats.histogram.min_ms == stats.histogram.max_ms == stats.histogram.mean_ms == 12.5
+
+
+def test_batched_inserts_record_each_row_with_its_batch_latency(monkeypatch):
+    monkeypatch.setattr(cassandra_benchmark, 'BatchStatement', RecordingBatch)
+    session = SerialSession(stalls={1: 0.02, 3: 0.05})
+    stats = BatchStats()
+    inserts = (('statement', (n,)) for n in range(12))
+
+    histogram, errors, _ = run_operations(session, batch_operations(inserts, 3), 4, 'insert',
+                                          progress=False, op_stats=stats)
+
+    assert (histogram.count, errors, stats.failed_rows) == (4, 0, 0)
+    assert stats.histogram.count == 12
+    assert stats.histogram.total_us == 3 * histogram.total_us
+    assert (stats.histogram.min_us, stats.histogram.max_us) == (histogram.min_us, histogram.max_us)
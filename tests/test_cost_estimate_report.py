@@ -0,0 +1,122 @@
+"""
+Tests for the row size driven parts of cost-estimate-report.py.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import importlib.util
+import os
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip('tabulate')
+
+from row_size_calculator import RowSizeHistogram, format_row_size_line
+
+REPORT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'cost-estimate-report.py')
+_spec = importlib.util.spec_from_file_location('cost_estimate_report', REPORT_PATH)
+report = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(report)
+
+
+def row_size_data(sizes, partitions=None):
+    """row_size_data of a node whose sampler sized `sizes` for ks.tb."""
+    histogram = RowSizeHistogram()
+    for size in sizes:
+        histogram.add(size)
+    line = format_row_size_line('ks', 'tb', histogram, 4, 'n', 'n', 'n', partitions)
+    return report.parse_row_size_info([line])
+
+
+def node(row_sizes, space_used=Decimal(1000), compression_ratio=Decimal('0.5'), partitions_estimate=Decimal(100)):
+    return {
+        'tablestats_data': {'ks': {'tb': {
+            'space_used': space_used,
+            'compression_ratio': compression_ratio,
+            'read_count': Decimal(10),
+            'write_count': Decimal(10),
+            'partitions_estimate': partitions_estimate,
+        }}},
+        'schema': {},
+        'info_data': {'uptime_seconds': Decimal(3600)},
+        'row_size_data': row_sizes,
+    }
+
+
+def build(*nodes):
+    samples = {'dc1': {'nodes': {f"node{i}": data for i, data in enumerate(nodes)}}}
+    status = {'datacenters': {'dc1': {'node_count': Decimal(len(nodes))}}}
+    return report.build_cassandra_local_set(samples, status)
+
+
+def table_of(cassandra_set):
+    return cassandra_set['data']['keyspaces']['ks']['dcs']['dc1']['tables']['tb']
+
+
+def test_units_merge_row_size_histograms_across_nodes():
+    table = table_of(build(node(row_size_data([500, 500, 500])), node(row_size_data([1500]))))
+
+    assert table['write_units_per_write'] == Decimal('1.25')
+    assert table['read_units_per_read'] == Decimal('1')
+
+
+def test_units_kept_on_a_later_node_without_a_histogram():
+    table = table_of(build(node(row_size_data([500, 500, 500, 1500])), node({})))
+
+    assert table['write_units_per_write'] == Decimal('1.25')
+    assert table['read_units_per_read'] == Decimal('1')
+
+
+def test_units_are_none_without_any_histogram():
+    table = table_of(build(node({}), node({})))
+
+    assert table['write_units_per_write'] is None
+    assert table['read_units_per_read'] is None
+
+
+def checked_table(tablestats_bytes, partitions, rows_per_partition, row_bytes):
+    return {
+        'total_uncompressed_bytes': Decimal(tablestats_bytes),
+        'avg_row_size_bytes': Decimal(row_bytes),
+        'partitions_estimate': Decimal(partitions),
+        'sampled_rows_per_partition': rows_per_partition and Decimal(rows_per_partition),
+        'row_size_sampled': True,
+    }
+
+
+def cross_check_set():
+    return {'data': {'keyspaces': {'ks': {'dcs': {'dc1': {'tables': {
+        # sampled 100 * 10 * 200 = 200000 bytes
+        'close': checked_table(300000, 100, 10, 200),
+        'under': checked_table(1000000, 100, 10, 200),
+        'over': checked_table(50000, 100, 10, 200),
+        'empty': checked_table(0, 100, 10, 200),
+        'unsampled_partitions': checked_table(1000, 100, None, 200),
+    }}}}}}}
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_cross_check_uncompressed_sizes(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(report, 'np', None)
+    cassandra_set = cross_check_set()
+
+    checks = {check['table']: check for check in report.cross_check_uncompressed_sizes(cassandra_set, 2.0)}
+
+    assert sorted(checks) == ['close', 'empty', 'over', 'under']
+    assert checks['close']['sampled_bytes'] == pytest.approx(200000)
+    assert [checks[name]['divergence'] for name in ('close', 'under', 'over')] == pytest.approx([1.5, 5.0, 4.0])
+    assert checks['empty']['divergence'] == float('inf')
+    assert {name: check['flagged'] for name, check in checks.items()} == {
+        'close': False, 'under': True, 'over': True, 'empty': True}
+
+    tables = cassandra_set['data']['keyspaces']['ks']['dcs']['dc1']['tables']
+    assert tables['close']['sampled_uncompressed_bytes'] == Decimal(200000)
+    assert tables['under']['uncompressed_divergence'] == Decimal('5.0')
+    assert tables['empty']['uncompressed_divergence'] is None
+    assert 'sampled_uncompressed_bytes' not in tables['unsampled_partitions']
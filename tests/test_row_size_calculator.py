@@ -0,0 +1,289 @@
+"""
+Tests for the Amazon Keyspaces sizing rules in row_size_calculator.py.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import datetime
+import ipaddress
+import math
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from row_size_calculator import (
+    RowLimitValidator,
+    RowSizeHistogram,
+    RowSizer,
+    calculate_data_type_size,
+    calculate_numeric_size,
+    calculate_numeric_sizes,
+    calculate_partition_key_column_size,
+    calculate_row_size,
+    calculate_row_size_variants,
+    calculate_serialized_value_size,
+    format_row_size_line,
+    np,
+    parse_default_ttls,
+    parse_row_size_line,
+    parse_schema_cql,
+)
+
+
+# (CQL type, value, expected data size in bytes) for every scalar type
+SCALAR_SIZES = [
+    # Strings: UTF-8 encoded length
+    ('text', 'hello', 5),
+    ('text', 'héllo', 6),
+    ('text', '', 0),
+    ('varchar', 'abc', 3),
+    ('ascii', 'abc', 3),
+    # Integers: 1 byte per 2 significant digits + 1, zeros trimmed
+    ('int', 0, 2),
+    ('int', 7, 2),
+    ('int', 12345, 4),
+    ('int', 1000, 2),
+    ('int', -99, 2),
+    ('bigint', 2 ** 63 - 1, 11),
+    ('bigint', -2 ** 63, 11),
+    ('smallint', 32767, 4),
+    ('tinyint', 127, 3),
+    ('varint', 10 ** 40 + 1, 22),
+    ('varint', 10 ** 40, 2),
+    # Decimal: significant digits of the unscaled value
+    ('decimal', Decimal('123.4500'), 4),
+    ('decimal', Decimal('0.001'), 2),
+    ('decimal', Decimal('0'), 2),
+    ('decimal', 3.14159, 4),
+    ('decimal', '-1234567.89', 6),
+    # Blob: raw byte length, hex strings are two characters per byte
+    ('blob', b'\x00\x01\x02', 3),
+    ('blob', '0a0b', 2),
+    ('boolean', True, 1),
+    ('boolean', False, 1),
+    # Fixed-width types
+    ('uuid', uuid.UUID(int=1), 16),
+    ('timeuuid', uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8'), 16),
+    ('timestamp', datetime.datetime(2024, 1, 1), 8),
+    ('date', datetime.date(2024, 1, 1), 4),
+    ('time', datetime.time(12, 30), 8),
+    ('double', 1.5, 8),
+    ('float', 1.5, 4),
+    ('counter', 42, 8),
+    # Inet: raw address bytes
+    ('inet', '192.168.0.1', 4),
+    ('inet', ipaddress.IPv4Address('10.0.0.1'), 4),
+    ('inet', '2001:db8::1', 16),
+    ('inet', ipaddress.IPv6Address('::1'), 16),
+    ('inet', b'\x7f\x00\x00\x01', 4),
+    # Duration: three zigzag vints, or the string form of a literal
+    ('duration', SimpleNamespace(months=1, days=2, nanoseconds=3600 * 10 ** 9), 9),
+    ('duration', SimpleNamespace(months=0, days=0, nanoseconds=0), 3),
+    ('duration', '1h30m', 5),
+]
+
+
+@pytest.mark.parametrize('data_type,value,expected', SCALAR_SIZES)
+def test_scalar_size(data_type, value, expected):
+    assert calculate_data_type_size(value, data_type) == expected
+
+
+@pytest.mark.parametrize('data_type', sorted({data_type for data_type, _, _ in SCALAR_SIZES}))
+def test_null_is_one_byte(data_type):
+    assert calculate_data_type_size(None, data_type) == 1
+
+
+@pytest.mark.skipif(np is None, reason='numpy is not installed')
+@pytest.mark.parametrize('dtype', ['int8', 'int16', 'int32', 'int64', 'uint64'])
+def test_numeric_sizes_match_scalar_path(dtype):
+    info = np.iinfo(dtype)
+    powers = [10 ** i for i in range(20)]
+    edges = powers + [p - 1 for p in powers] + [-p for p in powers] + [-p + 1 for p in powers]
+    edges += [12345, -12345, 120000, info.max, info.max - 1, info.min, info.min + 1]
+    rng = np.random.default_rng(0)
+    values = np.concatenate([
+        np.array([e for e in edges if info.min <= e <= info.max], dtype=dtype),
+        rng.integers(info.min, info.max, size=2000, dtype=dtype, endpoint=True),
+    ])
+
+    sizes = calculate_numeric_sizes(values)
+
+    assert sizes.tolist() == [calculate_numeric_size(int(value)) for value in values]
+
+
+def test_frozen_partition_key_is_sized_serialized():
+    value = [1, 2, 3]
+    data_size = calculate_serialized_value_size(value, 'frozen<list<int>>')
+    assert data_size == 18
+    assert calculate_partition_key_column_size(value, 'frozen<list<int>>', 1) == data_size * 2 + 1 + 3
+
+    sizer = RowSizer(['k'], [], [], {}, {'k': 'frozen<list<int>>'})
+    assert sizer.key_data_sizer('k')(value) == data_size
+    assert sizer.size_row({'k': value}) == calculate_row_size({'k': value}, ['k'], [], [], {}, {'k': 'frozen<list<int>>'})
+
+
+def test_tuple_column_is_sized_as_frozen_tuple():
+    column_data_types = {'k': 'int', 't': 'tuple<int, text>', 'f': 'frozen<tuple<int, text>>'}
+    sizer = RowSizer(['k'], [], [], {}, column_data_types)
+    tuple_row = {'k': 1, 't': (1, 'abcd')}
+    frozen_row = {'k': 1, 'f': (1, 'abcd')}
+
+    assert sizer.size_row(tuple_row) == sizer.size_row(frozen_row)
+    assert calculate_row_size(tuple_row, ['k'], [], [], {}, column_data_types) == sizer.size_row(tuple_row)
+
+
+def test_key_limits_use_serialized_key_size():
+    sizer = RowSizer(['k'], ['c'], [], {}, {'k': 'frozen<list<int>>', 'c': 'int'})
+    validator = RowLimitValidator(sizer, max_partition_key_size=17)
+
+    validator.size_row({'k': [1, 2, 3], 'c': 1})
+
+    assert validator.report.top_offenders('partition_key', 'k') == [(18, 'k=[1, 2, 3], c=1')]
+
+
+def histogram_of(sizes):
+    histogram = RowSizeHistogram()
+    for size in sizes:
+        histogram.add(size)
+    return histogram
+
+
+def test_histogram_merge_matches_one_histogram_of_all_rows():
+    node_a = histogram_of([500, 500, 500])
+    node_b = histogram_of([1500])
+
+    merged = RowSizeHistogram().merge(node_a).merge(RowSizeHistogram()).merge(node_b)
+
+    assert vars(merged) == vars(histogram_of([500, 500, 500, 1500]))
+    assert (merged.count, merged.min, merged.max, merged.total) == (4, 500, 1500, 3000)
+
+
+def test_histogram_units_on_500_and_1500_byte_rows():
+    histogram = histogram_of([500, 500, 500, 1500])
+
+    # 500 B rows are 1 WCU and 1 RCU, 1500 B rows 2 WCU and 1 RCU
+    assert histogram.write_units == 5
+    assert histogram.read_units == 4
+    assert histogram.expected_write_units == 1.25
+    assert histogram.expected_read_units == 1.0
+    # The average row (750 B) would be billed 1 WCU
+    assert math.ceil(histogram.average / 1024) == 1
+
+
+def test_histogram_fields_round_trip():
+    histogram = histogram_of([500] * 30 + [1500] * 10 + [5000])
+    line = format_row_size_line('ks', 'tb', histogram, 4, 'n', 'n', 'n', partitions=7)
+
+    name, fields = parse_row_size_line(line)
+    restored = RowSizeHistogram.from_fields(fields)
+
+    assert name == 'ks.tb'
+    assert fields['partitions'] == '7'
+    assert restored.buckets == histogram.buckets
+    assert (restored.count, restored.min, restored.max) == (histogram.count, histogram.min, histogram.max)
+    assert restored.expected_write_units == pytest.approx(histogram.expected_write_units, abs=1e-4)
+    assert restored.expected_read_units == pytest.approx(histogram.expected_read_units, abs=1e-4)
+    assert [restored.percentile(p) for p in (50, 90, 99)] == [histogram.percentile(p) for p in (50, 90, 99)]
+    assert restored.to_fields() == histogram.to_fields()
+
+
+def test_histogram_without_buckets_is_not_restored():
+    assert RowSizeHistogram.from_fields({'average': '100 bytes'}) is None
+
+
+SCHEMA_CQL = """
+CREATE KEYSPACE "Shop" WITH replication = {'class': 'SimpleStrategy', 'replication_factor': 3};
+USE "Shop";
+CREATE TYPE "Addr" (street text, "ZipCode" int);
+CREATE TYPE shop.unused (a int);
+CREATE TYPE IF NOT EXISTS "Shop".phone (number text, tags frozen<set<text>>);
+-- orders by customer and day
+CREATE TABLE "Shop"."Orders" (
+    "CustomerId" uuid,
+    Region text,
+    "OrderDay" date,
+    order_id timeuuid,
+    "Total" decimal,
+    note text STATIC,
+    ship_to frozen<"Addr">,
+    billing "Addr",
+    phones list<frozen<phone>>,
+    PRIMARY KEY (("CustomerId", region), "OrderDay", order_id)
+) WITH CLUSTERING ORDER BY ("OrderDay" DESC, order_id ASC)
+    AND comment = 'orders'
+    AND default_time_to_live = 86400;
+CREATE TABLE other.events (id int PRIMARY KEY, payload blob) /* no ttl */ WITH gc_grace_seconds = 10;
+"""
+
+
+def test_parse_schema_cql_keys_and_identifiers():
+    schemas = parse_schema_cql(SCHEMA_CQL)
+
+    assert sorted(schemas) == ['Shop.Orders', 'other.events']
+    orders = schemas['Shop.Orders']
+    # Quoted identifiers keep their case, unquoted ones are lower-cased
+    assert orders['partition_keys'] == ['CustomerId', 'region']
+    assert orders['clustering_keys'] == ['OrderDay', 'order_id']
+    assert orders['static_columns'] == ['note']
+    assert orders['column_data_types']['Total'] == 'decimal'
+    assert orders['column_data_types']['phones'] == 'list<frozen<phone>>'
+
+    events = schemas['other.events']
+    assert (events['partition_keys'], events['clustering_keys']) == (['id'], [])
+
+
+def test_parse_schema_cql_user_types():
+    orders = parse_schema_cql(SCHEMA_CQL)['Shop.Orders']
+    address = {'street': 'text', 'ZipCode': 'int'}
+
+    # Only the table's keyspace types, with quoted type and field names kept as written
+    assert orders['user_types'] == {'Addr': address, 'phone': {'number': 'text', 'tags': 'frozen<set<text>>'}}
+    assert orders['udt_schemas'] == {'ship_to': address, 'billing': address}
+
+    sizer = RowSizer(**orders)
+    row = {'CustomerId': uuid.UUID(int=1), 'region': 'eu', 'OrderDay': datetime.date(2024, 1, 1),
+           'order_id': uuid.UUID(int=2), 'billing': {'street': 'Main St', 'ZipCode': 12345}}
+    assert sizer.size_row(row) == calculate_row_size(row, **orders)
+
+
+def test_parse_default_ttls():
+    assert parse_default_ttls(SCHEMA_CQL) == {'Shop.Orders': 86400, 'other.events': 0}
+
+
+VARIANT_SCHEMA = {
+    'partition_keys': ['k'],
+    'clustering_keys': ['c'],
+    'static_columns': ['s'],
+    'udt_schemas': {'home': {'street': 'text', 'zip': 'int'}},
+    'column_data_types': {'k': 'int', 'c': 'text', 's': 'text', 'tags': 'set<text>',
+                          'home': 'address', 'total': 'decimal', 'note': 'text'},
+    'user_types': {'address': {'street': 'text', 'zip': 'int'}},
+}
+
+# RowSizeVariants field -> calculate_row_size (include_row_metadata, include_client_timestamps, include_ttl)
+VARIANT_FLAGS = {
+    'throughput': (False, False, False),
+    'storage': (True, False, False),
+    'storage_with_ttl': (True, False, True),
+    'storage_with_client_timestamps': (True, True, False),
+    'storage_with_ttl_and_client_timestamps': (True, True, True),
+}
+
+
+@pytest.mark.parametrize('row', [
+    {'k': 1, 'c': 'a'},
+    {'k': 1, 'c': 'a', 's': 'static', 'tags': ['x', 'yy'], 'home': {'street': 'Main', 'zip': 12345},
+     'total': Decimal('12.50'), 'note': None},
+])
+def test_row_size_variants_match_calculate_row_size_flags(row):
+    variants = calculate_row_size_variants(row, **VARIANT_SCHEMA)
+
+    assert sorted(variants._fields) == sorted(VARIANT_FLAGS)
+    for field, (metadata, client_timestamps, ttl) in VARIANT_FLAGS.items():
+        assert getattr(variants, field) == calculate_row_size(
+            row, **VARIANT_SCHEMA, include_row_metadata=metadata,
+            include_client_timestamps=client_timestamps, include_ttl=ttl), field
+    assert RowSizer(**VARIANT_SCHEMA).size_row_variants(row) == variants
@@ -0,0 +1,101 @@
+"""
+Tests for reading NDJSON, CSV and COPY TO dumps in row_size_dump.py.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import io
+import sys
+from decimal import Decimal
+
+import pytest
+
+from row_size_calculator import calculate_row_size, parse_cql_type, parse_schema_cql
+from row_size_dump import DumpTableSizer, coerce_value, open_dump, parse_cql_literal, read_records
+
+
+SCHEMA = parse_schema_cql("""
+CREATE TYPE ks."Addr" (street text, "ZipCode" int);
+CREATE TABLE ks.t (
+    k int PRIMARY KEY,
+    data blob,
+    scores map<int, text>,
+    nested frozen<map<frozen<list<int>>, frozen<set<decimal>>>>,
+    home "Addr",
+    ship_to frozen<ks."Addr">
+);
+""")['ks.t']
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('plain text', 'plain text'),
+    ("[1, 2, 3]", ['1', '2', '3']),
+    ("{'a': [1, 2], 'b': []}", {'a': ['1', '2'], 'b': []}),
+    ("{'it''s', 'x, y'}", ["it's", 'x, y']),
+    ("(1, 'a', null)", ('1', 'a', None)),
+    ("{street: '1 Main St', zip: 98101}", {'street': '1 Main St', 'zip': '98101'}),
+    ("{[1, 2]: {'x'}, [3]: {}}", {('1', '2'): ['x'], ('3',): []}),
+    ("[null, 'null']", [None, 'null']),
+])
+def test_parse_cql_literal(text, expected):
+    assert parse_cql_literal(text) == expected
+
+
+@pytest.mark.parametrize('value,data_type,expected', [
+    ('0xCAFE', 'blob', b'\xca\xfe'),
+    ('cafe', 'blob', b'\xca\xfe'),
+    ('42', 'bigint', 42),
+    ('1.50', 'decimal', Decimal('1.50')),
+    ('abc', 'int', 'abc'),
+    (None, 'int', None),
+    ({'1': 'a', '20': None}, 'map<int, text>', {1: 'a', 20: None}),
+    (['1', '2'], 'frozen<tuple<int, decimal>>', [1, Decimal('2')]),
+    ({('1', '2'): ['1.5', '2']}, 'frozen<map<frozen<list<int>>, frozen<set<decimal>>>>',
+     {(1, 2): [Decimal('1.5'), Decimal('2')]}),
+    ({'street': 'Main', 'ZipCode': '12'}, '"Addr"', {'street': 'Main', 'ZipCode': 12}),
+    ({'street': 'Main', '"ZipCode"': '12'}, 'frozen<ks."Addr">', {'street': 'Main', 'ZipCode': 12}),
+])
+def test_coerce_value(value, data_type, expected):
+    assert coerce_value(value, parse_cql_type(data_type), SCHEMA['user_types']) == expected
+
+
+ROW = {
+    'k': 1,
+    'data': b'\x00\x01',
+    'scores': {1: 'a', 20: 'bb'},
+    'nested': {(1, 2): [Decimal('1.5')]},
+    'home': {'street': 'Main', 'ZipCode': 12},
+    'ship_to': None,
+}
+
+
+def test_parse_ndjson_record():
+    sizer = DumpTableSizer(SCHEMA, 'ndjson')
+    record = ('{"k": 1, "data": "0x0001", "scores": {"1": "a", "20": "bb"}, "nested": {"[1, 2]": [1.5]}, '
+              '"home": {"street": "Main", "ZipCode": 12}, "ship_to": null}')
+
+    assert sizer.parse_record(record) == ROW
+
+
+def test_parse_csv_record_in_copy_to_column_order():
+    sizer = DumpTableSizer(SCHEMA, 'csv')
+    # COPY TO writes keys first, then the other columns by name
+    assert sizer.columns == ['k', 'data', 'home', 'nested', 'scores', 'ship_to']
+    record = ['1', '0x0001', '{street: \'Main\', "ZipCode": 12}', "{[1, 2]: {1.5}}", "{1: 'a', 20: 'bb'}", '']
+
+    row = sizer.parse_record(record)
+
+    assert row == ROW
+    assert sizer.size_records([record]).histogram.total == calculate_row_size(row, **SCHEMA)
+
+
+def test_open_dump_reads_stdin_without_closing_it(monkeypatch):
+    stdin = io.StringIO('[json]\n{"k": 1}\n{"k": 2}\n(2 rows)\n')
+    monkeypatch.setattr(sys, 'stdin', stdin)
+
+    with open_dump('-') as stream:
+        records = list(read_records(stream, 'ndjson'))
+
+    assert records == ['{"k": 1}', '{"k": 2}']
+    assert not stdin.closed
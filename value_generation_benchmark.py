@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""
+Script: value_generation_benchmark.py
+Description: Micro-benchmark for the synthetic data generation of cassandra_benchmark.py.
+             Builds a wide table schema with a mix of CQL types and reports how many
+             rows of regular column values per second generate_regular_values and
+             the pooled ValueGenerator can produce, i.e. the client-side ceiling on
+             insert throughput before any request is sent. generate_regular_values
+             skips the collection columns, which only ValueGenerator generates.
+
+Usage:
+    python value_generation_benchmark.py [--rows N] [--columns N] [--seed N]
+
+Examples:
+    python value_generation_benchmark.py
+    python value_generation_benchmark.py --rows 500000 --columns 40
+"""
+
+import argparse
+import random
+import time
+
+from cassandra_benchmark import ValueGenerator, generate_regular_values
+
+
+# Column types cycled through when building the benchmark schema
+MIXED_TYPES = ['text', 'int', 'bigint', 'blob', 'boolean', 'uuid', 'timestamp',
+               'double', 'decimal', 'varchar', 'smallint', 'inet',
+               'list<int>', 'map<text, bigint>', 'frozen<set<text>>']
+
+
+def build_column_types(num_columns):
+    """Return {column_name: cql_type} for num_columns mixed-type regular columns."""
+    return {f"c{i}": MIXED_TYPES[i % len(MIXED_TYPES)] for i in range(num_columns)}
+
+
+def time_it(label, count, fn):
+    """Run fn once and print the elapsed time and rows per second."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed:8.3f}s  {count / elapsed:12,.0f} rows/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark synthetic row generation for cassandra_benchmark.py.')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of rows to generate (default: 100000)')
+    parser.add_argument('--columns', type=int, default=20, help='Regular columns per row (default: 20)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    column_types = build_column_types(args.columns)
+    columns = list(column_types)
+
+    print(f"Generating {args.rows} rows with {args.columns} mixed-type columns:")
+    time_it('generate_regular_values', args.rows, lambda: [
+        generate_regular_values(columns, column_types) for _ in range(args.rows)
+    ])
+
+    start = time.perf_counter()
+    row_values = ValueGenerator(column_types).row_generator(columns)
+    print(f"  {'ValueGenerator setup':<26} {time.perf_counter() - start:8.3f}s")
+    time_it('ValueGenerator rows', args.rows, lambda: [row_values() for _ in range(args.rows)])
+
+
+if __name__ == '__main__':
+    main()